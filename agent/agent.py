@@ -39,12 +39,13 @@ OPENAI_TOOLS = [
     {
         "type": "function",
         "function": {
-            "name": "tool_top_products",
-            "description": "Top products by revenue.",
+            "name": "tool_revenue_windows",
+            "description": "Today's revenue vs the baseline average over several lookback windows in one call (default 7, 14, 30, 90 and 365 days), with each window's total revenue.",
             "parameters": {
                 "type": "object",
                 "properties": {
-                    "n": {"type": "integer", "default": 3}
+                    "windows": {"type": "array", "items": {"type": "integer"},
+                                "default": [7, 14, 30, 90, 365]}
                 },
             },
         },
@@ -52,40 +53,80 @@ OPENAI_TOOLS = [
     {
         "type": "function",
         "function": {
-            "name": "tool_top_regions",
-            "description": "Top regions by revenue.",
+            "name": "tool_revenue_variance",
+            "description": (
+                "Explains WHY revenue moved: splits the change between the last N days and the "
+                "N days before into volume, mix and price effects, in total and per product, "
+                "region and channel. Use this instead of chaining breakdown tools."
+            ),
             "parameters": {
                 "type": "object",
                 "properties": {
-                    "n": {"type": "integer", "default": 3}
+                    "days": {"type": "integer", "description": "Length of each period in days.", "default": 30}
                 },
             },
         },
     },
-
-    # -------- ANALYTICS --------
     {
         "type": "function",
         "function": {
-            "name": "tool_sales_by_product",
-            "description": "Revenue grouped by product.",
-            "parameters": {"type": "object", "properties": {}},
+            "name": "tool_top_products",
+            "description": "Top products by revenue.",
+            "parameters": {
+                "type": "object",
+                "properties": {
+                    "n": {"type": "integer", "default": 3}
+                },
+            },
         },
     },
     {
         "type": "function",
         "function": {
-            "name": "tool_sales_by_region",
-            "description": "Revenue grouped by region.",
-            "parameters": {"type": "object", "properties": {}},
+            "name": "tool_top_regions",
+            "description": "Top regions by revenue.",
+            "parameters": {
+                "type": "object",
+                "properties": {
+                    "n": {"type": "integer", "default": 3}
+                },
+            },
         },
     },
+
+    # -------- ANALYTICS --------
     {
         "type": "function",
         "function": {
-            "name": "tool_sales_by_channel",
-            "description": "Revenue grouped by channel.",
-            "parameters": {"type": "object", "properties": {}},
+            "name": "tool_rollup",
+            "description": (
+                "Breakdown of one or more measures by any dimensions, optionally over "
+                "the last N days and limited to the top N rows. Use for revenue / units / "
+                "profit by product, region, channel or month, marketing spend or ROAS by "
+                "channel, and stockout days or average stock by product. Measures in one "
+                "call must come from the same group (sales, marketing or inventory)."
+            ),
+            "parameters": {
+                "type": "object",
+                "properties": {
+                    "dims": {
+                        "type": "array",
+                        "items": {"type": "string", "enum": ["product", "region", "channel", "month", "week", "date"]},
+                        "description": "Group-by dimensions. Marketing has channel only; inventory has product only.",
+                    },
+                    "measures": {
+                        "type": "array",
+                        "items": {"type": "string", "enum": [
+                            "revenue", "units", "cost", "profit", "profit_margin_pct",
+                            "spend", "impressions", "clicks", "conversions", "marketing_revenue", "roas",
+                            "stockout_days", "avg_closing_stock", "lost_demand",
+                        ]},
+                        "default": ["revenue"],
+                    },
+                    "window_days": {"type": "integer", "description": "Only the last N days (all history if omitted)."},
+                    "top_n": {"type": "integer", "description": "Keep the N rows with the largest first measure."},
+                },
+            },
         },
     },
     {
@@ -120,6 +161,17 @@ OPENAI_TOOLS = [
             "parameters": {"type": "object", "properties": {}},
         },
     },
+    {
+        "type": "function",
+        "function": {
+            "name": "tool_inventory_stockout_streaks",
+            "description": (
+                "Stockout and low-stock streaks per product: number of streaks, longest "
+                "streak, streak still running today and days since the last stockout."
+            ),
+            "parameters": {"type": "object", "properties": {}},
+        },
+    },
 
 
 
@@ -140,7 +192,9 @@ OPENAI_TOOLS = [
             "parameters": {"type": "object", "properties": {
                 "lookback_days": {"type": "integer",
                                   "description": "Number of days to analyze (e.g. 30, 60, 90, 180)",
-                                  "default": 30}
+                                  "default": 30},
+                "lookbacks": {"type": "array", "items": {"type": "integer"},
+                              "description": "Several lookbacks at once (e.g. [30, 90, 180]); returns one result per lookback, keyed by days, instead of lookback_days"}
             }},
         },
     },
@@ -160,7 +214,9 @@ OPENAI_TOOLS = [
             "parameters": {"type": "object", "properties": {
                 "lookback_days": {"type": "integer",
                                   "description": "Number of days to analyze (e.g. 30, 60, 90, 180)",
-                                  "default": 30}
+                                  "default": 30},
+                "lookbacks": {"type": "array", "items": {"type": "integer"},
+                              "description": "Several lookbacks at once (e.g. [30, 90, 180]); returns one result per lookback, keyed by days, instead of lookback_days"}
             }},
         },
     },
@@ -172,6 +228,23 @@ OPENAI_TOOLS = [
             "parameters": {"type": "object", "properties": {}},
         },
     },
+    {
+        "type": "function",
+        "function": {
+            "name": "tool_flag_timeline",
+            "description": (
+                "History of every interpretation flag: for each flag and product/channel, the runs of "
+                "consecutive days it fired (start, end, days) over the backtest period. "
+                "Use this to answer when a risk first appeared or how long it has lasted."
+            ),
+            "parameters": {"type": "object", "properties": {
+                "days": {"type": "integer", "description": "Backtest period in days", "default": 365},
+                "lookback_days": {"type": "integer",
+                                  "description": "Marketing and inventory window as of each day",
+                                  "default": 30}
+            }},
+        },
+    },
     # -------- RECOMMENDATION --------
         {
         "type": "function",
@@ -0,0 +1,172 @@
+import numpy as np
+import pandas as pd
+from agent.core.context import DataContext
+from agent.core.memo import memoize
+
+# ------------------------------------------------------
+# PERIOD-OVER-PERIOD COMPARISONS
+# ------------------------------------------------------
+# Compares measures between any number of period pairs in one scan.
+#
+# A period is (end, days): dates in (end - days, end]. A pair is
+# (current, previous). All period boundaries are merged into one sorted
+# list of aligned buckets; every row is assigned to its bucket with one
+# searchsorted, measures are summed per (dimensions, bucket) with one
+# groupby, and each period is then the difference of two cumulative
+# bucket sums. Overlapping pairs (last 7 vs previous 7, last 30 vs
+# previous 30, ...) therefore cost the same single pass.
+#
+# nested_windows() answers the other multi-horizon question, totals per
+# entity over the last 30 / 60 / 90 / ... days, the same way: one grid
+# of daily sums per entity, one cumulative sum, one row per horizon.
+
+HOW = ("sum", "mean", "count")
+
+
+def lookback_pair(end: pd.Timestamp, days: int) -> tuple:
+    """The last `days` days up to `end` vs the `days` before them."""
+    return (end, int(days)), (end - pd.Timedelta(days=int(days)), int(days))
+
+
+def nested_windows(df: pd.DataFrame, dim: str, columns: list, end: pd.Timestamp, lookbacks) -> dict:
+    """
+    Sums of `columns` by `dim` over every nested window (end - L, end],
+    L in `lookbacks`, from one dense (days back from end, dim) grid and a
+    cumulative sum over days. Integer columns stay int64, as with a
+    groupby sum. Each frame also has "__rows" (rows in the window) and
+    "__days" (distinct days); values of `dim` without rows in a window
+    are left out, like a groupby with observed=True. A window of L <= 0
+    days holds no rows and comes back empty.
+
+    Returns {L: DataFrame}.
+    """
+    lookbacks = sorted({int(L) for L in lookbacks})
+    span = max(lookbacks[-1], 0)
+    values = df[dim].astype("category")
+    labels = values.cat.categories
+    n = len(labels)
+
+    back = (np.datetime64(end, "D") - df["date"].to_numpy(dtype="datetime64[D]")).astype(np.int64)
+    codes = values.cat.codes.to_numpy().astype(np.int64)
+    keep = (back >= 0) & (back < span) & (codes >= 0)
+    cell = back[keep] * n + codes[keep]
+
+    # Row k of each cumulative grid holds the totals of the last k days (row 0: none)
+    def cumulative(grid):
+        return np.vstack([np.zeros((1, n), dtype=grid.dtype), grid.reshape(span, n).cumsum(axis=0)])
+
+    counts = np.bincount(cell, minlength=span * n)
+    rows = cumulative(counts)
+    days = cumulative((counts > 0).astype(np.int64))
+    sums = {
+        col: cumulative(np.bincount(cell, weights=df[col].to_numpy(dtype="float64", na_value=0.0)[keep],
+                                    minlength=span * n))
+        for col in columns
+    }
+    integer = {col for col in columns if pd.api.types.is_integer_dtype(df[col].dtype)}
+
+    out = {}
+    for L in lookbacks:
+        k = max(L, 0)
+        present = np.flatnonzero(rows[k])
+        frame = pd.DataFrame({dim: pd.Categorical.from_codes(present, labels)})
+        for col in columns:
+            total = sums[col][k][present]
+            frame[col] = total.astype(np.int64) if col in integer else total
+        frame["__rows"] = rows[k][present]
+        frame["__days"] = days[k][present]
+        out[L] = frame
+    return out
+
+
+def _columns(measures: dict) -> dict:
+    """Partial sums each measure needs: {partial name: (column, "sum" | "count")}."""
+    partials = {}
+    for measure, (col, how) in measures.items():
+        if how not in HOW:
+            raise ValueError(f"Period comparisons cannot evaluate '{how}'")
+        if how in ("sum", "mean"):
+            partials[f"{col}__sum"] = (col, "sum")
+        if how in ("mean", "count"):
+            partials[f"{col}__count"] = (col, "count")
+    return partials
+
+
+def compare_frame(df: pd.DataFrame, measures: dict, pairs: dict, dims=()) -> pd.DataFrame:
+    """
+    Evaluates `measures` ({name: (column, how)}, how in sum / mean /
+    count) by `dims` for every pair in `pairs` ({label: (current,
+    previous)}) over a dated frame.
+
+    Returns one row per (pair, dims) with, per measure,
+    <name>_previous, <name>_current, <name>_change and <name>_change_pct
+    (NaN when the previous value is 0 or missing). Dimension values seen
+    in either period of any pair are kept.
+    """
+    dims = list(dims)
+    periods = list(dict.fromkeys(p for pair in pairs.values() for p in pair))
+    bounds = {p: ((p[0] - pd.Timedelta(days=p[1])).to_datetime64(), p[0].to_datetime64()) for p in periods}
+    edges = np.unique(np.array([t for b in bounds.values() for t in b], dtype="datetime64[ns]"))
+
+    # Bucket k holds dates in (edges[k-1], edges[k]]; 0 and len(edges) are outside every period
+    bucket = np.searchsorted(edges, df["date"].to_numpy(dtype="datetime64[ns]"), side="left")
+    inside = (bucket > 0) & (bucket < len(edges))
+    partials = _columns(measures)
+    rows = df[inside].assign(__bucket=bucket[inside])
+    key = dims or ["__all"]
+    if not dims:
+        rows = rows.assign(__all=0)
+    grouped = rows.groupby(key + ["__bucket"], observed=True).agg(**partials)
+
+    # Cumulative sums over buckets: a period is cum[end edge] - cum[start edge]
+    wide = grouped.unstack("__bucket", fill_value=0)
+    cum = {}
+    for name in partials:
+        block = (
+            wide[name].reindex(columns=range(1, len(edges)), fill_value=0)
+            if name in wide.columns.get_level_values(0) else
+            pd.DataFrame(0, index=wide.index, columns=range(1, len(edges)))
+        )
+        values = np.cumsum(block.to_numpy(dtype="float64"), axis=1)
+        cum[name] = np.hstack([np.zeros((len(values), 1)), values])
+
+    def value(measure, period):
+        col, how = measures[measure]
+        lo, hi = (int(np.searchsorted(edges, t)) for t in bounds[period])
+        if how == "sum":
+            return cum[f"{col}__sum"][:, hi] - cum[f"{col}__sum"][:, lo]
+        count = cum[f"{col}__count"][:, hi] - cum[f"{col}__count"][:, lo]
+        if how == "count":
+            return count
+        total = cum[f"{col}__sum"][:, hi] - cum[f"{col}__sum"][:, lo]
+        with np.errstate(divide="ignore", invalid="ignore"):
+            return np.where(count > 0, total / count, np.nan)
+
+    index = wide.index.to_frame(index=False)[dims]
+    frames = []
+    for label, (current, previous) in pairs.items():
+        out = index.copy()
+        out.insert(0, "pair", label)
+        for measure in measures:
+            prev, cur = value(measure, previous), value(measure, current)
+            with np.errstate(divide="ignore", invalid="ignore"):
+                pct = np.where((prev != 0) & ~np.isnan(prev), (cur - prev) / prev * 100, np.nan)
+            out[f"{measure}_previous"] = prev
+            out[f"{measure}_current"] = cur
+            out[f"{measure}_change"] = cur - prev
+            out[f"{measure}_change_pct"] = pct
+        frames.append(out)
+    return pd.concat(frames, ignore_index=True)
+
+
+@memoize
+def compare_periods(ctx: DataContext, table: str, measures: dict, pairs: dict, dims=()) -> pd.DataFrame:
+    """
+    compare_frame over a DataContext table, reading only the one window
+    of `table` that spans every period.
+    """
+    periods = [p for pair in pairs.values() for p in pair]
+    end = max(p[0] for p in periods)
+    start = min(p[0] - pd.Timedelta(days=p[1]) for p in periods)
+    df = ctx.window(table, end, (end - start).days)
+    return compare_frame(df, measures, pairs, dims)
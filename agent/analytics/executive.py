@@ -1,5 +1,6 @@
-import pandas as pd
+import numpy as np
 from agent.core.context import DataContext
+from agent.core.memo import memoize
 
 # ------------------------------------------------------
 # EXECUTIVE PULSE
@@ -8,9 +9,54 @@ from agent.core.context import DataContext
 def _latest_date(ctx: DataContext):
     if ctx.daily.empty:
         return None
-    #ctx.daily["date"] is datetime64 already
-    return ctx.daily["date"].max()
+    #ctx.daily is kept sorted by date, so the last row is the latest day
+    return ctx.daily["date"].iloc[-1]
 
+# Windows the batch reading covers by default
+BASELINE_WINDOWS = (7, 14, 30, 90, 365)
+
+def _daily_prefix(ctx: DataContext):
+    """
+    Cumulative revenue over ctx.daily plus, for every calendar day since the
+    first one, how many daily rows fall on or before it. Any (end - n, end]
+    window is then two array lookups. Built once per data version.
+    """
+    def build():
+        dates = ctx.daily["date"].to_numpy().astype("datetime64[D]")
+        revenue = ctx.daily["revenue"].to_numpy(dtype="float64")
+        day = (dates - dates[0]).astype(np.int64)
+        rows_through = np.searchsorted(day, np.arange(day[-1] + 1), side="right")
+        return {
+            "first": dates[0],
+            "rows_through": rows_through,
+            "cum_revenue": np.concatenate(([0.0], np.cumsum(revenue))),
+        }
+    return ctx.memoized(("daily_prefix",), build)
+
+def _window_rows(prefix: dict, end, n: int):
+    """Row range [lo, hi) of ctx.daily with date in (end - n, end]."""
+    rows_through = prefix["rows_through"]
+    end_day = int((np.datetime64(end, "D") - prefix["first"]).astype(np.int64))
+    hi = int(rows_through[min(end_day, len(rows_through) - 1)]) if end_day >= 0 else 0
+    start_day = end_day - n
+    lo = int(rows_through[min(start_day, len(rows_through) - 1)]) if start_day >= 0 else 0
+    return lo, hi
+
+def _reading(prefix: dict, lo: int, hi: int) -> dict:
+    cum = prefix["cum_revenue"]
+    today_revenue = float(cum[hi] - cum[hi - 1])
+    baseline_avg = float((cum[hi - 1] - cum[lo]) / (hi - 1 - lo))
+
+    delta_pct = None
+    if baseline_avg > 0:
+        delta_pct = (today_revenue - baseline_avg) / baseline_avg * 100
+    return {
+        "baseline_avg": baseline_avg,
+        "today_revenue": today_revenue,
+        "delta_pct": delta_pct,
+    }
+
+@memoize
 def revenue_recent_performance(
         ctx: DataContext,
         n: int = 7
@@ -21,42 +67,56 @@ def revenue_recent_performance(
     - Computes baseline average (excluding today)
     - Computes today's deviation vs baseline
 
-    Agent can choose n = 7, 14, 30, etc.
+    Agent can choose n = 7, 14, 30, etc. Totals come from prefix sums,
+    so the cost does not depend on n.
     """
 
     if ctx.daily.empty:
         return None
     
     latest = _latest_date(ctx)
-    start = latest - pd.Timedelta(days=n)
-
-    window = (
-        ctx.daily[
-            (ctx.daily["date"] > start) &
-            (ctx.daily["date"] <= latest)
-        ]
-        .sort_values("date")
-        .copy()
-    )
-
-    if len(window) < 2:
-        return None
-    
-    today_revenue = float(window.iloc[-1]["revenue"])
-    baseline_avg = float(window.iloc[:-1]["revenue"].mean())
+    prefix = _daily_prefix(ctx)
+    lo, hi = _window_rows(prefix, latest, n)
 
-    delta_pct = None
-    if baseline_avg > 0:
-        delta_pct = (today_revenue - baseline_avg) / baseline_avg * 100
+    if hi - lo < 2:
+        return None
 
     return { 
         "window_days": n,
-        "daily_series": window[["date", "revenue", "units"]],
-        "baseline_avg": baseline_avg,
-        "today_revenue": today_revenue,
-        "delta_pct": delta_pct,
+        "daily_series": ctx.daily.iloc[lo:hi][["date", "revenue", "units"]],
+        **_reading(prefix, lo, hi),
     }
 
+@memoize
+def revenue_windows(ctx: DataContext, windows=BASELINE_WINDOWS):
+    """
+    Batch variant of revenue_recent_performance: today vs baseline for
+    several windows at once, without the daily series.
+
+    Returns {n: {"window_days", "days_with_data", "total_revenue",
+    "baseline_avg", "today_revenue", "delta_pct"} or None}.
+    """
+    if ctx.daily.empty:
+        return None
+
+    latest = _latest_date(ctx)
+    prefix = _daily_prefix(ctx)
+    cum = prefix["cum_revenue"]
+
+    readings = {}
+    for n in windows:
+        lo, hi = _window_rows(prefix, latest, int(n))
+        if hi - lo < 2:
+            readings[n] = None
+            continue
+        readings[n] = {
+            "window_days": int(n),
+            "days_with_data": hi - lo,
+            "total_revenue": float(cum[hi] - cum[lo]),
+            **_reading(prefix, lo, hi),
+        }
+    return readings
+
 
 def daily_delta(ctx: DataContext):
     """
@@ -1,29 +1,188 @@
+import numpy as np
 import pandas as pd
 from agent.core.context import DataContext
+from agent.core.memo import memoize
+from agent.analytics.rollup import rollup
 
 # ------------------------------------------------------
 # INVENTORY ANALYTICS
 # ------------------------------------------------------
 
+# Closing stock at or below this counts as a low-stock day
+# (same default as INVENTORY_LOW_STOCK_UNITS in reasoning/interpret.py)
+LOW_STOCK_UNITS = 5.0
+
+STATE_COLUMNS = ["date", "product", "closing_stock", "stockout_flag"]
+
+
 def stockouts_by_product(ctx: DataContext):
     """Count how many days each product had a stockout."""
-    df = ctx.inventory.copy()
-    stockouts = df[df["stockout_flag"] == "Yes"]
-    return (
-        stockouts.groupby("product")["date"]
-        .nunique()
-        .reset_index()
-        .rename(columns={"date": "stockout_days"})
-    )
+    days = rollup(ctx, ["product"], ["stockout_days"])
+    return days[days["stockout_days"] > 0].reset_index(drop=True)
 
 
 def avg_closing_stock(ctx: DataContext):
     """Average closing stock per product."""
-    df = ctx.inventory.copy()
-    return (
-        df.groupby("product")["closing_stock"]
-        .mean()
-        .reset_index()
-        .rename(columns={"closing_stock": "avg_closing_stock"})
-    )
+    return rollup(ctx, ["product"], ["avg_closing_stock"])
+
+
+# ------------------------------------------------------
+# STOCKOUT STREAKS (run-length encoding)
+# ------------------------------------------------------
+
+def _runs(codes: np.ndarray, dates: np.ndarray, state: np.ndarray, n_groups: int):
+    """
+    Run-length encoding of a boolean `state` over rows ordered by
+    (group code, date). A run also ends where the next row is more than
+    one day later, so a missing day splits it. Returns per group: number
+    of runs, longest run, the run open at the group's first row and the
+    run still open at its last row (0 if none).
+    """
+    n = len(codes)
+    first = np.ones(n, dtype=bool)
+    first[1:] = codes[1:] != codes[:-1]
+    last = np.ones(n, dtype=bool)
+    last[:-1] = first[1:]
+    prev = np.zeros(n, dtype=bool)
+    prev[1:] = state[:-1]
+    gap = np.ones(n, dtype=bool)
+    gap[1:] = dates[1:] - dates[:-1] > np.timedelta64(1, "D")
+
+    starts = state & (first | ~prev | gap)
+    run_id = np.cumsum(starts) - 1
+    lengths = np.bincount(run_id[state], minlength=int(starts.sum()))
+    run_group = codes[starts]
+
+    count = np.bincount(run_group, minlength=n_groups)
+    longest = np.zeros(n_groups, dtype=np.int64)
+    np.maximum.at(longest, run_group, lengths)
+    lead = np.zeros(n_groups, dtype=np.int64)
+    opened = first & state
+    lead[codes[opened]] = lengths[run_id[opened]]
+    current = np.zeros(n_groups, dtype=np.int64)
+    open_ = last & state
+    current[codes[open_]] = lengths[run_id[open_]]
+    return count, longest, lead, current
+
+
+def _is_yes(flags: pd.Series) -> np.ndarray:
+    """stockout_flag as booleans; categoricals are tested once per label, not per row."""
+    if isinstance(flags.dtype, pd.CategoricalDtype):
+        yes = flags.cat.categories.astype(str).str.lower().isin(["yes", "true", "1"])
+        codes = flags.cat.codes.to_numpy()
+        return np.append(yes, False)[codes]  # code -1 (missing) -> False
+    return flags.astype(str).str.lower().isin(["yes", "true", "1"]).to_numpy()
+
+
+def _inventory_blocks(ctx: DataContext):
+    """
+    The inventory columns streaks need: the held table as one block, or
+    in streaming mode the CSV's chunks in file (date) order.
+    """
+    if ctx.streaming and "inventory" not in ctx.tables:
+        yield from ctx.stream("inventory", STATE_COLUMNS)
+    else:
+        yield ctx.table("inventory")[STATE_COLUMNS]
+
+
+def _block_streaks(inv: pd.DataFrame, low_stock_units: float) -> pd.DataFrame:
+    """Streak statistics per product over one block of inventory rows, indexed by product."""
+    product = inv["product"].astype("category")
+    codes = product.cat.codes.to_numpy()
+    dates = inv["date"].to_numpy(dtype="datetime64[ns]")
+    # Held tables are date-sorted already: a stable sort by product keeps that order
+    if inv["date"].is_monotonic_increasing:
+        order = np.argsort(codes, kind="stable")
+    else:
+        order = np.lexsort((dates, codes))
+    codes, dates = codes[order], dates[order]
+    n_groups = len(product.cat.categories)
+    stockout = _is_yes(inv["stockout_flag"])[order]
+
+    out = {}
+    for state, hits in (
+        ("stockout", stockout),
+        ("low_stock", (inv["closing_stock"].fillna(0) <= low_stock_units).to_numpy()[order]),
+    ):
+        for stat, values in zip(("count", "longest", "lead", "current"), _runs(codes, dates, hits, n_groups)):
+            out[f"{state}_{stat}"] = values
+
+    # Rows are date-ordered within a product: first / last rows hold its earliest / latest dates
+    first_row = np.ones(len(codes), dtype=bool)
+    first_row[1:] = codes[1:] != codes[:-1]
+    last_row = np.ones(len(codes), dtype=bool)
+    last_row[:-1] = first_row[1:]
+    for name, rows in (("first_date", first_row), ("last_date", last_row)):
+        out[name] = np.full(n_groups, np.datetime64("NaT"), dtype="datetime64[ns]")
+        out[name][codes[rows]] = dates[rows]
+
+    hits = np.flatnonzero(stockout)
+    last_hit = hits[np.append(codes[hits][1:] != codes[hits][:-1], True)] if len(hits) else hits
+    out["last_stockout"] = np.full(n_groups, np.datetime64("NaT"), dtype="datetime64[ns]")
+    out["last_stockout"][codes[last_hit]] = dates[last_hit]
+    out["rows"] = np.bincount(codes, minlength=n_groups)
+
+    block = pd.DataFrame(out, index=pd.Index(product.cat.categories, name="product"))
+    return block[block["rows"] > 0]
+
+
+def _merge_streaks(acc: pd.DataFrame, block: pd.DataFrame) -> pd.DataFrame:
+    """
+    Folds the streaks of a later block into those accumulated so far. A
+    product's run open at the end of `acc` continues into `block` when the
+    block starts with the same state on the very next day.
+    """
+    prev = acc.reindex(block.index)
+    next_day = (block["first_date"] - prev["last_date"]) == pd.Timedelta(days=1)
+    merged = block.copy()
+    for state in ("stockout", "low_stock"):
+        carried = prev[f"{state}_current"].fillna(0).astype(np.int64)
+        joined = next_day & (carried > 0) & (block[f"{state}_lead"] > 0)
+        bridge = (carried + block[f"{state}_lead"]).where(joined, 0)
+        merged[f"{state}_count"] = prev[f"{state}_count"].fillna(0).astype(np.int64) + block[f"{state}_count"] - joined
+        merged[f"{state}_longest"] = np.maximum.reduce([
+            prev[f"{state}_longest"].fillna(0).astype(np.int64), block[f"{state}_longest"], bridge,
+        ])
+        # The whole block is one run: the carried streak is still open at its end
+        through = joined & (block[f"{state}_lead"] == block["rows"])
+        merged[f"{state}_current"] = block[f"{state}_current"] + carried.where(through, 0)
+    merged["last_stockout"] = block["last_stockout"].fillna(prev["last_stockout"])
+    return pd.concat([acc[~acc.index.isin(block.index)], merged])
+
+
+@memoize
+def stockout_streaks(ctx: DataContext, low_stock_units: float = LOW_STOCK_UNITS) -> pd.DataFrame:
+    """
+    Stockout and low-stock streaks per product, in one vectorized pass.
+
+    A streak is a run of consecutive calendar days in the state; a day
+    missing from the data ends it. In streaming mode chunks are folded
+    one at a time, carrying each product's open runs across chunk
+    boundaries (_merge_streaks). Columns:
+      stockout_streaks / low_stock_streaks     number of streaks
+      longest_stockout_streak / ..._low_stock  longest streak, in days
+      current_stockout_streak / ..._low_stock  streak still running on the
+                                               product's latest day (0 if none)
+      days_since_last_stockout                 days from the last stockout to
+                                               the product's latest day (NaN if never)
+    """
+    acc = None
+    for inv in _inventory_blocks(ctx):
+        if len(inv):
+            block = _block_streaks(inv, low_stock_units)
+            acc = block if acc is None else _merge_streaks(acc, block)
+    if acc is None:
+        acc = _block_streaks(pd.DataFrame(columns=STATE_COLUMNS), low_stock_units)
+    elif ctx.streaming and "inventory" not in ctx.tables:
+        acc = acc.sort_index()
 
+    return pd.DataFrame({
+        "product": acc.index,
+        "stockout_streaks": acc["stockout_count"].to_numpy(),
+        "longest_stockout_streak": acc["stockout_longest"].to_numpy(),
+        "current_stockout_streak": acc["stockout_current"].to_numpy(),
+        "days_since_last_stockout": ((acc["last_date"] - acc["last_stockout"]) / pd.Timedelta(days=1)).to_numpy(),
+        "low_stock_streaks": acc["low_stock_count"].to_numpy(),
+        "longest_low_stock_streak": acc["low_stock_longest"].to_numpy(),
+        "current_low_stock_streak": acc["low_stock_current"].to_numpy(),
+    })
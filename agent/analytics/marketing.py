@@ -1,5 +1,5 @@
-import pandas as pd
 from agent.core.context import DataContext
+from agent.analytics.rollup import rollup
 
 # ------------------------------------------------------
 # MARKETING ANALYTICS
@@ -10,21 +10,9 @@ def roas_by_channel(ctx: DataContext):
     Average ROAS per marketing channel.
     Used to detect inefficient spend and fake growth.
     """
-    df = ctx.marketing.copy()
-    df["ROAS"] = df["revenue"] / df["spend"].replace(0,pd.NA)
-    return (
-        df.groupby("channel")["ROAS"]
-        .mean()
-    )
+    return rollup(ctx, ["channel"], ["roas"]).set_index("channel")["roas"].rename("ROAS")
 
 
 def spend_over_time(ctx: DataContext):
-    # ❗ FIX: Convert Period → string
-    df = ctx.marketing.copy()
-    df["month"] = df["date"].dt.to_period("M").astype(str)
-    return (
-        df.groupby("month")["spend"]
-        .sum()
-    )
-
-
+    # Month labels are strings (not Periods)
+    return rollup(ctx, ["month"], ["spend"]).set_index("month")["spend"]
@@ -1,89 +1,68 @@
 import pandas as pd
 from agent.core.context import DataContext
+from agent.core.costs import add_profit
+from agent.core.memo import memoize
+from agent.analytics.rollup import rollup
 
 # ------------------------------------------------------
 # PROFIT / UNIT ECONOMICS ANALYTICS
 # ------------------------------------------------------
 
-def profit_by_product(ctx: DataContext):
-    """
-    True profit by product (excluding marketing spend)
-    """
-    df = ctx.sales_enriched.copy()
+# Product and channel profit are both rolled up from one small
+# (product, channel) table, so they share a single scan of the cube
+SEGMENT_DIMS = ["product", "channel"]
+SEGMENT_MEASURES = ["revenue", "units", "cost"]
 
-    agg = (
-        df.groupby("product", as_index=False)
-        .agg(
-            revenue=("revenue", "sum"),
-            units=("units_sold", "sum"),
-            total_cost=("unit_cost", lambda x: (x*df.loc[x.index, "units_sold"]).sum())
-        )
-    )
-
-    agg["profit"] = agg["revenue"]-agg["total_cost"]
-    agg["profit_margin_pct"] = agg["profit"]/agg["revenue"]*100
 
-    return agg
+def sales_by_segment(ctx: DataContext):
+    """Revenue, units and product cost per (product, channel), one rollup of the cube."""
+    return rollup(ctx, SEGMENT_DIMS, SEGMENT_MEASURES)
 
-def true_profit_by_channel(ctx: DataContext):
-    """
-    Net profit by marketing channel:
-    revenue - product costs - marketing spend
-    """
-    df = ctx.sales_enriched.copy()
-    #Product costs per channel
-    cost_by_channel = (
-    df.assign(cost=df["unit_cost"] * df["units_sold"])
-      .groupby("channel", as_index=False)["cost"]
-      .sum()
-      .rename(columns={"cost": "product_cost"})
-    )
 
+def product_profit(segments: pd.DataFrame):
+    """profit_by_product from a sales_by_segment table."""
+    out = segments.groupby("product", as_index=False, observed=True)[SEGMENT_MEASURES].sum()
+    return add_profit(out, costs=["cost"]).rename(columns={"cost": "total_cost"})
 
-    revenue_by_channel = (
-        df.groupby("channel", as_index=False)["revenue"].sum()
-    )
 
-    spend_by_channel = (
-        ctx.marketing.groupby("channel", as_index=False)["spend"].sum()
+def channel_profit(segments: pd.DataFrame, spend: pd.DataFrame):
+    """true_profit_by_channel from a sales_by_segment table and spend by channel."""
+    by_channel = (
+        segments.groupby("channel", as_index=False, observed=True)[["revenue", "cost"]].sum()
+        .rename(columns={"cost": "product_cost"})
     )
-
     merged = (
-        revenue_by_channel
-        .merge(cost_by_channel, on="channel", how="left")
-        .merge(spend_by_channel, on="channel", how="left")
-        .fillna(0)
-    )
-    
-    merged["net_profit"] = (
-        merged["revenue"]
-        - merged["product_cost"]
-        - merged["spend"]
+        by_channel
+        .merge(spend, on="channel", how="left")
+        .fillna({"spend": 0})
     )
+    return add_profit(merged, costs=["product_cost", "spend"], profit="net_profit")
 
-    merged["profit_margin_pct"] = merged["net_profit"]/merged["revenue"] * 100
+@memoize
+def profit_by_product(ctx: DataContext):
+    """
+    True profit by product (excluding marketing spend)
+    """
+    return product_profit(sales_by_segment(ctx))
 
-    return merged
+@memoize
+def true_profit_by_channel(ctx: DataContext):
+    """
+    Net profit by marketing channel:
+    revenue - product costs - marketing spend
+    """
+    return channel_profit(sales_by_segment(ctx), rollup(ctx, ["channel"], ["spend"]))
 
+@memoize
 def true_profit_by_region(ctx: DataContext):
     """
     Net profit by region (excluding marketing spend)
     """
-    df = ctx.sales_enriched.copy()
-
-    agg = (
-        df.groupby("region", as_index=False)
-        .agg(
-            revenue = ("revenue", "sum"),
-            total_cost = ("unit_cost", lambda x: (x * df.loc[x.index, "units_sold"]).sum())
-        )
+    return (
+        rollup(ctx, ["region"], ["revenue", "cost", "profit", "profit_margin_pct"])
+        .rename(columns={"cost": "total_cost", "profit": "net_profit"})
     )
 
-    agg["net_profit"] = agg["revenue"] - agg["total_cost"]
-    agg["profit_margin_pct"] = agg["net_profit"]/agg["revenue"] * 100
-
-    return agg
-
 def loss_making_products(ctx: DataContext):
     """
     Products with high revenue but negative profit.
@@ -0,0 +1,211 @@
+import numpy as np
+import pandas as pd
+from agent.core.context import DataContext
+from agent.core.costs import add_profit
+from agent.core.cube import TIME_GRAINS, period_labels
+from agent.core.memo import memoize
+from agent.core.periods import ROW_COLUMNS, covers, rollup_periods
+from agent.core.streaming import stream_aggregate
+from agent.analytics.executive import _latest_date
+
+# ------------------------------------------------------
+# GENERIC ROLLUP QUERY
+# ------------------------------------------------------
+# One entry point for "sum / average <measures> by <dims>" questions.
+# A request is compiled to a single groupby().agg() over the one table
+# that holds its measures (sales measures come from the cube), then
+# memoized (core/memo.py) until the context's data version changes.
+# Sums over categorical dimensions (every cube breakdown) are bincounts
+# over the combined category codes instead of a groupby.
+
+# measure -> (table, column, aggregation)
+MEASURES = {
+    # sales (pre-aggregated cube)
+    "revenue": ("cube", "revenue", "sum"),
+    "units": ("cube", "units", "sum"),
+    "cost": ("cube", "cost", "sum"),
+    # marketing
+    "spend": ("marketing", "spend", "sum"),
+    "impressions": ("marketing", "impressions", "sum"),
+    "clicks": ("marketing", "clicks", "sum"),
+    "conversions": ("marketing", "conversions", "sum"),
+    "marketing_revenue": ("marketing", "revenue", "sum"),
+    "roas": ("marketing", "roas", "mean"),
+    # inventory
+    "stockout_days": ("inventory", "stockout_date", "nunique"),
+    "avg_closing_stock": ("inventory", "closing_stock", "mean"),
+    "lost_demand": ("inventory", "lost_demand", "sum"),
+}
+
+# Measures computed from other measures after aggregation
+DERIVED_MEASURES = {
+    "profit": ("revenue", "cost"),
+    "profit_margin_pct": ("revenue", "cost"),
+}
+
+# Streaming mode: the row-level table each source is aggregated from, and
+# how source columns are named there (the cube sums sales_enriched rows)
+STREAM_SOURCES = {
+    "cube": ("sales_enriched", {"units": "units_sold", "cost": "line_cost"}),
+    "marketing": ("marketing", {}),
+    "inventory": ("inventory", {}),
+}
+
+# Columns added to streamed chunks by enrichment, not read from the CSV
+CHUNK_COLUMNS = ("unit_cost", "line_cost", "line_margin")
+
+# Largest combined key space summed with bincount instead of a groupby
+MAX_CODE_CELLS = 1 << 22
+
+# Dimensions each table can be rolled up by (plus the TIME_GRAINS)
+DIMS = {
+    "cube": ("date", "product", "region", "channel"),
+    "marketing": ("date", "channel"),
+    "inventory": ("date", "product"),
+}
+
+
+def _source(dims, measures) -> str:
+    unknown = [m for m in measures if m not in MEASURES and m not in DERIVED_MEASURES]
+    if unknown:
+        raise ValueError(f"Unknown measures: {unknown}")
+    tables = {MEASURES[m][0] for m in measures if m in MEASURES} or {"cube"}
+    if len(tables) > 1:
+        raise ValueError(f"Measures {list(measures)} come from different tables: {sorted(tables)}")
+    table = tables.pop()
+    bad = [d for d in dims if d not in DIMS[table] and d not in TIME_GRAINS]
+    if bad:
+        raise ValueError(f"{table} measures cannot be grouped by {bad}")
+    return table
+
+
+def _project_columns(dims: list, inputs: list) -> list:
+    needed = [d if d not in TIME_GRAINS else "date" for d in dims]
+    for col in inputs:
+        needed += ROW_COLUMNS[col][0] if col in ROW_COLUMNS else (col,)
+    return list(dict.fromkeys(needed))
+
+
+def _project(df: pd.DataFrame, dims: list, inputs: list) -> pd.DataFrame:
+    """Only the columns a request touches, plus its calendar labels and row-level columns."""
+    df = df[_project_columns(dims, inputs)]
+    extra = {grain: period_labels(df["date"], grain) for grain in dims if grain in TIME_GRAINS}
+    extra.update({col: ROW_COLUMNS[col][1](df) for col in inputs if col in ROW_COLUMNS})
+    return df.assign(**extra) if extra else df
+
+
+def _sum_by_codes(df: pd.DataFrame, dims: list, aggs: dict):
+    """
+    groupby(dims, observed=True).agg(**aggs) for sums over categorical
+    dimensions: one bincount per column over the combined category codes,
+    several times faster than a multi-key groupby on the cube. None when
+    it does not apply (another aggregation, a non-categorical dimension or
+    too many code combinations).
+    """
+    if not dims or any(how != "sum" for _, how in aggs.values()):
+        return None
+    dtypes = [df[d].dtype for d in dims]
+    if not all(isinstance(t, pd.CategoricalDtype) for t in dtypes):
+        return None
+    sizes = [len(t.categories) for t in dtypes]
+    if np.prod(sizes, dtype=np.float64) > MAX_CODE_CELLS:
+        return None
+
+    key = np.zeros(len(df), dtype=np.int64)
+    missing = np.zeros(len(df), dtype=bool)
+    for d, size in zip(dims, sizes):
+        codes = df[d].cat.codes.to_numpy()
+        key *= size
+        key += codes
+        missing |= codes < 0
+    # Rows with a missing dimension drop out, as with observed=True
+    valid = ~missing if missing.any() else slice(None)
+    key = key[valid]
+    cells = int(np.prod(sizes))
+    present = np.flatnonzero(np.bincount(key, minlength=cells))
+
+    out, rest = {}, present
+    for d, dtype, size in reversed(list(zip(dims, dtypes, sizes))):
+        out[d] = pd.Categorical.from_codes(rest % size, dtype=dtype)
+        rest = rest // size
+    out = {d: out[d] for d in dims}
+    for measure, (col, _) in aggs.items():
+        values = df[col].to_numpy(dtype="float64", na_value=0.0)[valid]
+        total = np.bincount(key, weights=values, minlength=cells)[present]
+        out[measure] = total.astype(df[col].dtype) if pd.api.types.is_integer_dtype(df[col].dtype) else total
+    return pd.DataFrame(out)
+
+
+def _stream(ctx: DataContext, table: str, dims: list, aggs: dict, window) -> pd.DataFrame:
+    """
+    Streaming-mode evaluation: the same aggregation over CSV chunks
+    (core/streaming.py), with dimensions cast back to the shared
+    categoricals so every mode returns the same dtypes.
+    """
+    source, columns = STREAM_SOURCES[table]
+    aggs = {m: (columns.get(col, col), how) for m, (col, how) in aggs.items()}
+    inputs = list(dict.fromkeys(col for col, _ in aggs.values()))
+
+    start = end = None
+    if window is not None:
+        end = _latest_date(ctx)
+        start = end - pd.Timedelta(days=int(window))
+    raw = [c for c in _project_columns(dims, inputs) if c not in CHUNK_COLUMNS]
+    chunks = (
+        _project(chunk, dims, inputs)
+        for chunk in ctx.stream(source, columns=raw, start=start, end=end)
+    )
+    return ctx.encode(table, stream_aggregate(chunks, dims, aggs))
+
+
+def _compute(ctx: DataContext, dims: list, measures: list, window, top_n) -> pd.DataFrame:
+    table = _source(dims, measures)
+
+    base = list(dict.fromkeys(
+        m for measure in measures
+        for m in (DERIVED_MEASURES.get(measure) or (measure,))
+    ))
+    aggs = {m: (MEASURES[m][1], MEASURES[m][2]) for m in base}
+
+    if window is None and covers(table, dims, aggs):
+        # Week / month requests roll up the held period table (core/periods.py)
+        grain = next(d for d in dims if d in TIME_GRAINS)
+        out = rollup_periods(ctx.table(f"{table}_{grain}"), dims, aggs)
+    elif ctx.streaming and table not in ctx.tables:
+        out = _stream(ctx, table, dims, aggs, window)
+    else:
+        if window is None:
+            df = ctx.table(table)
+        else:
+            df = ctx.window(table, _latest_date(ctx), int(window))
+        df = _project(df, dims, list(dict.fromkeys(col for col, _ in aggs.values())))
+        if dims:
+            out = _sum_by_codes(df, dims, aggs)
+            if out is None:
+                out = df.groupby(dims, as_index=False, observed=True).agg(**aggs)
+        else:
+            out = pd.DataFrame({m: [df[col].agg(how)] for m, (col, how) in aggs.items()})
+
+    if any(m in DERIVED_MEASURES for m in measures):
+        add_profit(out, costs=["cost"])
+    out = out[dims + measures]
+
+    if top_n is not None:
+        out = out.sort_values(measures[0], ascending=False).head(int(top_n))
+    return out
+
+
+@memoize
+def rollup(ctx: DataContext, dims=(), measures=("revenue",), window: int = None, top_n: int = None) -> pd.DataFrame:
+    """
+    Aggregates `measures` by `dims` in one pass.
+
+    dims      any of the source table's dimensions plus "month" / "week"
+    measures  names from MEASURES / DERIVED_MEASURES; all must come from one table
+    window    only the last `window` days up to the latest sales date
+    top_n     keep the `top_n` rows with the largest first measure
+
+    Output is sorted by `dims` (or by the first measure with top_n).
+    Results are memoized per DataContext version; callers get a copy.
+    """
+    return _compute(ctx, list(dims), list(measures), window, top_n)
@@ -1,67 +1,36 @@
-import pandas as pd
 from agent.core.context import DataContext
+from agent.analytics.rollup import rollup
 
 # ------------------------------------------------------
 # SALES ANALYTICS
 # ------------------------------------------------------
+# All breakdowns are rollup() queries over the pre-aggregated sales
+# cube (ctx.cube, see agent/core/cube.py), not scans of raw sales rows.
 
 def revenue_by_month(ctx: DataContext):
-    df = ctx.sales.copy()
-    df["month"] = df["date"].dt.to_period("M").astype(str)
-    return (
-        df.groupby("month", as_index=False)["revenue"]
-          .sum()
-    )
+    return rollup(ctx, ["month"], ["revenue"])
 
 def revenue_by_month_by_product(ctx: DataContext):
-    df = ctx.sales.copy()
-    df["month"] = df["date"].dt.to_period("M").astype(str)
     return (
-        df.groupby(["month", "product"], as_index=False)["revenue"]
-        .sum()
+        rollup(ctx, ["month", "product"], ["revenue"])
         .sort_values(["product", "month"])
     )
 
 
 def sales_by_region(ctx: DataContext):
-    return (
-        ctx.sales
-        .groupby("region", as_index=False)["revenue"]
-        .sum()
-    )
+    return rollup(ctx, ["region"], ["revenue"])
 
 
 def sales_by_product(ctx: DataContext):
-    return (
-        ctx.sales
-        .groupby("product", as_index=False)["revenue"]
-        .sum()
-    )
+    return rollup(ctx, ["product"], ["revenue"])
 
 def sales_by_channel(ctx: DataContext):
-    return (
-        ctx.sales
-        .groupby("channel", as_index=False)["revenue"]
-        .sum()
-    )
+    return rollup(ctx, ["channel"], ["revenue"])
 
 
 def top_regions(ctx: DataContext, n=3):
-    return (
-        sales_by_region(ctx)
-        .sort_values("revenue", ascending=False)
-        .head(n)
-    )
+    return rollup(ctx, ["region"], ["revenue"], top_n=n)
 
 
 def top_products(ctx: DataContext, n=3):
-    return (
-        sales_by_product(ctx)
-        .sort_values("revenue", ascending=False)
-        .head(n)
-    )
-
-
-
-
-
+    return rollup(ctx, ["product"], ["revenue"], top_n=n)
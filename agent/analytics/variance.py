@@ -0,0 +1,130 @@
+import numpy as np
+import pandas as pd
+from agent.core.context import DataContext
+from agent.core.cube import CUBE_DIMS
+from agent.core.memo import memoize
+from agent.analytics.executive import _latest_date
+
+# ------------------------------------------------------
+# REVENUE VARIANCE: PRICE / VOLUME / MIX
+# ------------------------------------------------------
+# Splits the revenue change between two equal periods into
+#
+#   volume  (Q1 - Q0) * p0_i * s0_i      more / fewer units at the old mix and prices
+#   mix     (s1_i - s0_i) * Q1 * p0_i    units shifting between segments
+#   price   (p1_i - p0_i) * q1_i         realized price per unit changing
+#
+# per segment i = (product, region, channel), where q is units, p is
+# revenue per unit, Q is total units and s_i = q_i / Q. The three effects
+# add up exactly to R1 - R0. Segments new in the current period are
+# valued at their current price (no price effect); segments that
+# disappeared contribute only volume and mix.
+#
+# Everything is computed from one window of the sales cube: one groupby
+# into a segments × periods table, then array arithmetic.
+
+SEGMENT_DIMS = [d for d in CUBE_DIMS if d != "date"]
+EFFECTS = ["volume_effect", "mix_effect", "price_effect"]
+
+
+def _segments(ctx: DataContext, latest, days: int) -> pd.DataFrame:
+    """Units and revenue per segment for the previous and current period (columns *_0, *_1)."""
+    cube = ctx.window("cube", latest, 2 * days)
+    current = (cube["date"] > latest - pd.Timedelta(days=days)).astype(np.int8).rename("period")
+    grouped = (
+        cube.groupby([*(cube[d] for d in SEGMENT_DIMS), current], observed=True)[["units", "revenue"]]
+        .sum()
+        .unstack("period", fill_value=0)
+    )
+    grouped.columns = [f"{measure}_{period}" for measure, period in grouped.columns]
+    for col in ("units_0", "units_1", "revenue_0", "revenue_1"):
+        if col not in grouped:
+            grouped[col] = 0
+    return grouped.reset_index()
+
+
+def _effects(seg: pd.DataFrame) -> pd.DataFrame:
+    """Adds the three effects (and their total) per segment."""
+    q0 = seg["units_0"].to_numpy(dtype="float64")
+    q1 = seg["units_1"].to_numpy(dtype="float64")
+    r0 = seg["revenue_0"].to_numpy(dtype="float64")
+    r1 = seg["revenue_1"].to_numpy(dtype="float64")
+    total_q0, total_q1 = q0.sum(), q1.sum()
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        p1 = np.where(q1 > 0, r1 / q1, 0.0)
+        p0 = np.where(q0 > 0, r0 / q0, p1)
+        s0 = q0 / total_q0 if total_q0 else np.zeros_like(q0)
+        s1 = q1 / total_q1 if total_q1 else np.zeros_like(q1)
+
+    return seg.assign(
+        volume_effect=(total_q1 - total_q0) * p0 * s0,
+        mix_effect=(s1 - s0) * total_q1 * p0,
+        price_effect=(p1 - p0) * q1,
+        revenue_change=r1 - r0,
+    )
+
+
+def _by(seg: pd.DataFrame, dim: str) -> pd.DataFrame:
+    out = (
+        seg.groupby(dim, as_index=False, observed=True)[["revenue_0", "revenue_1", "revenue_change", *EFFECTS]]
+        .sum()
+        .rename(columns={"revenue_0": "revenue_previous", "revenue_1": "revenue_current"})
+    )
+    return out.sort_values("revenue_change", key=np.abs, ascending=False, ignore_index=True)
+
+
+@memoize
+def revenue_variance(ctx: DataContext, days: int = 30):
+    """
+    Explains the revenue change between the last `days` days and the
+    `days` before them as volume, mix and price effects, in total and
+    attributed to each product, region and channel. Raises ValueError
+    when the data does not cover the whole previous period or it has no
+    sales.
+
+    Returns:
+    {
+        "current_period": {"start", "end"}, "previous_period": {"start", "end"},
+        "revenue_previous", "revenue_current", "revenue_change", "revenue_change_pct",
+        "volume_effect", "mix_effect", "price_effect",
+        "by_product": DataFrame, "by_region": DataFrame, "by_channel": DataFrame,
+    }
+    """
+    latest = _latest_date(ctx)
+    if latest is None:
+        return None
+    days = int(days)
+
+    # Effects against a previous period the data only partly covers would be meaningless
+    previous_start = latest - pd.Timedelta(days=2 * days - 1)
+    first = ctx.daily["date"].iloc[0]
+    if first > previous_start:
+        raise ValueError(
+            f"Not enough history for a {days}-day revenue variance: it needs data from "
+            f"{previous_start.date().isoformat()}, but sales start on {first.date().isoformat()}"
+        )
+    seg = _segments(ctx, latest, days)
+    if not seg["units_0"].sum():
+        raise ValueError(f"No sales in the {days} days before the last {days}; nothing to compare against")
+    seg = _effects(seg)
+    revenue_previous = float(seg["revenue_0"].sum())
+    revenue_current = float(seg["revenue_1"].sum())
+    change = revenue_current - revenue_previous
+
+    def period(end):
+        return {
+            "start": (end - pd.Timedelta(days=days - 1)).date().isoformat(),
+            "end": end.date().isoformat(),
+        }
+
+    return {
+        "current_period": period(latest),
+        "previous_period": period(latest - pd.Timedelta(days=days)),
+        "revenue_previous": revenue_previous,
+        "revenue_current": revenue_current,
+        "revenue_change": change,
+        "revenue_change_pct": change / revenue_previous * 100 if revenue_previous else None,
+        **{effect: float(seg[effect].sum()) for effect in EFFECTS},
+        **{f"by_{dim}": _by(seg, dim) for dim in SEGMENT_DIMS},
+    }
@@ -0,0 +1,85 @@
+import json
+import os
+from pathlib import Path
+
+import pandas as pd
+
+# ------------------------------------------------------
+# Columnar on-disk cache for DataContext frames
+# ------------------------------------------------------
+#
+# Each company directory gets a hidden ".cache/" folder holding
+# one Arrow (Feather) file per frame plus a small JSON sidecar:
+#
+#   data/companies/<id>/.cache/sales_enriched.feather
+#   data/companies/<id>/.cache/sales_enriched.json
+#
+# The sidecar records the (size, mtime) of every CSV the frame was
+# built from. A frame is only served from cache while all of its
+# source CSVs are byte-for-byte the same size and mtime.
+# ------------------------------------------------------
+
+CACHE_DIRNAME = ".cache"
+CACHE_FORMAT_VERSION = 4
+
+
+def file_fingerprint(path: Path):
+    """(size, mtime_ns) of a file, or None if it does not exist."""
+    try:
+        st = path.stat()
+    except FileNotFoundError:
+        return None
+    return [st.st_size, st.st_mtime_ns]
+
+
+def fingerprint(data_dir: Path, filenames) -> dict:
+    return {name: file_fingerprint(data_dir / name) for name in filenames}
+
+
+def _paths(data_dir: Path, name: str):
+    cache_dir = data_dir / CACHE_DIRNAME
+    return cache_dir / f"{name}.feather", cache_dir / f"{name}.json"
+
+
+def read_frame(data_dir: Path, name: str, sources: dict):
+    """
+    Returns the cached frame if it was built from exactly `sources`,
+    otherwise None. Any read failure is treated as a cache miss.
+    """
+    frame_path, meta_path = _paths(data_dir, name)
+    if not frame_path.exists() or not meta_path.exists():
+        return None
+
+    try:
+        with open(meta_path, "r") as f:
+            meta = json.load(f)
+        if meta.get("format") != CACHE_FORMAT_VERSION or meta.get("sources") != sources:
+            return None
+        return pd.read_feather(frame_path)
+    except Exception:
+        return None
+
+
+def write_frame(data_dir: Path, name: str, df: pd.DataFrame, sources: dict):
+    """
+    Best-effort write. The frame lands first and the sidecar last, both
+    via atomic rename, so a reader never sees a sidecar for a half-written
+    frame. Failures (read-only disk, pyarrow missing) are swallowed.
+    """
+    frame_path, meta_path = _paths(data_dir, name)
+    try:
+        frame_path.parent.mkdir(exist_ok=True)
+        meta_path.unlink(missing_ok=True)
+
+        tmp_frame = frame_path.with_suffix(f".feather.{os.getpid()}.tmp")
+        df.reset_index(drop=True).to_feather(tmp_frame)
+        os.replace(tmp_frame, frame_path)
+
+        tmp_meta = meta_path.with_suffix(f".json.{os.getpid()}.tmp")
+        with open(tmp_meta, "w") as f:
+            json.dump({"format": CACHE_FORMAT_VERSION, "sources": sources}, f)
+        os.replace(tmp_meta, meta_path)
+    except Exception:
+        for tmp in (frame_path.with_suffix(f".feather.{os.getpid()}.tmp"),
+                    meta_path.with_suffix(f".json.{os.getpid()}.tmp")):
+            tmp.unlink(missing_ok=True)
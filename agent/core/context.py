@@ -1,7 +1,17 @@
+import functools
+import threading
+import numpy as np
 import pandas as pd
 from datetime import datetime
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from pathlib import Path
+
+from agent.core import cache, partitions, periods, streaming
+from agent.core.costs import add_line_costs
+from agent.core.memo import COPY_ON_WRITE, Memo
+from agent.core.ingest import header_columns, read_typed_csv
+from agent.core.cube import CUBE_DIMS, build_cube
+
 # ------------------------------------------------------
 # Helper: load all datasets so functions can access them
 # ------------------------------------------------------
@@ -13,69 +23,813 @@ REQUIRED = {
   "unit_economics": ["product","selling_price","cogs","packaging_cost","logistics_cost"],
 }
 
+class _Table:
+    """
+    A DataContext frame that is read/derived on first access (see
+    DataContext.table). Attribute access returns a read-only view: a
+    shallow, copy-on-write copy, so adding or overwriting columns on
+    `ctx.sales` never changes the context's frame and costs no data copy.
+    Without copy-on-write (pandas 2) it returns a full copy instead.
+    """
+
+    def __set_name__(self, owner, name):
+        self.name = name
+
+    def __get__(self, ctx, owner=None):
+        if ctx is None:
+            return self
+        return ctx.table(self.name).copy(deep=not COPY_ON_WRITE)
+
+    def __set__(self, ctx, df):
+        ctx.tables[self.name] = df
+
+
 @dataclass
 class DataContext:
-    sales: pd.DataFrame
-    marketing: pd.DataFrame
-    inventory: pd.DataFrame
-    unit: pd.DataFrame
-    sales_enriched: pd.DataFrame  # sales + unit costs columns
-    daily: pd.DataFrame          # daily totals (fast baseline queries)
-
-def _read_csv(path: Path) -> pd.DataFrame:
+    """
+    Lazily materialized company data.
+
+    Base tables are read from their CSV (or the columnar cache) the first
+    time they are touched; derived tables are built from the base tables
+    they need, then memoized. An inventory-only question therefore never
+    parses or merges the sales history.
+    """
+    sales = _Table()
+    marketing = _Table()
+    inventory = _Table()
+    unit = _Table()
+    sales_enriched = _Table()    # sales + unit_cost, line_cost, line_margin
+    daily = _Table()             # daily totals (fast baseline queries)
+    cube = _Table()              # date × product × region × channel totals (core/cube.py)
+
+    data_dir: Path = None        # company folder the frames are read from
+    use_cache: bool = True       # read/write the columnar cache (core/cache.py)
+    partitioned: bool = False    # dated tables in month partitions (core/partitions.py)
+    streaming: bool = False      # aggregate large tables chunk by chunk (core/streaming.py)
+    stream_memory_mb: float = None  # chunk memory ceiling in streaming mode (default 256)
+    tables: dict = field(default_factory=dict)   # name -> materialized frame
+    sources: dict = field(default_factory=dict)  # csv -> read offset + signature
+    categories: dict = field(default_factory=dict)  # dimension -> shared sorted labels
+    date_index: dict = field(default_factory=dict)  # table -> (distinct dates, row offset of each)
+    manifests: dict = field(default_factory=dict)   # table -> partition manifest last synced
+    memo: Memo = field(default_factory=Memo, repr=False, compare=False)  # analytics results (core/memo.py)
+    version: int = 0             # bumped every time refresh() changes the data
+    _lock: threading.RLock = field(default_factory=threading.RLock, repr=False, compare=False)
+
+    def __post_init__(self):
+        if self.tables:
+            self.categories = _encode_dimensions(self.tables, self.categories)
+            self._index_dates()
+
+    # ---------------- materialization ----------------
+
+    def table(self, name: str) -> pd.DataFrame:
+        """The shared frame itself: read it, never write to it (ctx.<name> gives a view)."""
+        df = self.tables.get(name)
+        if df is not None:
+            return df
+        with self._lock:
+            if name not in self.tables:
+                self._materialize(name)
+            return self.tables[name]
+
+    def require(self, *names: str, windows=()) -> "DataContext":
+        """
+        Materialize the given tables now (e.g. the tables a tool declares it uses).
+        `windows` are tables only read through window(): in partitioned mode
+        they stay on disk and each window maps just the months it needs.
+        In streaming mode the large tables (STREAMED_TABLES) are never
+        materialized up front.
+        """
+        for name in names + (() if self.partitioned or self.streaming else tuple(windows)):
+            if not (self.streaming and name in STREAMED_TABLES):
+                self.table(name)
+        return self
+
+    def _materialize(self, name: str):
+        if name not in FRAME_SOURCES:
+            raise KeyError(f"Unknown DataContext table: {name}")
+        if self.data_dir is None:
+            if name in DERIVED_TABLES:
+                self._add(name, DERIVED_TABLES[name][1](*[self.table(n) for n in DERIVED_TABLES[name][0]]))
+                return
+            raise ValueError(f"{name} was not provided and this context has no data_dir")
+
+        if self.partitioned and name in DATED_TABLES:
+            df = self._read_partitions(name)
+            if df is not None:
+                self._add(name, df)
+                return
+
+        if self.streaming and name == "daily":
+            self._add(name, self._stream_daily())
+            return
+        if self.streaming and name in periods.PERIOD_TABLES:
+            self._add(name, self._stream_periods(name))
+            return
+
+        if name in DERIVED_TABLES:
+            inputs, build = DERIVED_TABLES[name]
+            frames = [self.table(n) for n in inputs]
+            # Key derived frames on the file state the in-memory inputs reflect
+            sources = {f: self.sources[f]["fingerprint"] for f in FRAME_SOURCES[name]}
+            df = self._read_cached(name, sources)
+            if df is None:
+                df = build(*frames)
+                self._write_cached(name, df, sources)
+        else:
+            filename = BASE_TABLES[name]
+            path = self.data_dir / filename
+            fp = cache.file_fingerprint(path)
+            df = self._read_cached(name, {filename: fp})
+            if df is not None:
+                self.sources[filename] = _source_state(path, fp[0])
+            else:
+                df = _read_csv(path, name, self.sources)
+                if df.empty:
+                    raise ValueError(f"{filename} is empty for company {self.data_dir.name}")
+                df = _prepare(name, df)
+                self._write_cached(name, df, {filename: self.sources[filename]["fingerprint"]})
+
+        self._add(name, df)
+
+    def _add(self, name: str, df: pd.DataFrame):
+        self._share({name: df})
+        self.tables[name] = df
+        if name in DATED_TABLES:
+            self._index_dates(only=name)
+
+    def share_categories(self, categories: dict) -> dict:
+        """
+        Widens this context's dimension dictionaries to include `categories`
+        (e.g. a portfolio-wide union) so frames of different companies share
+        one categorical dtype. Widening re-encodes the held frames, so it
+        starts a new data version (memoized results keyed on the old
+        dtypes are dropped). Returns the context's resulting categories.
+        """
+        with self._lock:
+            wanted = dict(self.categories)
+            for dim, labels in categories.items():
+                wanted[dim] = sorted(set(wanted.get(dim, [])) | set(labels))
+            if wanted != self.categories:
+                self.categories = _encode_dimensions(self.tables, wanted)
+                self.version += 1
+                self.memo.clear()
+            return self.categories
+
+    def encode(self, name: str, df: pd.DataFrame) -> pd.DataFrame:
+        """
+        Casts (in place) the dimension columns of `df`, a frame laid out like
+        table `name` but not held here (e.g. a streamed aggregate), to the
+        shared categoricals, widening them on new labels. Returns df.
+        """
+        with self._lock:
+            self._share({name: df})
+        return df
+
+    def _share(self, frames: dict):
+        """Encode `frames` with the shared dictionaries, widening those of held frames on new labels."""
+        categories = _encode_dimensions(frames, self.categories)
+        if categories != self.categories:
+            _encode_dimensions(self.tables, categories)
+            self.categories = categories
+
+    def _read_cached(self, name: str, sources: dict):
+        if not self.use_cache or None in sources.values() or (self.partitioned and name in DATED_TABLES):
+            return None
+        return cache.read_frame(self.data_dir, name, sources)
+
+    def _write_cached(self, name: str, df: pd.DataFrame, sources: dict):
+        if not self.use_cache or None in sources.values():
+            return
+        if self.partitioned and name in DATED_TABLES:
+            self._write_partitions(name, df)
+        else:
+            cache.write_frame(self.data_dir, name, df, sources)
+
+    # ---------------- streaming ----------------
+
+    def stream(self, name: str, columns=None, start=None, end=None):
+        """
+        Typed chunks of a base table (or sales_enriched) read straight from
+        its CSV, never the whole table: rows with date in (start, end] when
+        given, only `columns` (plus what enrichment needs) when given.
+        """
+        if name == "sales_enriched":
+            unit = self.table("unit")
+            if columns is not None:
+                columns = [c for c in dict.fromkeys([*columns, "product", "units_sold", "revenue"])
+                           if c in REQUIRED["sales"]]
+            for chunk in self.stream("sales", columns, start, end):
+                yield _enrich_sales(chunk, unit)
+            return
+        state = self._stream_state(BASE_TABLES[name])
+        if state is None:
+            return
+        path = self.data_dir / BASE_TABLES[name]
+        yield from streaming.iter_csv(path, columns, self.stream_memory_mb, start, end, limit=state["offset"])
+
+    def _stream_state(self, filename: str):
+        """
+        The read offset streamed passes over `filename` stop at. Recorded on
+        the first pass and advanced only by refresh(), so every streamed
+        result (and held daily / period table) reflects the same rows.
+        """
+        with self._lock:
+            if filename not in self.sources:
+                fp = cache.file_fingerprint(self.data_dir / filename)
+                if fp is None:
+                    return None
+                self.sources[filename] = _source_state(self.data_dir / filename, fp[0])
+            return self.sources[filename]
+
+    def _stream_daily(self) -> pd.DataFrame:
+        """ctx.daily in one chunked pass over sales.csv (cached like any derived frame)."""
+        filename = BASE_TABLES["sales"]
+        state = self._stream_state(filename)
+        if state is None:
+            raise ValueError(f"{filename} is empty for company {self.data_dir.name}")
+        df = self._read_cached("daily", {filename: state["fingerprint"]})
+        if df is None:
+            chunks = self.stream("sales", ["date", "revenue", "units_sold"])
+            df = streaming.stream_aggregate(chunks, ["date"], {
+                "revenue": ("revenue", "sum"),
+                "units": ("units_sold", "sum"),
+            })
+            if df.empty:
+                raise ValueError(f"{filename} is empty for company {self.data_dir.name}")
+            self._write_cached("daily", df, {filename: state["fingerprint"]})
+        return df
+
+    def _stream_periods(self, name: str) -> pd.DataFrame:
+        """A week / month table (core/periods.py) from per-chunk partials."""
+        source, grain = periods.PERIOD_TABLES[name]
+        filename = BASE_TABLES["sales" if source == "cube" else source]
+        state = self._stream_state(filename)
+        if state is None:
+            raise ValueError(f"{filename} is empty for company {self.data_dir.name}")
+        sources = {f: self._stream_state(f)["fingerprint"] for f in FRAME_SOURCES[name]}
+        df = self._read_cached(name, sources)
+        if df is None:
+            if source == "cube":
+                chunks = (build_cube(c) for c in self.stream("sales_enriched", list(CUBE_DIMS) + ["units_sold", "revenue"]))
+            else:
+                chunks = self.stream(source, periods.input_columns(source))
+            df = periods.combine_periods([periods.build_periods(c, source, grain) for c in chunks], source, grain)
+            self._write_cached(name, df, sources)
+        return df
+
+    def _window_stream(self, name: str, start, end) -> pd.DataFrame:
+        if name in DERIVED_TABLES:
+            inputs, build = DERIVED_TABLES[name]
+            return build(*[
+                self._window_stream(i, start, end) if i in STREAMED_TABLES else self.table(i)
+                for i in inputs
+            ])
+        chunks = list(self.stream(name, start=start, end=end))
+        df = pd.concat(chunks, ignore_index=True) if chunks else pd.DataFrame(columns=REQUIRED[name])
+        df = _prepare(name, df)
+        if not df["date"].is_monotonic_increasing:
+            df = df.sort_values("date", kind="stable", ignore_index=True)
+        with self._lock:
+            self._share({name: df})
+        return df
+
+    # ---------------- month partitions ----------------
+
+    def _write_partitions(self, name: str, df: pd.DataFrame):
+        states = {f: self.sources.get(f) for f in FRAME_SOURCES[name]}
+        if any(state is None or state["fingerprint"] is None for state in states.values()):
+            return
+        if not df["date"].is_monotonic_increasing:
+            df = df.sort_values("date", kind="stable", ignore_index=True)
+        manifest = partitions.write_months(self.data_dir, name, partitions.split_months(df), states)
+        if manifest is not None:
+            self.manifests[name] = manifest
+
+    def _sync_partitions(self, name: str):
+        """
+        The table's partition manifest, brought up to date with its CSVs.
+
+        Rows appended since the partitions were written are read from the
+        CSV tails, run through the same builders as the full table, and
+        folded into the months they land in. Returns None if there are no
+        usable partitions (never written, a CSV was rewritten, unit
+        economics changed): the caller rebuilds them from scratch.
+        """
+        if not self.use_cache:
+            return None
+        manifest = self.manifests.get(name) or partitions.read_manifest(self.data_dir, name)
+        if manifest is None:
+            return None
+
+        stale = []
+        for filename in FRAME_SOURCES[name]:
+            state = manifest["sources"].get(filename)
+            fp = cache.file_fingerprint(self.data_dir / filename)
+            if state is None or fp is None or state["fingerprint"] != fp:
+                stale.append(filename)
+        if stale:
+            manifest = self._extend_partitions(name, manifest, stale)
+
+        if manifest is None:
+            self.manifests.pop(name, None)
+        else:
+            self.manifests[name] = manifest
+        return manifest
+
+    def _extend_partitions(self, name: str, manifest: dict, stale: list):
+        appendable = {filename: base for base, filename in APPEND_ONLY_TABLES.items()}
+        if any(filename not in appendable for filename in stale):
+            return None
+
+        states = dict(manifest["sources"])
+        tails = {}
+        for filename in stale:
+            path = self.data_dir / filename
+            with open(path, "rb") as f:
+                columns = header_columns(f.readline())
+            tail = _read_appended(path, states.get(filename), columns)
+            if tail is None:
+                return None
+            tails[appendable[filename]], states[filename] = tail
+        if any(state["fingerprint"] is None for state in states.values()):
+            return None  # file still growing; rebuild once it settles
+
+        self._share(tails)
+        rows = self._tail_rows(name, tails)
+        parts = {}
+        if rows is not None and not rows.empty:
+            touched = [m for m in manifest["months"] if m >= partitions.month_key(rows["date"].min())]
+            old = partitions.read_months(self.data_dir, name, touched)
+            if old is None:
+                return None
+            merged = _fold_rows(name, self._conform(name, old), rows)
+            parts = partitions.split_months(merged)
+        return partitions.write_months(self.data_dir, name, parts, states, manifest)
+
+    def _tail_rows(self, name: str, tails: dict):
+        """Rows of `name` built only from appended base rows (None if nothing reaches it)."""
+        if name in BASE_TABLES:
+            rows = tails.get(name)
+            return rows if rows is not None and not rows.empty else None
+        inputs, build = DERIVED_TABLES[name]
+        args = []
+        for i in inputs:
+            if i in DATED_TABLES:
+                rows = self._tail_rows(i, tails)
+                if rows is None:
+                    return None
+                args.append(rows)
+            else:
+                args.append(self.table(i))
+        return build(*args)
+
+    def _conform(self, name: str, frames: list) -> pd.DataFrame:
+        """Concatenate partition frames under one shared set of dimension dictionaries."""
+        for df in frames:
+            self._share({name: df})
+        for df in frames:
+            _encode_dimensions({name: df}, self.categories)
+        return pd.concat(frames, ignore_index=True) if len(frames) > 1 else frames[0]
+
+    def _read_partitions(self, name: str):
+        manifest = self._sync_partitions(name)
+        if manifest is None or not manifest["months"]:
+            return None
+        held = {f: self.sources[f] for f in manifest["sources"] if f in self.sources}
+        if any(held[f]["offset"] != manifest["sources"][f]["offset"] for f in held):
+            return None  # partitions are ahead of frames already in memory; derive from those
+        frames = partitions.read_months(self.data_dir, name, list(manifest["months"]))
+        if frames is None:
+            return None
+        self.sources.update(manifest["sources"])
+        return self._conform(name, frames)
+
+    def _window_partitions(self, table: str, start: pd.Timestamp, end: pd.Timestamp):
+        with self._lock:
+            manifest = self._sync_partitions(table)
+        if manifest is None or not manifest["months"]:
+            return None
+        wanted = partitions.months_between(start + pd.Timedelta(days=1), end)
+        months = [m for m in wanted if m in manifest["months"]] or list(manifest["months"])[-1:]
+        frames = partitions.read_months(self.data_dir, table, months)
+        if frames is None:
+            return None
+        with self._lock:
+            return self._conform(table, frames)
+
+    def _drop(self, name: str):
+        """Forget a table and everything derived from it; rebuilt on next access."""
+        self.tables.pop(name, None)
+        self.date_index.pop(name, None)
+        if name in BASE_TABLES:
+            self.sources.pop(BASE_TABLES[name], None)
+        for derived, (inputs, _) in DERIVED_TABLES.items():
+            if name in inputs:
+                self._drop(derived)
+
+    # ---------------- memoized results ----------------
+
+    def memoized(self, key, build):
+        """
+        build()'s result for `key`, computed once per data version: the memo
+        is emptied whenever refresh() changes the data. Treat it as read-only
+        (functions decorated with core.memo.memoize hand out copies).
+        """
+        return self.memo.get_or_build(key, build)
+
+    # ---------------- windows ----------------
+
+    def window(self, table: str, end: pd.Timestamp, days: int) -> pd.DataFrame:
+        """
+        Rows of a dated table with date in (end - days, end].
+
+        Tables are kept sorted by date, so the window is resolved by binary
+        search over the precomputed date boundaries and returned as one
+        contiguous positional slice: no boolean mask, no copy. Treat the
+        result as read-only.
+
+        In partitioned mode a table not held in memory is not loaded:
+        only the month partitions overlapping the window are mapped.
+        """
+        start = end - pd.Timedelta(days=days)
+        if self.streaming and table in STREAMED_TABLES and table not in self.tables and self.data_dir is not None:
+            return self._window_stream(table, start, end)
+        if self.partitioned and table not in self.tables and self.data_dir is not None:
+            df = self._window_partitions(table, start, end)
+            if df is not None:
+                dates = df["date"].to_numpy()
+                lo = int(np.searchsorted(dates, start.to_datetime64(), side="right"))
+                hi = int(np.searchsorted(dates, end.to_datetime64(), side="right"))
+                return df.iloc[lo:hi]
+
+        df = self.table(table)
+        dates, starts = self.date_index[table]
+        lo = int(np.searchsorted(dates, start.to_datetime64(), side="right"))
+        hi = int(np.searchsorted(dates, end.to_datetime64(), side="right"))
+        row_lo = starts[lo] if lo < len(starts) else len(df)
+        row_hi = starts[hi] if hi < len(starts) else len(df)
+        return df.iloc[row_lo:row_hi]
+
+    def _index_dates(self, indexed_rows: dict = None, only: str = None):
+        """
+        Keeps every materialized dated table sorted by date and its date
+        boundaries current.
+
+        `indexed_rows` maps table -> row count already covered by the index;
+        only rows past that point are scanned when they extend the table in
+        date order. Anything else (first load, out-of-order appends) sorts
+        and re-indexes the whole table.
+        """
+        indexed_rows = indexed_rows or {}
+        for name in DATED_TABLES:
+            if name not in self.tables or (only is not None and name != only):
+                continue
+            df = self.tables[name]
+            old = indexed_rows.get(name, 0)
+            if 0 < old <= len(df) and name in self.date_index:
+                dates, starts = self.date_index[name]
+                new_dates, new_starts = _date_boundaries(df["date"].iloc[old:], base=old)
+                in_order = (
+                    df["date"].iloc[old:].is_monotonic_increasing
+                    and (not len(new_dates) or new_dates[0] >= dates[-1])
+                )
+                if in_order:
+                    if len(new_dates) and new_dates[0] == dates[-1]:
+                        new_dates, new_starts = new_dates[1:], new_starts[1:]
+                    self.date_index[name] = (
+                        np.concatenate([dates, new_dates]),
+                        np.concatenate([starts, new_starts]),
+                    )
+                    continue
+
+            if not df["date"].is_monotonic_increasing:
+                df = df.sort_values("date", kind="stable", ignore_index=True)
+                self.tables[name] = df
+            self.date_index[name] = _date_boundaries(df["date"])
+
+    # ---------------- incremental refresh ----------------
+
+    def refresh(self) -> bool:
+        """
+        Pull in rows appended to the CSVs since this context read them.
+
+        Only the appended bytes are read, parsed and enriched; the new rows
+        are then concatenated onto the materialized frames and folded into
+        `daily`. A table whose file was rewritten rather than appended to
+        (and unit economics, which are never appended) is dropped together
+        with its derived tables and re-read on next access. Tables never
+        touched are left alone: they read the current file when first used.
+
+        Returns True if the context's data changed.
+        """
+        if self.data_dir is None:
+            return False
+
+        with self._lock:
+            changed = False
+            unit_state = self.sources.get(BASE_TABLES["unit"])
+            if "unit" in self.tables and (
+                unit_state is None
+                or cache.file_fingerprint(self.data_dir / BASE_TABLES["unit"]) != unit_state["fingerprint"]
+            ):
+                self._drop("unit")
+                changed = True
+
+            appended = {}
+            for name, filename in APPEND_ONLY_TABLES.items():
+                if name in self.tables:
+                    columns = self.tables[name].columns
+                elif self.streaming and filename in self.sources:
+                    # Streamed: only the offset (and the daily / period tables built up to it) is held
+                    columns = _header(self.data_dir / filename)
+                else:
+                    continue
+                tail = _read_appended(self.data_dir / filename, self.sources.get(filename), columns)
+                if tail is None:
+                    self._drop(name)
+                    changed = True
+                elif not tail[0].empty:
+                    appended[name] = tail
+                else:
+                    self.sources[filename] = tail[1]
+
+            if appended:
+                self._append(appended)
+                changed = True
+
+            if changed:
+                self.version += 1
+                self.memo.clear()
+            return changed
+
+    def _append(self, appended: dict):
+        # Unseen labels widen the shared dictionaries first so concat keeps categoricals
+        self._share({name: rows for name, (rows, _) in appended.items()})
+
+        indexed_rows = {name: len(df) for name, df in self.tables.items()}
+        for name, (rows, state) in appended.items():
+            self.sources[APPEND_ONLY_TABLES[name]] = state
+            if name in self.tables:
+                self.tables[name] = pd.concat([self.tables[name], rows], ignore_index=True)
+
+            source = name
+            if name == "sales":
+                enriched = cube = None
+                cube_periods = self._held_periods("cube")
+                if "sales_enriched" in self.tables or "cube" in self.tables or cube_periods:
+                    enriched = _enrich_sales(rows, self.unit)
+                    cube = build_cube(enriched)
+                if "sales_enriched" in self.tables:
+                    self.tables["sales_enriched"] = pd.concat(
+                        [self.tables["sales_enriched"], enriched], ignore_index=True
+                    )
+                if "daily" in self.tables:
+                    self.tables["daily"] = _fold_rows("daily", self.tables["daily"], _daily_totals(rows))
+                    indexed_rows.pop("daily")  # re-totalled days: re-index the table
+                if "cube" in self.tables:
+                    self.tables["cube"] = _fold_rows("cube", self.tables["cube"], cube)
+                    indexed_rows.pop("cube")
+                source, rows = "cube", cube
+
+            # Week / month tables: only the periods the new days fall in are re-totalled
+            for table in self._held_periods(source):
+                grain = periods.PERIOD_TABLES[table][1]
+                self.tables[table] = _fold_rows(table, self.tables[table], periods.build_periods(rows, source, grain))
+
+        self._index_dates(indexed_rows)
+
+    def _held_periods(self, source: str) -> list:
+        return [t for t, (s, _) in periods.PERIOD_TABLES.items() if s == source and t in self.tables]
+
+# Tables with a "date" column, kept date-sorted with a boundary index
+DATED_TABLES = ("sales", "marketing", "inventory", "sales_enriched", "daily", "cube")
+
+# Tables streaming mode reads chunk by chunk instead of holding in memory
+STREAMED_TABLES = ("sales", "marketing", "inventory", "sales_enriched", "cube")
+
+def _date_boundaries(dates: pd.Series, base: int = 0):
+    """Distinct dates of a date-sorted column and the row offset where each begins."""
+    values = dates.to_numpy()
+    if not len(values):
+        return values, np.empty(0, dtype=np.int64)
+    starts = np.flatnonzero(np.concatenate(([True], values[1:] != values[:-1])))
+    return values[starts], starts + base
+
+# Tables the world engine only ever appends to (simulate_next_day / shocks)
+APPEND_ONLY_TABLES = {
+    "sales": "sales.csv",
+    "marketing": "marketing.csv",
+    "inventory": "inventory.csv",
+}
+
+# Bytes just before the read offset, kept to detect rewritten (non-appended) files
+SIGNATURE_BYTES = 64
+
+def _source_state(path: Path, offset: int) -> dict:
+    """Where a context stopped reading `path`, plus the bytes right before it."""
+    with open(path, "rb") as f:
+        f.seek(max(0, offset - SIGNATURE_BYTES))
+        signature = f.read(min(offset, SIGNATURE_BYTES))
+    fp = cache.file_fingerprint(path)
+    return {
+        "offset": offset,
+        "signature": signature.hex(),
+        # Only a fingerprint we know matches what was read (None if the file already grew)
+        "fingerprint": fp if fp is not None and fp[0] == offset else None,
+    }
+
+def _read_appended(path: Path, state: dict, columns):
+    """
+    Rows appended to `path` since `state` was recorded, as (DataFrame, new_state).
+    Returns None if the file is no longer an extension of what was read.
+    """
+    if state is None or not path.exists():
+        return None
+
+    offset = state["offset"]
+    with open(path, "rb") as f:
+        f.seek(max(0, offset - SIGNATURE_BYTES))
+        if f.read(min(offset, SIGNATURE_BYTES)).hex() != state["signature"]:
+            return None
+        chunk = f.read()
+
+    # Only consume complete lines; a half-written row is picked up next time
+    chunk = chunk[:chunk.rfind(b"\n") + 1]
+    if not chunk:
+        return pd.DataFrame(columns=columns), state
+
+    rows = read_typed_csv(chunk, names=columns)
+    return rows, _source_state(path, offset + len(chunk))
+
+def _header(path: Path) -> list:
+    with open(path, "rb") as f:
+        return header_columns(f.readline())
+
+def _read_csv(path: Path, name: str, sources: dict = None) -> pd.DataFrame:
+    """Typed read of a base table's CSV; the header is validated against REQUIRED first."""
     if not path.exists() or path.stat().st_size == 0:
         return pd.DataFrame()
-    return pd.read_csv(path)
+    raw = path.read_bytes()
+    if sources is not None:
+        sources[path.name] = _source_state(path, len(raw))
+    schema = "unit_economics" if name == "unit" else name
+    return read_typed_csv(raw, required=REQUIRED[schema], name=schema)
 
-def _validate(df: pd.DataFrame, name: str):
-    missing = [c for c in REQUIRED[name] if c not in df.columns]
-    if missing:
-        raise ValueError(f"{name} missing columns: {missing}")
+def _enrich_sales(sales: pd.DataFrame, unit: pd.DataFrame) -> pd.DataFrame:
+    """Sales rows + unit cost and the per-line cost / margin (core/costs.py)."""
+    return add_line_costs(sales.merge(unit[["product", "unit_cost"]], on="product", how="left"))
 
-def load_context(company_id: str,base_dir="data/companies") -> DataContext:
-    data_dir = Path(base_dir) / company_id
+def _daily_totals(sales: pd.DataFrame) -> pd.DataFrame:
+    return (sales.groupby("date", as_index=False)
+                 .agg(revenue=("revenue","sum"),
+                      units=("units_sold","sum")))
 
-    if not data_dir.exists():
-        raise ValueError(f"Company '{company_id}' not found at {data_dir}")
+def _extend_totals(totals: pd.DataFrame, new_totals: pd.DataFrame, keys: list) -> pd.DataFrame:
+    """
+    Fold freshly aggregated rows into an aggregate sorted by its first key
+    (date, or the period label), touching only the keys they land on.
+    """
+    on = keys[0]
+    cut = int(totals[on].searchsorted(new_totals[on].min()))
+    if cut < len(totals):
+        # Appended rows landed on dates / periods we already have: re-total those only
+        new_totals = (pd.concat([totals.iloc[cut:], new_totals])
+                        .groupby(keys, as_index=False, observed=True)
+                        .sum())
+    return pd.concat([totals.iloc[:cut], new_totals], ignore_index=True)
 
-    sales = _read_csv(data_dir / "sales.csv")
-    marketing = _read_csv(data_dir / "marketing.csv")
-    inventory = _read_csv(data_dir / "inventory.csv")
-    unit = _read_csv(data_dir / "unit_economics.csv")
+# Aggregated tables (one row per key) and their keys; new rows are re-totalled into them
+TOTALS_KEYS = {
+    "daily": ["date"],
+    "cube": list(CUBE_DIMS),
+    **{name: periods.period_keys(*spec) for name, spec in periods.PERIOD_TABLES.items()},
+}
 
-    for name, df in {
-        "sales": sales,
-        "marketing": marketing,
-        "inventory": inventory,
-        "unit": unit
-    }.items():
-        if df.empty:
-            raise ValueError(f"{name}.csv is empty for company {company_id}")
+def _fold_rows(name: str, df: pd.DataFrame, rows: pd.DataFrame) -> pd.DataFrame:
+    """Add rows built from appended data to a date-sorted table."""
+    if name in TOTALS_KEYS:
+        return _extend_totals(df, rows, TOTALS_KEYS[name])
+    merged = pd.concat([df, rows], ignore_index=True)
+    if not merged["date"].is_monotonic_increasing:
+        merged = merged.sort_values("date", kind="stable", ignore_index=True)
+    return merged
 
+# Dimension columns held as categoricals, with one dictionary per company
+# shared by every frame that carries the dimension.
+DIMENSIONS = {
+    "product": [("unit", "product"), ("sales", "product"), ("sales_enriched", "product"), ("cube", "product"), ("inventory", "product")],
+    "region": [("sales", "region"), ("sales_enriched", "region"), ("cube", "region")],
+    "channel": [("sales", "channel"), ("sales_enriched", "channel"), ("cube", "channel"), ("marketing", "channel")],
+    "stockout_flag": [("inventory", "stockout_flag")],
+}
+for _name, (_source, _) in periods.PERIOD_TABLES.items():
+    for _dim in periods.PERIOD_SOURCES[_source][0]:
+        DIMENSIONS[_dim].append((_name, _dim))
 
-    _validate(sales, "sales")
-    _validate(marketing, "marketing")
-    _validate(inventory, "inventory")
-    _validate(unit, "unit_economics")
+def _encode_dimensions(frames: dict, categories: dict = None) -> dict:
+    """
+    Casts every dimension column in `frames` (in place) to a categorical
+    whose categories are the union of `categories` and the labels seen.
 
-    # Parse dates ONCE
-    sales["date"] = pd.to_datetime(sales["date"])
-    marketing["date"] = pd.to_datetime(marketing["date"])
-    inventory["date"] = pd.to_datetime(inventory["date"])
+    Categories are kept sorted so groupby/sort order on the codes matches
+    plain string order and downstream outputs are unchanged.
+    Returns the updated categories.
+    """
+    categories = dict(categories or {})
+    for dim, columns in DIMENSIONS.items():
+        present = [(frames[name], col) for name, col in columns
+                   if name in frames and col in frames[name].columns]
+        labels = set(categories.get(dim, []))
+        for df, col in present:
+            labels.update(df[col].dropna().unique())
+        categories[dim] = sorted(labels)
 
-    # Enrich sales with unit costs ONCE (avoid repeated merges)
-    unit = unit.copy()
-    unit["unit_cost"] = unit["cogs"] + unit["packaging_cost"] + unit["logistics_cost"]
-    sales_enriched = sales.merge(unit[["product", "unit_cost"]], on="product", how="left")
+        dtype = pd.CategoricalDtype(categories[dim])
+        for df, col in present:
+            df[col] = df[col].astype(dtype)
+    return categories
+
+def _prepare(name: str, df: pd.DataFrame) -> pd.DataFrame:
+    """One-time conversions on a freshly parsed (typed, validated) base table."""
+    if name == "unit":
+        df["unit_cost"] = df["cogs"] + df["packaging_cost"] + df["logistics_cost"]
+    return df
+
+# Base tables and the CSV each one is read from
+BASE_TABLES = {
+    "sales": "sales.csv",
+    "marketing": "marketing.csv",
+    "inventory": "inventory.csv",
+    "unit": "unit_economics.csv",
+}
 
+# Derived tables: (input tables, builder)
+DERIVED_TABLES = {
+    # Enrich sales with unit costs ONCE (avoid repeated merges)
+    "sales_enriched": (("sales", "unit"), _enrich_sales),
     # Daily totals table (fast baseline + anomalies)
-    daily = (sales.groupby("date", as_index=False)
-                  .agg(revenue=("revenue","sum"),
-                       units=("units_sold","sum")))
+    "daily": (("sales",), _daily_totals),
+    # Pre-aggregated sales cube every sales/profit breakdown rolls up from
+    "cube": (("sales_enriched",), build_cube),
+    # Week / month partial aggregates (core/periods.py), e.g. "cube_month"
+    **{
+        name: ((source,), lambda df, source=source, grain=grain: periods.build_periods(df, source, grain))
+        for name, (source, grain) in periods.PERIOD_TABLES.items()
+    },
+}
 
-    return DataContext(
-        sales=sales, marketing=marketing, inventory=inventory, unit=unit,
-        sales_enriched=sales_enriched, daily=daily
-    )
+# Which CSVs each DataContext frame is built from (cache invalidation keys)
+def _source_files(name: str) -> set:
+    if name in BASE_TABLES:
+        return {BASE_TABLES[name]}
+    return set().union(*(_source_files(i) for i in DERIVED_TABLES[name][0]))
+
+FRAME_SOURCES = {name: sorted(_source_files(name)) for name in [*BASE_TABLES, *DERIVED_TABLES]}
+SOURCE_FILES = sorted(BASE_TABLES.values())
+ALL_TABLES = tuple(FRAME_SOURCES)
+
+def _frames_as_tables(init):
+    """
+    Keeps the eager constructor working: frames passed by table name
+    (DataContext(sales=..., marketing=..., ...)) go into `tables`, next
+    to any given as `tables`.
+    """
+    @functools.wraps(init)
+    def __init__(self, *args, tables=None, **kwargs):
+        frames = {name: kwargs.pop(name) for name in ALL_TABLES if name in kwargs}
+        # Frames built by the old loader carry unit_cost but not the per-line costs
+        enriched = frames.get("sales_enriched")
+        if enriched is not None and "line_cost" not in enriched and "unit_cost" in enriched:
+            frames["sales_enriched"] = add_line_costs(enriched.copy())
+        init(self, *args, tables={**(tables or {}), **frames}, **kwargs)
+    return __init__
+
+DataContext.__init__ = _frames_as_tables(DataContext.__init__)
 
+def load_context(company_id: str, base_dir="data/companies", use_cache: bool = True, tables=(),
+                 partitioned: bool = False, streaming: bool = False, stream_memory_mb: float = None) -> DataContext:
+    """
+    Returns a lazily loaded DataContext for a company.
 
+    Nothing is read until a table is accessed; pass `tables` (e.g.
+    ALL_TABLES) to materialize some up front. Validation errors for a
+    table surface when that table is first materialized. `partitioned`
+    stores dated tables as memory-mapped month partitions, so windows
+    over long histories only read the months they touch. `streaming`
+    evaluates roll-ups and windows over the large tables by reading the
+    CSVs in chunks under a `stream_memory_mb` ceiling (core/streaming.py).
+    """
+    data_dir = Path(base_dir) / company_id
+
+    if not data_dir.exists():
+        raise ValueError(f"Company '{company_id}' not found at {data_dir}")
+
+    return DataContext(
+        data_dir=data_dir,
+        use_cache=use_cache,
+        partitioned=partitioned,
+        streaming=streaming,
+        stream_memory_mb=stream_memory_mb,
+    ).require(*tables)
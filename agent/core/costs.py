@@ -0,0 +1,49 @@
+import pandas as pd
+
+# ------------------------------------------------------
+# Vectorized cost / profit engine
+# ------------------------------------------------------
+#
+# Product cost is computed once per order line when sales are enriched
+# (line_cost = unit_cost * units_sold, line_margin = revenue - line_cost),
+# so every downstream breakdown sums a column instead of multiplying
+# per group. add_profit() is the single place profit and margin columns
+# are derived from summed revenue and cost columns.
+# ------------------------------------------------------
+
+def add_line_costs(df: pd.DataFrame) -> pd.DataFrame:
+    """Adds line_cost / line_margin to sales rows carrying unit_cost (in place)."""
+    df["line_cost"] = df["unit_cost"] * df["units_sold"]
+    df["line_margin"] = df["revenue"] - df["line_cost"]
+    return df
+
+
+def add_profit(
+    df: pd.DataFrame,
+    costs=("total_cost",),
+    revenue: str = "revenue",
+    profit: str = "profit",
+    margin: str = "profit_margin_pct",
+    missing_as_zero: bool = False,
+) -> pd.DataFrame:
+    """
+    Adds `profit` = revenue - sum(costs) and `margin` = profit / revenue * 100
+    to an aggregated frame (in place).
+
+    With `missing_as_zero` (frames built by left merges), missing revenue
+    or costs count as 0 in the profit and a zero/missing revenue gives a
+    missing margin instead of ±inf.
+    """
+    rev = df[revenue]
+    cost_terms = [df[c] for c in costs]
+    if missing_as_zero:
+        rev = rev.fillna(0)
+        cost_terms = [c.fillna(0) for c in cost_terms]
+
+    result = rev
+    for cost in cost_terms:
+        result = result - cost
+    df[profit] = result
+    denominator = df[revenue].where(df[revenue] != 0) if missing_as_zero else df[revenue]
+    df[margin] = df[profit] / denominator * 100
+    return df
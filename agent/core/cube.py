@@ -0,0 +1,43 @@
+import pandas as pd
+
+# ------------------------------------------------------
+# Sales cube: date × product × region × channel
+# ------------------------------------------------------
+#
+# One compact pre-aggregated table built from sales_enriched, holding
+# revenue, units and product cost per (date, product, region, channel).
+# Every sales / profit breakdown is a roll-up of this table
+# (analytics/rollup.py) instead of a fresh scan of the raw order rows.
+#
+# The cube is a derived DataContext table ("cube"): built on first use,
+# cached on disk next to the other frames, kept date-sorted with a date
+# index (so ctx.window("cube", ...) works) and extended in place when
+# refresh() appends days.
+# ------------------------------------------------------
+
+CUBE_DIMS = ("date", "product", "region", "channel")
+
+# Calendar grains that can be used in `by` alongside the dimensions
+TIME_GRAINS = {
+    "month": "M",
+    "week": "W",
+}
+
+
+def period_labels(dates: pd.Series, grain: str) -> pd.Series:
+    """Period label per row, formatted once per distinct date rather than per row."""
+    distinct = pd.Series(dates.unique())
+    labels = distinct.dt.to_period(TIME_GRAINS[grain]).astype(str)
+    return dates.map(dict(zip(distinct, labels)))
+
+
+def build_cube(sales_enriched: pd.DataFrame) -> pd.DataFrame:
+    return (
+        sales_enriched[list(CUBE_DIMS) + ["revenue", "units_sold", "line_cost"]]
+        .groupby(list(CUBE_DIMS), as_index=False, observed=True)
+        .agg(
+            revenue=("revenue", "sum"),
+            units=("units_sold", "sum"),
+            cost=("line_cost", "sum"),
+        )
+    )
@@ -0,0 +1,104 @@
+import io
+
+import pandas as pd
+
+# ------------------------------------------------------
+# Typed CSV ingestion
+# ------------------------------------------------------
+#
+# Every column the agent reads has an explicit, compact dtype, so
+# pandas never has to infer types and no object-dtype column survives
+# the read:
+#
+#   - dimensions           -> category
+#   - counts / stock       -> int32
+#   - money                -> float64 (sums must match to the paisa)
+#   - per-row CAC          -> float32 (never summed, only displayed)
+#   - date                 -> datetime64, parsed with a fixed ISO format
+#
+# The header is checked against REQUIRED before the body is parsed,
+# so schema validation costs nothing extra. Large files go through
+# pandas' multi-threaded pyarrow engine when pyarrow is installed.
+# ------------------------------------------------------
+
+COLUMN_TYPES = {
+    "date": "date",
+    # dimensions
+    "product": "category",
+    "region": "category",
+    "channel": "category",
+    "stockout_flag": "category",
+    # counts / stock
+    "units_sold": "int32",
+    "impressions": "int32",
+    "clicks": "int32",
+    "conversions": "int32",
+    "opening_stock": "int32",
+    "units_produced": "int32",
+    "units_dispatched": "int32",
+    "closing_stock": "int32",
+    "lost_demand": "int32",
+    # money
+    "revenue": "float64",
+    "spend": "float64",
+    "selling_price": "float64",
+    "cogs": "float64",
+    "gross_margin": "float64",
+    "packaging_cost": "float64",
+    "logistics_cost": "float64",
+    "CAC": "float32",
+}
+
+# Below this size the C parser wins; pyarrow's thread pool start-up dominates
+PYARROW_MIN_BYTES = 8 * 1024 * 1024
+
+try:
+    import pyarrow  # noqa: F401
+    HAS_PYARROW = True
+except ImportError:
+    HAS_PYARROW = False
+
+
+def header_columns(raw: bytes) -> list:
+    """Column names from the first line of a CSV buffer."""
+    first = raw[:raw.find(b"\n")] if b"\n" in raw else raw
+    return [c.strip().strip('"') for c in first.decode("utf-8-sig").strip().split(",")]
+
+
+def validate_columns(columns, required, name: str):
+    missing = [c for c in required if c not in columns]
+    if missing:
+        raise ValueError(f"{name} missing columns: {missing}")
+
+
+def read_typed_csv(raw: bytes, required=(), name: str = "csv", names=None) -> pd.DataFrame:
+    """
+    Parses a CSV buffer with the explicit dtype map above.
+
+    `names` reads a header-less chunk (e.g. rows appended since the last
+    read) with the given columns. Otherwise the header line is validated
+    against `required` before the body is parsed. Columns not in
+    COLUMN_TYPES fall back to pandas inference.
+    """
+    columns = list(names) if names is not None else header_columns(raw)
+    validate_columns(columns, required, name)
+
+    dtype = {c: COLUMN_TYPES[c] for c in columns if COLUMN_TYPES.get(c) not in (None, "date")}
+    dates = [c for c in columns if COLUMN_TYPES.get(c) == "date"]
+    engine = "pyarrow" if HAS_PYARROW and len(raw) >= PYARROW_MIN_BYTES else "c"
+
+    kwargs = dict(dtype=dtype, engine=engine)
+    if names is not None:
+        kwargs.update(header=None, names=columns)
+    try:
+        df = pd.read_csv(io.BytesIO(raw), **kwargs)
+    except ValueError:
+        # e.g. blank values in an int32 column: keep the schema check, infer that column
+        kwargs["dtype"] = {c: t for c, t in dtype.items() if not t.startswith("int")}
+        df = pd.read_csv(io.BytesIO(raw), **kwargs)
+
+    # Parsing after the read with a fixed format beats read_csv(parse_dates=...)
+    # on both engines, and gives the same datetime unit whichever engine ran
+    for c in dates:
+        df[c] = pd.to_datetime(df[c], format="ISO8601")
+    return df
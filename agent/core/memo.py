@@ -0,0 +1,125 @@
+import functools
+import inspect
+import os
+import threading
+from collections import OrderedDict
+
+import pandas as pd
+
+# ------------------------------------------------------
+# Versioned memoization of analytics results
+# ------------------------------------------------------
+#
+# Every DataContext owns a Memo. Functions decorated with @memoize
+# (analytics / interpretation primitives taking the context first)
+# are cached under
+#
+#   (function, bound arguments, ctx.version)
+#
+# so profit_by_product(CTX) runs once per data version, however many
+# tools ask for it in a turn. refresh() bumps the version and clears
+# the memo when new days arrive. Entries are kept in LRU order and
+# capped at AUTO_MEMO_MAX_ENTRIES (default 256).
+# ------------------------------------------------------
+
+DEFAULT_MAX_ENTRIES = 256
+
+# A shallow copy is an independent frame only under copy-on-write, which
+# is always on from pandas 3. On pandas 2 frames are copied in full
+# rather than switching the option on for the whole process.
+COPY_ON_WRITE = int(pd.__version__.split(".")[0]) >= 3
+
+
+def _default_max_entries() -> int:
+    return int(os.environ.get("AUTO_MEMO_MAX_ENTRIES", DEFAULT_MAX_ENTRIES))
+
+
+class Memo:
+    def __init__(self, max_entries: int = None):
+        self.max_entries = _default_max_entries() if max_entries is None else int(max_entries)
+        self._entries = OrderedDict()
+        self._lock = threading.RLock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get_or_build(self, key, build):
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return self._entries[key]
+            self.misses += 1
+            value = build()
+            self._entries[key] = value
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+            return value
+
+    def __contains__(self, key):
+        return key in self._entries
+
+    def __len__(self):
+        return len(self._entries)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        return {
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+        }
+
+
+def _freeze(value):
+    """Hashable stand-in for an argument value (lists -> tuples, dicts -> sorted items)."""
+    if isinstance(value, (list, tuple)):
+        return tuple(_freeze(v) for v in value)
+    if isinstance(value, dict):
+        return tuple(sorted((k, _freeze(v)) for k, v in value.items()))
+    if isinstance(value, set):
+        return frozenset(_freeze(v) for v in value)
+    return value
+
+
+def _copy(value):
+    """
+    Callers get their own frame objects, so mutating a result never alters
+    the memo. Shallow copies suffice under copy-on-write (COPY_ON_WRITE).
+    """
+    if isinstance(value, (pd.DataFrame, pd.Series)):
+        return value.copy(deep=not COPY_ON_WRITE)
+    if isinstance(value, dict):
+        return {k: _copy(v) for k, v in value.items()}
+    if isinstance(value, list):
+        return [_copy(v) for v in value]
+    return value
+
+
+def memoize(func):
+    """
+    Caches func(ctx, ...) in ctx.memo per data version. Arguments are
+    bound against the signature (so f(ctx) and f(ctx, n=7) share an
+    entry); calls with unhashable arguments simply run uncached.
+    """
+    signature = inspect.signature(func)
+    name = f"{func.__module__}.{func.__qualname__}"
+
+    @functools.wraps(func)
+    def wrapper(ctx, *args, **kwargs):
+        bound = signature.bind(ctx, *args, **kwargs)
+        bound.apply_defaults()
+        key = (name, ctx.version, _freeze(list(bound.arguments.items())[1:]))
+        try:
+            hash(key)
+        except TypeError:
+            return func(ctx, *args, **kwargs)
+        return _copy(ctx.memoized(key, lambda: func(ctx, *args, **kwargs)))
+
+    return wrapper
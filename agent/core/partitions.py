@@ -0,0 +1,133 @@
+import json
+import os
+import shutil
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from agent.core.cache import CACHE_DIRNAME
+
+# ------------------------------------------------------
+# Month-partitioned, memory-mapped storage for dated frames
+# ------------------------------------------------------
+#
+# In partitioned mode (load_context(..., partitioned=True)) every dated
+# DataContext frame is stored as one uncompressed Arrow IPC file per
+# calendar month plus a manifest:
+#
+#   data/companies/<id>/.cache/parts/sales/2024-01.arrow
+#   data/companies/<id>/.cache/parts/sales/2024-02.arrow
+#   data/companies/<id>/.cache/parts/sales/manifest.json
+#
+# Partitions are opened with mmap, so reading a window only pages in
+# the months it overlaps. The manifest records, per source CSV, the
+# read offset / signature the partitions reflect (see
+# context._source_state); appended rows therefore only rewrite the
+# months they land in.
+#
+# Like core/cache.py this is best-effort: without pyarrow, or on a
+# read-only disk, nothing is written and the context falls back to
+# reading the CSVs.
+# ------------------------------------------------------
+
+PARTS_DIRNAME = "parts"
+PARTITION_FORMAT_VERSION = 2
+
+try:
+    import pyarrow as pa
+except ImportError:
+    pa = None
+
+
+def _dir(data_dir: Path, name: str) -> Path:
+    return data_dir / CACHE_DIRNAME / PARTS_DIRNAME / name
+
+
+def month_key(date) -> str:
+    return pd.Timestamp(date).strftime("%Y-%m")
+
+
+def months_between(start, end) -> list:
+    """Month keys from the month of `start` to the month of `end`, inclusive."""
+    return [p.strftime("%Y-%m") for p in pd.period_range(pd.Timestamp(start), pd.Timestamp(end), freq="M")]
+
+
+def split_months(df: pd.DataFrame) -> dict:
+    """Month key -> rows of a date-sorted frame, as positional slices."""
+    months = df["date"].to_numpy().astype("datetime64[M]")
+    if not len(months):
+        return {}
+    starts = np.flatnonzero(np.concatenate(([True], months[1:] != months[:-1])))
+    bounds = np.append(starts, len(df))
+    return {
+        str(months[lo])[:7]: df.iloc[lo:hi]
+        for lo, hi in zip(bounds[:-1], bounds[1:])
+    }
+
+
+def read_manifest(data_dir: Path, name: str):
+    try:
+        with open(_dir(data_dir, name) / "manifest.json", "r") as f:
+            manifest = json.load(f)
+    except Exception:
+        return None
+    if manifest.get("format") != PARTITION_FORMAT_VERSION:
+        return None
+    return manifest
+
+
+def read_months(data_dir: Path, name: str, months) -> list:
+    """Memory-maps the given month partitions; returns one frame per month (None if unreadable)."""
+    frames = []
+    for month in months:
+        try:
+            with pa.memory_map(str(_dir(data_dir, name) / f"{month}.arrow"), "r") as source:
+                frames.append(pa.ipc.open_file(source).read_all().to_pandas(split_blocks=True))
+        except Exception:
+            return None
+    return frames
+
+
+def write_months(data_dir: Path, name: str, parts: dict, sources: dict, manifest: dict = None):
+    """
+    Writes `parts` (month key -> frame) and a manifest for the table.
+
+    With `manifest`, only the given months are rewritten and the other
+    partitions it lists are kept; without it the table's partitions are
+    replaced wholesale. Returns the new manifest, or None on failure.
+    """
+    if pa is None:
+        return None
+    part_dir = _dir(data_dir, name)
+    manifest_path = part_dir / "manifest.json"
+    try:
+        if manifest is None and part_dir.exists():
+            shutil.rmtree(part_dir)
+        part_dir.mkdir(parents=True, exist_ok=True)
+        manifest_path.unlink(missing_ok=True)
+
+        months = dict(manifest["months"]) if manifest else {}
+        for month, df in parts.items():
+            table = pa.Table.from_pandas(df.reset_index(drop=True), preserve_index=False)
+            path = part_dir / f"{month}.arrow"
+            tmp = path.with_suffix(f".arrow.{os.getpid()}.tmp")
+            with pa.OSFile(str(tmp), "wb") as sink, pa.ipc.new_file(sink, table.schema) as writer:
+                writer.write_table(table)
+            os.replace(tmp, path)
+            months[month] = len(df)
+
+        manifest = {
+            "format": PARTITION_FORMAT_VERSION,
+            "sources": sources,
+            "months": dict(sorted(months.items())),
+        }
+        tmp = manifest_path.with_suffix(f".json.{os.getpid()}.tmp")
+        with open(tmp, "w") as f:
+            json.dump(manifest, f)
+        os.replace(tmp, manifest_path)
+        return manifest
+    except Exception:
+        for tmp in part_dir.glob(f"*.{os.getpid()}.tmp"):
+            tmp.unlink(missing_ok=True)
+        return None
@@ -0,0 +1,133 @@
+import pandas as pd
+
+from agent.core.cube import TIME_GRAINS, period_labels
+
+# ------------------------------------------------------
+# Week / month rollup tables
+# ------------------------------------------------------
+#
+# For the sales cube, marketing and inventory the context can hold one
+# table per calendar grain ("cube_month", "marketing_week", ...) with
+# partial aggregates per (period, dimensions):
+#
+#   <col>__sum      running sum            (sum / mean measures)
+#   <col>__count    non-null row count     (mean measures)
+#   <col>__nunique  distinct values        (nunique measures)
+#
+# Rolling these up to any subset of the dimensions is a plain sum over a
+# few hundred rows; the period labels are formatted once when the table
+# is built. They are DataContext derived tables: cached on disk, and
+# extended in place by refresh() (only the periods new days land in are
+# re-totalled), never rebuilt for appended days.
+# ------------------------------------------------------
+
+# Row-level columns some measures aggregate: (input columns, builder)
+ROW_COLUMNS = {
+    "roas": (("revenue", "spend"), lambda df: df["revenue"] / df["spend"].where(df["spend"] != 0)),
+    "stockout_date": (("date", "stockout_flag"), lambda df: df["date"].where(df["stockout_flag"] == "Yes")),
+}
+
+# source table -> (dimensions, {column: aggregation})
+PERIOD_SOURCES = {
+    "cube": (("product", "region", "channel"), {
+        "revenue": "sum", "units": "sum", "cost": "sum",
+    }),
+    "marketing": (("channel",), {
+        "spend": "sum", "impressions": "sum", "clicks": "sum", "conversions": "sum",
+        "revenue": "sum", "roas": "mean",
+    }),
+    "inventory": (("product",), {
+        "closing_stock": "mean", "lost_demand": "sum", "stockout_date": "nunique",
+    }),
+}
+
+# table name -> (source, grain), e.g. "cube_month" -> ("cube", "month")
+PERIOD_TABLES = {
+    f"{source}_{grain}": (source, grain)
+    for source in PERIOD_SOURCES for grain in TIME_GRAINS
+}
+
+
+def period_keys(source: str, grain: str) -> list:
+    return [grain, *PERIOD_SOURCES[source][0]]
+
+
+def partial_columns(col: str, how: str) -> list:
+    """The partial-aggregate columns an aggregation of `col` is stored as."""
+    return [f"{col}__sum", f"{col}__count"] if how == "mean" else [f"{col}__{how}"]
+
+
+def input_columns(source: str) -> list:
+    """Source columns build_periods reads."""
+    dims, columns = PERIOD_SOURCES[source]
+    needed = ["date", *dims]
+    for col in columns:
+        needed += ROW_COLUMNS[col][0] if col in ROW_COLUMNS else (col,)
+    return list(dict.fromkeys(needed))
+
+
+def build_periods(df: pd.DataFrame, source: str, grain: str) -> pd.DataFrame:
+    """Partial aggregates of `df` (rows of `source`) per (period, dimensions)."""
+    dims, columns = PERIOD_SOURCES[source]
+    extra = {grain: period_labels(df["date"], grain)}
+    extra.update({col: ROW_COLUMNS[col][1](df) for col in columns if col in ROW_COLUMNS})
+    aggs = {}
+    for col, how in columns.items():
+        for name in partial_columns(col, how):
+            aggs[name] = (col, name.rsplit("__", 1)[1])
+    return (
+        df.assign(**extra)
+        .groupby(period_keys(source, grain), as_index=False, observed=True)
+        .agg(**aggs)
+    )
+
+
+def combine_periods(frames: list, source: str, grain: str) -> pd.DataFrame:
+    """
+    Sums partial tables built from disjoint row sets (e.g. streamed chunks).
+    Distinct counts add up because each (date, dimensions) row lands in
+    exactly one chunk.
+    """
+    keys = period_keys(source, grain)
+    if not frames:
+        columns = [n for col, how in PERIOD_SOURCES[source][1].items() for n in partial_columns(col, how)]
+        return pd.DataFrame(columns=keys + columns)
+    frames = [f.astype({k: "object" for k in keys if isinstance(f[k].dtype, pd.CategoricalDtype)}) for f in frames]
+    return pd.concat(frames, ignore_index=True).groupby(keys, as_index=False).sum()
+
+
+def covers(source: str, dims: list, aggs: dict) -> bool:
+    """
+    Whether `aggs` ({measure: (column, how)}) by `dims` can be rolled up
+    from the source's period table: exactly one grain, no other
+    dimensions than the table's, every column stored with the same
+    aggregation, and distinct counts only at full dimension detail.
+    """
+    if source not in PERIOD_SOURCES:
+        return False
+    table_dims, columns = PERIOD_SOURCES[source]
+    grains = [d for d in dims if d in TIME_GRAINS]
+    rest = [d for d in dims if d not in TIME_GRAINS]
+    if len(grains) != 1 or not set(rest) <= set(table_dims):
+        return False
+    for col, how in aggs.values():
+        if columns.get(col) != how:
+            return False
+        if how == "nunique" and set(rest) != set(table_dims):
+            return False
+    return True
+
+
+def rollup_periods(table: pd.DataFrame, dims: list, aggs: dict) -> pd.DataFrame:
+    """Evaluates `aggs` by `dims` from a period table (see covers)."""
+    needed = list(dict.fromkeys(n for col, how in aggs.values() for n in partial_columns(col, how)))
+    grouped = table.groupby(dims, as_index=False, observed=True)[needed].sum()
+    out = grouped[dims]
+    values = {}
+    for measure, (col, how) in aggs.items():
+        if how == "mean":
+            count = grouped[f"{col}__count"]
+            values[measure] = grouped[f"{col}__sum"] / count.where(count != 0)
+        else:
+            values[measure] = grouped[f"{col}__{how}"]
+    return out.assign(**values)
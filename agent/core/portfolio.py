@@ -0,0 +1,86 @@
+import os
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from agent.core.context import ALL_TABLES, DataContext
+from agent.core.registry import get_context
+
+# ------------------------------------------------------
+# Portfolio: every company under data/companies at once
+# ------------------------------------------------------
+#
+# Companies are loaded concurrently on a thread pool (CSV parsing and
+# Arrow cache reads release the GIL), through the process-wide context
+# registry so the warmed contexts are the same ones agent turns use.
+# Once loaded, every company's dimension dictionaries are widened to
+# the portfolio-wide union so frames share one categorical dtype and
+# can be stacked without falling back to object columns.
+# ------------------------------------------------------
+
+
+def list_companies(base_dir="data/companies") -> list:
+    root = Path(base_dir)
+    if not root.exists():
+        return []
+    return sorted(d.name for d in root.iterdir() if d.is_dir() and not d.name.startswith("."))
+
+
+@dataclass
+class PortfolioContext:
+    companies: dict                                   # company_id -> DataContext
+    categories: dict = field(default_factory=dict)    # dimension -> labels shared by all companies
+
+    def __getitem__(self, company_id: str) -> DataContext:
+        return self.companies[company_id]
+
+    @property
+    def company_ids(self) -> list:
+        return list(self.companies)
+
+    def table(self, name: str) -> pd.DataFrame:
+        """One table stacked across companies, with a categorical "company" column first."""
+        frames = [ctx.table(name) for ctx in self.companies.values()]
+        stacked = pd.concat(frames, ignore_index=True)
+        stacked.insert(
+            0, "company",
+            pd.Categorical.from_codes(
+                np.repeat(np.arange(len(frames)), [len(df) for df in frames]),
+                categories=self.company_ids,
+            ),
+        )
+        return stacked
+
+
+def _load_one(company_id: str, base_dir, tables) -> DataContext:
+    return get_context(company_id, base_dir=base_dir).require(*tables)
+
+
+def load_portfolio(base_dir="data/companies", company_ids=None, tables=ALL_TABLES,
+                   max_workers: int = None) -> PortfolioContext:
+    """
+    Loads (or re-uses from the registry) every company concurrently and
+    returns them as one PortfolioContext. Wall time is roughly that of the
+    largest company rather than the sum.
+    """
+    company_ids = list_companies(base_dir) if company_ids is None else list(company_ids)
+    if not company_ids:
+        return PortfolioContext(companies={})
+
+    workers = max_workers or min(len(company_ids), os.cpu_count() or 1, 8)
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        contexts = list(pool.map(lambda cid: _load_one(cid, base_dir, tables), company_ids))
+    companies = dict(zip(company_ids, contexts))
+
+    shared = {}
+    for ctx in contexts:
+        for dim, labels in ctx.categories.items():
+            shared.setdefault(dim, set()).update(labels)
+    shared = {dim: sorted(labels) for dim, labels in shared.items()}
+    for ctx in contexts:
+        ctx.share_categories(shared)
+
+    return PortfolioContext(companies=companies, categories=shared)
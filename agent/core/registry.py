@@ -0,0 +1,126 @@
+import os
+import threading
+from collections import OrderedDict
+from pathlib import Path
+
+from agent.core import cache
+from agent.core.context import DataContext, SOURCE_FILES, load_context
+
+# ------------------------------------------------------
+# Process-wide registry of warm DataContext objects
+# ------------------------------------------------------
+#
+# Every agent turn asks for the company's context. Instead of
+# reloading it, the registry hands back the context it already holds
+# as long as the company's CSVs still have the same (size, mtime)
+# fingerprint. Only when the world engine appends days (simulate /
+# shock injectors) does the fingerprint change; the held context is
+# then refreshed in place from the appended rows (DataContext.refresh).
+#
+# Contexts are kept in LRU order and evicted once their combined
+# in-memory size exceeds the budget. The most recently used context
+# is never evicted, even if it alone is over budget.
+# ------------------------------------------------------
+
+DEFAULT_MAX_MB = 512
+
+
+def _default_max_bytes() -> int:
+    return int(float(os.environ.get("AUTO_CONTEXT_CACHE_MB", DEFAULT_MAX_MB)) * 1024 * 1024)
+
+
+def _default_partitioned() -> bool:
+    # AUTO_PARTITIONED_STORAGE=1 keeps dated tables in month partitions (core/partitions.py)
+    return os.environ.get("AUTO_PARTITIONED_STORAGE", "0").lower() in ("1", "true", "yes")
+
+
+def _default_streaming() -> bool:
+    # AUTO_STREAMING=1 aggregates the large dated tables out of core (core/streaming.py)
+    return os.environ.get("AUTO_STREAMING", "0").lower() in ("1", "true", "yes")
+
+
+def context_nbytes(ctx: DataContext) -> int:
+    """Deep in-memory size of every frame the context has materialized."""
+    return sum(int(df.memory_usage(deep=True).sum()) for df in list(ctx.tables.values()))
+
+
+class ContextRegistry:
+    def __init__(self, max_bytes: int = None, partitioned: bool = None, streaming: bool = None):
+        self.max_bytes = _default_max_bytes() if max_bytes is None else int(max_bytes)
+        self.partitioned = _default_partitioned() if partitioned is None else partitioned
+        self.streaming = _default_streaming() if streaming is None else streaming
+        self._entries = OrderedDict()   # (base_dir, company_id) -> (fingerprint, ctx, nbytes)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.loads = 0
+        self.refreshes = 0
+        self.evictions = 0
+
+    def get(self, company_id: str, base_dir="data/companies") -> DataContext:
+        key = (str(Path(base_dir).resolve()), company_id)
+        fp = cache.fingerprint(Path(base_dir) / company_id, SOURCE_FILES)
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] == fp:
+                # Tables materialized lazily since the last visit count towards the budget
+                self._entries[key] = (fp, entry[1], context_nbytes(entry[1]))
+                self._entries.move_to_end(key)
+                self.hits += 1
+                self._evict()
+                return entry[1]
+
+            if entry is not None:
+                ctx = entry[1]
+                ctx.refresh()
+                self.refreshes += 1
+            else:
+                ctx = load_context(
+                    company_id, base_dir=base_dir,
+                    partitioned=self.partitioned, streaming=self.streaming,
+                )
+                self.loads += 1
+            self._entries[key] = (fp, ctx, context_nbytes(ctx))
+            self._entries.move_to_end(key)
+            self._evict()
+            return ctx
+
+    def _evict(self):
+        while len(self._entries) > 1 and self.total_bytes() > self.max_bytes:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def total_bytes(self) -> int:
+        return sum(nbytes for _, _, nbytes in self._entries.values())
+
+    def invalidate(self, company_id: str = None):
+        """Drop one company (all base dirs) or, with no argument, everything."""
+        with self._lock:
+            for key in list(self._entries):
+                if company_id is None or key[1] == company_id:
+                    del self._entries[key]
+
+    def configure(self, max_bytes: int):
+        with self._lock:
+            self.max_bytes = int(max_bytes)
+            self._evict()
+
+    def stats(self) -> dict:
+        return {
+            "companies": [company_id for _, company_id in self._entries],
+            "total_bytes": self.total_bytes(),
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "loads": self.loads,
+            "refreshes": self.refreshes,
+            "evictions": self.evictions,
+            "memo_hits": sum(ctx.memo.hits for _, ctx, _ in self._entries.values()),
+            "memo_misses": sum(ctx.memo.misses for _, ctx, _ in self._entries.values()),
+        }
+
+
+REGISTRY = ContextRegistry()
+
+
+def get_context(company_id: str, base_dir="data/companies") -> DataContext:
+    return REGISTRY.get(company_id, base_dir=base_dir)
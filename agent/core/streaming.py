@@ -0,0 +1,150 @@
+import io
+import os
+from pathlib import Path
+
+import pandas as pd
+
+from agent.core.ingest import COLUMN_TYPES, header_columns
+
+# ------------------------------------------------------
+# Out-of-core (streaming) evaluation
+# ------------------------------------------------------
+#
+# In streaming mode (load_context(..., streaming=True)) the large dated
+# tables are never held in memory. Aggregations read the CSV in typed
+# chunks sized to a memory ceiling and keep only running partial
+# aggregates, whose size depends on the number of groups, not rows:
+#
+#   sum      running sum per group
+#   mean     running sum + count per group
+#   nunique  distinct (group, value) pairs
+#   count    running count per group
+#
+# A file is read only up to the size it had when the pass started, so
+# rows appended meanwhile are left for DataContext.refresh().
+# ------------------------------------------------------
+
+DEFAULT_MEMORY_MB = 256
+
+# Parsed bytes per cell, with headroom for pandas temporaries
+_BYTES_PER_CELL = 64
+
+
+def default_memory_mb() -> int:
+    return int(float(os.environ.get("AUTO_STREAM_MEMORY_MB", DEFAULT_MEMORY_MB)))
+
+
+def chunk_rows(n_columns: int, memory_mb: float) -> int:
+    """Rows per chunk so a parsed chunk stays well inside `memory_mb`."""
+    return max(1_000, int(memory_mb * 1024 * 1024 / (max(1, n_columns) * _BYTES_PER_CELL)))
+
+
+class _Bounded(io.RawIOBase):
+    """Reads at most `limit` bytes of a file."""
+
+    def __init__(self, f, limit: int):
+        self.f = f
+        self.left = limit
+
+    def readable(self):
+        return True
+
+    def readinto(self, buffer):
+        n = min(len(buffer), self.left)
+        if n <= 0:
+            return 0
+        data = self.f.read(n)
+        buffer[:len(data)] = data
+        self.left -= len(data)
+        return len(data)
+
+
+def iter_csv(path: Path, columns=None, memory_mb: float = None, start=None, end=None, limit: int = None):
+    """
+    Typed chunks of a CSV (only `columns`), optionally keeping rows with
+    date in (start, end]. `limit` caps the bytes read (default: the
+    file's size now).
+    """
+    memory_mb = default_memory_mb() if memory_mb is None else memory_mb
+    with open(path, "rb") as f:
+        names = header_columns(f.readline())
+        f.seek(0)
+        columns = list(columns) if columns is not None else names
+        limit = os.fstat(f.fileno()).st_size if limit is None else limit
+        # The date filter needs "date" even when the caller does not
+        read = columns + ["date"] if (start is not None or end is not None) and "date" not in columns else columns
+
+        dtype = {c: COLUMN_TYPES[c] for c in read if COLUMN_TYPES.get(c) not in (None, "date")}
+        reader = pd.read_csv(
+            io.BufferedReader(_Bounded(f, limit)),
+            usecols=read,
+            dtype=dtype,
+            chunksize=chunk_rows(len(read), memory_mb),
+        )
+        for chunk in reader:
+            if "date" in chunk.columns:
+                chunk["date"] = pd.to_datetime(chunk["date"], format="ISO8601")
+                if start is not None:
+                    chunk = chunk[chunk["date"] > start]
+                if end is not None:
+                    chunk = chunk[chunk["date"] <= end]
+            yield chunk[columns]
+
+
+def _partial(df: pd.DataFrame, by: list, aggs: dict):
+    """(running-sum frame, {measure: distinct pairs}) for one chunk."""
+    sums = {}
+    for measure, (col, how) in aggs.items():
+        if how in ("sum", "mean"):
+            sums[f"{measure}__sum"] = (col, "sum")
+        if how in ("mean", "count"):
+            sums[f"{measure}__count"] = (col, "count")
+    grouped = df.groupby(by, observed=True)
+    partial = grouped.agg(**sums) if sums else grouped.size().to_frame("__rows")
+    distinct = {
+        measure: df[by + [col]].drop_duplicates()
+        for measure, (col, how) in aggs.items() if how == "nunique"
+    }
+    return partial, distinct
+
+
+def stream_aggregate(chunks, by, aggs: dict) -> pd.DataFrame:
+    """
+    Evaluates named aggregations `aggs` ({measure: (column, how)}) grouped
+    by `by` over an iterable of frames, holding only partial aggregates.
+    Output matches df.groupby(by, as_index=False).agg(**aggs) on the
+    concatenated frames (one row, no group columns, when `by` is empty).
+    """
+    by = list(by)
+    key = by or ["__all"]
+    running, distinct = None, {}
+    for chunk in chunks:
+        if not by:
+            chunk = chunk.assign(__all=0)
+        if chunk.empty:
+            continue
+        # Plain labels: chunk-local categoricals would not line up across chunks
+        chunk = chunk.astype({c: "object" for c in key if isinstance(chunk[c].dtype, pd.CategoricalDtype)})
+        partial, pairs = _partial(chunk, key, aggs)
+        running = partial if running is None else pd.concat([running, partial]).groupby(level=key).sum()
+        for measure, frame in pairs.items():
+            seen = distinct.get(measure)
+            distinct[measure] = frame if seen is None else pd.concat([seen, frame]).drop_duplicates()
+
+    if running is None:
+        return pd.DataFrame(columns=by + list(aggs))
+
+    out = pd.DataFrame(index=running.index)
+    for measure, (col, how) in aggs.items():
+        if how == "sum":
+            out[measure] = running[f"{measure}__sum"]
+        elif how == "count":
+            out[measure] = running[f"{measure}__count"]
+        elif how == "mean":
+            out[measure] = running[f"{measure}__sum"] / running[f"{measure}__count"].where(running[f"{measure}__count"] != 0)
+        elif how == "nunique":
+            out[measure] = distinct[measure].groupby(key)[col].nunique().reindex(out.index, fill_value=0)
+        else:
+            raise ValueError(f"Streaming mode cannot evaluate '{how}'")
+    out = out.sort_index().reset_index()
+    return out.drop(columns="__all") if not by else out
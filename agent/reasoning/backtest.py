@@ -0,0 +1,347 @@
+import numpy as np
+import pandas as pd
+from agent.core.context import DataContext
+from agent.core.memo import memoize
+from agent.analytics.executive import _latest_date
+from agent.analytics.inventory import _is_yes
+from agent.analytics.rollup import rollup
+from agent.reasoning.interpret import (
+    CHANNEL_MIN_HEALTHY_MARGIN_PCT,
+    CHANNEL_RULES,
+    GROWTH_LOSS_REVENUE_SHARE_CAUTION,
+    GROWTH_LOSS_REVENUE_SHARE_NEGATIVE,
+    INVENTORY_LOW_STOCK_UNITS,
+    INVENTORY_RULES,
+    INVENTORY_STOCKOUT_DAYS_THRESHOLD,
+    MARKETING_RULES,
+    PORTFOLIO_RULES,
+    _portfolio_categories,
+)
+from agent.reasoning.rules import rule_hits
+
+# ------------------------------------------------------
+# HISTORICAL FLAG TIMELINE (BACKTEST)
+# ------------------------------------------------------
+# The interpreters answer "as of the latest date". flag_timeline()
+# answers it for every day of a backtest range without running them per
+# day: each source is summed once onto a dense (day, entity) grid and
+# cumulatively summed over days, so what an interpreter reads as of day
+# d is one row of the grid (all history: portfolio, channels, growth)
+# or the difference of two rows (lookback windows: marketing,
+# inventory). Derived columns are computed for every (day, entity) at
+# once and the interpreters' own rule tables are evaluated over that
+# panel with rules.rule_hits, one mask per rule for the whole range.
+#
+# Consecutive days a flag fires on are collapsed into one run. Totals
+# are differences of cumulative sums, so a metric sitting exactly on a
+# threshold can differ from the interpreter in the last float digit.
+
+TIMELINE_COLUMNS = ["interpreter", "type", "entity", "severity", "start", "end", "days"]
+
+
+def _codes(values: pd.Series, labels: pd.Index = None):
+    """Category codes of `values`, against `labels` if given (-1: not in labels)."""
+    values = values.astype("category")
+    if labels is None:
+        return values.cat.codes.to_numpy().astype(np.int64), values.cat.categories
+    mapping = np.append(labels.get_indexer(values.cat.categories), -1)
+    return mapping[values.cat.codes.to_numpy()], labels
+
+
+def _rows(cal: dict, dates: pd.Series) -> np.ndarray:
+    """Calendar row of each date; row 0 holds everything up to the origin."""
+    day = (dates.to_numpy(dtype="datetime64[D]") - cal["origin"]).astype(np.int64)
+    return np.maximum(day, 0)
+
+
+def _grid(cal: dict, dates: pd.Series, codes: np.ndarray, n: int, weights=None) -> np.ndarray:
+    """Daily (calendar row, entity) sums of `weights` (row counts if None)."""
+    rows = _rows(cal, dates)
+    keep = (rows < cal["rows"]) & (codes >= 0)
+    if weights is not None:
+        weights = np.asarray(weights, dtype="float64")[keep]
+    cell = rows[keep] * n + codes[keep]
+    return np.bincount(cell, weights=weights, minlength=cal["rows"] * n).reshape(cal["rows"], n)
+
+
+def _values(series: pd.Series) -> np.ndarray:
+    return series.to_numpy(dtype="float64", na_value=0.0)
+
+
+def _as_of(cum: np.ndarray, cal: dict) -> np.ndarray:
+    """All history up to each backtest day: (day, entity)."""
+    return cum[cal["eval"]]
+
+
+def _window(cum: np.ndarray, cal: dict, days: int, back: int = 0) -> np.ndarray:
+    """The `days` days up to `back` days before each backtest day: (day, entity)."""
+    end = cal["eval"] - back
+    return cum[end] - cum[end - days]
+
+
+def _panel(present: np.ndarray, labels: pd.Index, dim: str, **columns) -> pd.DataFrame:
+    """One row per (backtest day, entity) where `present`, with the given (day, entity) columns."""
+    day, code = np.nonzero(present)
+    return pd.DataFrame({
+        "__day": day,
+        dim: pd.Categorical.from_codes(code, labels),
+        **{name: values[day, code] for name, values in columns.items()},
+    })
+
+
+def _entity_hits(interpreter: str, panel: pd.DataFrame, dim: str, rules: list, params: dict = None) -> pd.DataFrame:
+    hits = rule_hits(panel, rules, params)
+    rows = hits["row"].to_numpy()
+    return pd.DataFrame({
+        "__day": panel["__day"].to_numpy()[rows],
+        "interpreter": interpreter,
+        "type": hits["type"].to_numpy(),
+        "entity": panel[dim].astype(str).to_numpy()[rows],
+        "severity": hits["severity"].to_numpy(),
+    })
+
+
+def _day_hits(interpreter: str, flag: str, severity: str, fired: np.ndarray) -> pd.DataFrame:
+    """A business-wide flag (no entity) on the backtest days where `fired`."""
+    return pd.DataFrame({
+        "__day": np.flatnonzero(fired),
+        "interpreter": interpreter,
+        "type": flag,
+        "entity": None,
+        "severity": severity,
+    })
+
+
+# ------------------------------------------------------
+# Per-interpreter flags for every backtest day
+# ------------------------------------------------------
+
+def _marketing_hits(ctx: DataContext, cal: dict, lookback_days: int) -> list:
+    m = rollup(ctx, ["date", "channel"], ["spend", "marketing_revenue"])
+    s = rollup(ctx, ["date", "channel"], ["revenue", "cost"])
+    codes, labels = _codes(m["channel"])
+    sale_codes, _ = _codes(s["channel"], labels)
+    n = len(labels)
+
+    def cum(df, codes, col=None, width=n):
+        return _grid(cal, df["date"], codes, width, None if col is None else _values(df[col])).cumsum(axis=0)
+
+    spend, revenue = cum(m, codes, "spend"), cum(m, codes, "marketing_revenue")
+    present = _window(cum(m, codes), cal, lookback_days) > 0
+    any_sales = _window(cum(s, np.zeros(len(s), np.int64), width=1), cal, lookback_days)[:, 0] > 0
+    has_marketing = present.any(axis=1)
+    present &= any_sales[:, None]
+
+    half = max(2, lookback_days // 2)
+    window_spend = _window(spend, cal, lookback_days)
+    sales_revenue = _window(cum(s, sale_codes, "revenue"), cal, lookback_days)
+    net_profit = sales_revenue - _window(cum(s, sale_codes, "cost"), cal, lookback_days) - window_spend
+    with np.errstate(divide="ignore", invalid="ignore"):
+        def change_pct(total):
+            current, previous = _window(total, cal, half), _window(total, cal, half, back=half)
+            return np.where(previous != 0, (current - previous) / previous * 100, np.nan)
+
+        panel = _panel(
+            present, labels, "channel",
+            roas=np.where(window_spend != 0, _window(revenue, cal, lookback_days) / window_spend, np.nan),
+            net_profit_margin_pct=np.where(sales_revenue != 0, net_profit / sales_revenue * 100, np.nan),
+            spend_change_pct=change_pct(spend),
+            rev_change_pct=change_pct(revenue),
+        )
+    return [
+        _day_hits("marketing_efficiency", "NO_MARKETING_DATA", "high", ~has_marketing),
+        _day_hits("marketing_efficiency", "NO_SALES_DATA_WINDOW", "high", has_marketing & ~any_sales),
+        _entity_hits("marketing_efficiency", panel, "channel", MARKETING_RULES),
+    ]
+
+
+def _inventory_hits(ctx: DataContext, cal: dict, lookback_days: int) -> list:
+    inv = ctx.window("inventory", cal["latest"], cal["rows"] - 1)
+    if inv.empty:
+        return [_day_hits("inventory_health_vs_revenue", "NO_INVENTORY_DATA", "high", np.ones(len(cal["eval"]), bool))]
+    codes, labels = _codes(inv["product"])
+    n = len(labels)
+
+    # Each inventory row's day of sales, as in interpret._stockout_impact
+    sales = rollup(ctx, ["date", "product"], ["revenue"])
+    sale_codes, _ = _codes(sales["product"], labels)
+    daily_revenue = _grid(cal, sales["date"], sale_codes, n, _values(sales["revenue"]))
+    revenue = daily_revenue[_rows(cal, inv["date"]), np.maximum(codes, 0)]
+    stockout = np.asarray(_is_yes(inv["stockout_flag"]), dtype=bool)
+    low_stock = (inv["closing_stock"].fillna(0) <= INVENTORY_LOW_STOCK_UNITS).to_numpy(dtype=bool)
+
+    def window(weights=None):
+        return _window(_grid(cal, inv["date"], codes, n, weights).cumsum(axis=0), cal, lookback_days)
+
+    rows = window()
+    stockout_days = window(stockout)
+    normal_days = rows - stockout_days
+    present = rows > 0
+    with np.errstate(divide="ignore", invalid="ignore"):
+        normal = np.where(normal_days > 0, window(np.where(stockout, 0.0, revenue)) / normal_days, np.nan)
+        on_stockout = np.where(stockout_days > 0, window(np.where(stockout, revenue, 0.0)) / stockout_days, np.nan)
+        drop = np.where(normal > 0, (normal - on_stockout) / normal * 100.0, np.nan)
+
+    panel = _panel(
+        present, labels, "product",
+        stockout_days=stockout_days, low_stock_days=window(low_stock), revenue_drop_pct_on_stockout=drop,
+    )
+    threshold = max(
+        INVENTORY_STOCKOUT_DAYS_THRESHOLD,
+        round(INVENTORY_STOCKOUT_DAYS_THRESHOLD * (lookback_days / 30))
+    )
+    return [
+        _day_hits("inventory_health_vs_revenue", "NO_INVENTORY_DATA", "high", ~present.any(axis=1)),
+        _entity_hits(
+            "inventory_health_vs_revenue", panel, "product", INVENTORY_RULES,
+            params={"stockout_threshold": threshold, "lookback_days": lookback_days},
+        ),
+    ]
+
+
+def _product_totals(ctx: DataContext, cal: dict) -> dict:
+    """Revenue and profit per product over all history up to each backtest day."""
+    s = rollup(ctx, ["date", "product"], ["revenue", "cost"])
+    codes, labels = _codes(s["product"])
+    n = len(labels)
+    rows, revenue, cost = (
+        _as_of(_grid(cal, s["date"], codes, n, weights).cumsum(axis=0), cal)
+        for weights in (None, _values(s["revenue"]), _values(s["cost"]))
+    )
+    return {"labels": labels, "present": rows > 0, "revenue": revenue, "profit": revenue - cost}
+
+
+def _portfolio_hits(products: dict) -> list:
+    present, revenue = products["present"], products["revenue"]
+    total = np.where(present, revenue, 0.0).sum(axis=1)
+    present = present & (total > 0)[:, None]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        share = revenue / total[:, None] * 100
+        margin = products["profit"] / revenue * 100
+    category = _portfolio_categories(share, margin)
+
+    panel = _panel(
+        present, products["labels"], "product",
+        revenue_share_pct=share, profit_margin_pct=margin, category=category,
+    )
+    zombies = ((category == "ZOMBIE") & present).sum(axis=1)
+    return [
+        _entity_hits("product_portfolio_health", panel, "product", PORTFOLIO_RULES),
+        _day_hits("product_portfolio_health", "ZOMBIE_PRODUCT_DRAG", "medium", zombies >= 2),
+    ]
+
+
+def _growth_hits(ctx: DataContext, cal: dict, products: dict) -> list:
+    """interpret_growth_quality signals (NEUTRAL left out), with its confidence as severity."""
+    dates = ctx.daily["date"].to_numpy(dtype="datetime64[D]")
+    cum = np.concatenate(([0.0], np.cumsum(_values(ctx.daily["revenue"]))))
+    hi = cal["daily_rows"] + 1
+    lo = np.searchsorted(dates, dates[hi - 1] - np.timedelta64(7, "D"), side="right")
+    with np.errstate(divide="ignore", invalid="ignore"):
+        baseline = (cum[hi - 1] - cum[lo]) / (hi - 1 - lo)
+        delta = np.where(baseline > 0, (cum[hi] - cum[hi - 1] - baseline) / baseline * 100, np.nan)
+
+    present, revenue, profit = products["present"], products["revenue"], products["profit"]
+    total_revenue = np.where(present, revenue, 0.0).sum(axis=1)
+    total_profit = np.where(present, profit, 0.0).sum(axis=1)
+    loss_revenue = np.where(present & (profit < 0), revenue, 0.0).sum(axis=1)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        loss_share = np.where(total_revenue > 0, loss_revenue / total_revenue, 0.0)
+
+    growing = (hi - lo >= 2) & (delta > 0) & present.any(axis=1)
+    negative = growing & ((total_profit <= 0) | (loss_share > GROWTH_LOSS_REVENUE_SHARE_NEGATIVE))
+    caution = growing & ~negative & (loss_share > GROWTH_LOSS_REVENUE_SHARE_CAUTION)
+    return [
+        _day_hits("growth_quality", "NEGATIVE", "high", negative),
+        _day_hits("growth_quality", "CAUTION", "medium", caution),
+        _day_hits("growth_quality", "POSITIVE", "high", growing & ~negative & ~caution),
+    ]
+
+
+def _channel_hits(ctx: DataContext, cal: dict) -> list:
+    s = rollup(ctx, ["date", "channel"], ["revenue", "cost"])
+    m = rollup(ctx, ["date", "channel"], ["spend"])
+    codes, labels = _codes(s["channel"])
+    spend_codes, _ = _codes(m["channel"], labels)
+    n = len(labels)
+
+    def as_of(df, codes, col=None):
+        return _as_of(_grid(cal, df["date"], codes, n, None if col is None else _values(df[col])).cumsum(axis=0), cal)
+
+    present = as_of(s, codes) > 0
+    revenue = as_of(s, codes, "revenue")
+    net_profit = revenue - as_of(s, codes, "cost") - as_of(m, spend_codes, "spend")
+    total_revenue = np.where(present, revenue, 0.0).sum(axis=1)[:, None]
+    total_profit = np.where(present, net_profit, 0.0).sum(axis=1)[:, None]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        margin = net_profit / revenue * 100
+        panel = _panel(
+            present, labels, "channel",
+            revenue=revenue,
+            revenue_share_pct=np.where(total_revenue > 0, revenue / total_revenue * 100, 0.0),
+            profit_share_pct=np.where(total_profit > 0, net_profit / total_profit * 100, 0.0),
+            profit_margin_pct=margin,
+        )
+    healthy = (present & (margin >= CHANNEL_MIN_HEALTHY_MARGIN_PCT)).sum(axis=1)
+    return [
+        _entity_hits("channel_dependency_risk", panel, "channel", CHANNEL_RULES),
+        _day_hits("channel_dependency_risk", "SINGLE_CHANNEL_DEPENDENCY", "high", present.any(axis=1) & (healthy <= 1)),
+    ]
+
+
+def _runs(hits: pd.DataFrame, dates: pd.DatetimeIndex) -> pd.DataFrame:
+    """Consecutive backtest days with the same flag, entity and severity as one row."""
+    key = ["interpreter", "type", "entity", "severity"]
+    hits = hits.assign(entity=hits["entity"].fillna("")).sort_values(key + ["__day"], ignore_index=True)
+    same = (hits[key] == hits[key].shift()).all(axis=1) & (hits["__day"].diff() == 1)
+    runs = hits.groupby((~same).cumsum().to_numpy()).agg(
+        **{k: (k, "first") for k in key},
+        start=("__day", "first"),
+        end=("__day", "last"),
+        days=("__day", "size"),
+    )
+    runs["start"] = dates[runs["start"].to_numpy()]
+    runs["end"] = dates[runs["end"].to_numpy()]
+    runs["entity"] = runs["entity"].replace("", None)
+    return runs.sort_values(["start", "interpreter", "type", "entity"], ignore_index=True)[TIMELINE_COLUMNS]
+
+
+@memoize
+def flag_timeline(ctx: DataContext, days: int = 365, lookback_days: int = 30) -> pd.DataFrame:
+    """
+    Every interpretation flag as of each day with sales in the last
+    `days` days (marketing and inventory over `lookback_days` windows),
+    without running the interpreters per day.
+
+    Returns one row per run of consecutive days a flag fired for an
+    entity: interpreter, type, entity (None for business-wide flags and
+    growth signals), severity, start, end and days (backtest days in the
+    run).
+    """
+    latest = _latest_date(ctx)
+    if latest is None:
+        return pd.DataFrame(columns=TIMELINE_COLUMNS)
+
+    dates = pd.DatetimeIndex(ctx.daily["date"])
+    daily_rows = np.flatnonzero(dates > latest - pd.Timedelta(days=int(days)))
+    back = max(lookback_days, 2 * max(2, lookback_days // 2))
+    origin = (dates[daily_rows[0]] - pd.Timedelta(days=back)).to_datetime64().astype("datetime64[D]")
+    cal = {
+        "latest": latest,
+        "origin": origin,
+        "rows": int((np.datetime64(latest, "D") - origin).astype(np.int64)) + 1,
+        "eval": (dates[daily_rows].to_numpy(dtype="datetime64[D]") - origin).astype(np.int64),
+        "daily_rows": daily_rows,
+    }
+
+    products = _product_totals(ctx, cal)
+    hits = pd.concat([
+        *_marketing_hits(ctx, cal, lookback_days),
+        *_portfolio_hits(products),
+        *_inventory_hits(ctx, cal, lookback_days),
+        *_channel_hits(ctx, cal),
+        *_growth_hits(ctx, cal, products),
+    ], ignore_index=True)
+    if hits.empty:
+        return pd.DataFrame(columns=TIMELINE_COLUMNS)
+    return _runs(hits, dates[daily_rows])
@@ -1,7 +1,12 @@
+import numpy as np
 import pandas as pd
 from agent.core.context import DataContext
-from agent.analytics.executive import _latest_date
-from agent.analytics.profit import *
+from agent.core.costs import add_profit
+from agent.core.memo import memoize
+from agent.analytics.compare import nested_windows
+from agent.analytics.inventory import _is_yes
+from agent.reasoning.plan import Plan
+from agent.reasoning.rules import Rule, evaluate_rules
  
 # ============================================================
 # THRESHOLD CONSTANTS
@@ -134,13 +139,47 @@ def interpret_growth_quality(
 # INTERPRETATION LAYER — Marketing Efficiency
 # ------------------------------------------------------
  
-def _date_window(df: pd.DataFrame, date_col: str, end: pd.Timestamp, days: int) -> pd.DataFrame:
-    """Inclusive window: (end-days, end)."""
-    start = end - pd.Timedelta(days=days)
-    return df[(df[date_col] > start) & (df[date_col] <= end)].copy()
- 
- 
+MARKETING_RULES = [
+    Rule(
+        "LOW_ROAS",
+        lambda t, p: t["roas"] < MARKETING_MIN_ROAS,
+        "medium",
+        ("channel", "severity", ("value", "roas"), ("threshold", MARKETING_MIN_ROAS)),
+        "{channel}: ROAS below minimum viable threshold ({value:.2f} < {threshold}).",
+    ),
+    Rule(
+        "NEGATIVE_OR_LOW_NET_MARGIN",
+        lambda t, p: t["net_profit_margin_pct"] < MARKETING_MIN_NET_MARGIN_PCT,
+        "high",
+        ("channel", "severity", ("value", "net_profit_margin_pct"), ("threshold", MARKETING_MIN_NET_MARGIN_PCT)),
+        "{channel}: Net profit margin below floor ({value:.2f}% < {threshold}%). "
+        "Spend and product mix are not generating net profit.",
+    ),
+    Rule(
+        "SPEND_SPIKE_WEAK_RETURN",
+        # Revenue change missing or below the spend change
+        lambda t, p: (t["spend_change_pct"] >= MARKETING_SPEND_SPIKE_PCT)
+                     & ~(t["rev_change_pct"] >= t["spend_change_pct"]),
+        "medium",
+        ("channel", "severity", "spend_change_pct", "rev_change_pct", ("threshold", MARKETING_SPEND_SPIKE_PCT)),
+        "{channel}: Spend jumped ~{spend_change_pct:.1f}% "
+        "but revenue did not follow. Potential diminishing returns or targeting fatigue.",
+    ),
+]
+ 
+ 
+@memoize
 def marketing_efficiency(ctx: DataContext, lookback_days: int = 30):
+    return _marketing_efficiency(Plan(ctx, lookback_days))
+
+
+@memoize
+def marketing_efficiency_sweep(ctx: DataContext, lookbacks: tuple = (30, 60, 90)):
+    """marketing_efficiency for every lookback in one pass: {lookback: result}."""
+    return _marketing_sweep(Plan(ctx, max(lookbacks)), lookbacks)
+
+
+def _marketing_efficiency(plan: Plan):
     """
     Deterministic interpretation primitive.
     Evaluates paid channels on ROAS, CAC, and net profit contribution.
@@ -155,12 +194,55 @@ def marketing_efficiency(ctx: DataContext, lookback_days: int = 30):
         "interpretation": [...]
     }
     """
-    latest = _latest_date(ctx)
+    return _marketing_sweep(plan, [plan.days])[plan.days]
  
-    m = _date_window(ctx.marketing, "date", latest, lookback_days)
-    s = _date_window(ctx.sales_enriched, "date", latest, lookback_days)
  
-    if m.empty:
+def _marketing_sweep(plan: Plan, lookbacks) -> dict:
+    """
+    _marketing_efficiency for every lookback (none longer than plan.days)
+    in one pass: channel totals of all nested windows, and of the halves
+    each spend trend compares, come from one daily-by-channel grid.
+    """
+    latest = plan["latest"]
+    lookbacks = sorted({int(L) for L in lookbacks})
+
+    # --- Spend trend: last half vs first half (halves of 2+ days, as lookback_pair) ---
+    halves = {L: max(2, L // 2) for L in lookbacks}
+    horizons = sorted({*lookbacks, *halves.values(), *(2 * h for h in halves.values())})
+    window = (
+        plan["marketing_window"] if horizons[-1] <= plan.days
+        else plan.ctx.window("marketing", latest, horizons[-1])
+    )
+    marketing = nested_windows(
+        window, "channel", ["spend", "revenue", "conversions", "clicks", "impressions"], latest, horizons,
+    )
+    sales = nested_windows(plan["sales_window"], "channel", ["revenue", "units", "cost"], latest, lookbacks)
+
+    return {
+        L: _marketing_window(
+            latest, L, marketing[L], sales[L],
+            _spend_trend(marketing[halves[L]], marketing[2 * halves[L]]),
+        )
+        for L in lookbacks
+    }
+
+
+def _spend_trend(current: pd.DataFrame, both: pd.DataFrame) -> pd.DataFrame:
+    """spend_change_pct / rev_change_pct per channel from the totals of the last half and of both halves."""
+    both = both.set_index("channel")[["spend", "revenue"]]
+    current = current.set_index("channel")[["spend", "revenue"]].reindex(both.index, fill_value=0)
+    previous = both - current
+    change = (current - previous) / previous.where(previous != 0) * 100
+    return pd.DataFrame({
+        "channel": both.index,
+        "spend_change_pct": change["spend"].to_numpy(dtype="float64"),
+        "rev_change_pct": change["revenue"].to_numpy(dtype="float64"),
+    })
+
+
+def _marketing_window(latest, lookback_days: int, marketing: pd.DataFrame, sales: pd.DataFrame, trend):
+    """One lookback of _marketing_sweep from its channel totals."""
+    if marketing.empty:
         return {
             "as_of": latest.date().isoformat(),
             "window_days": lookback_days,
@@ -171,19 +253,13 @@ def marketing_efficiency(ctx: DataContext, lookback_days: int = 30):
  
     # --- Core marketing rollup ---
     roll = (
-        m.groupby("channel", as_index=False)
-        .agg(
-            spend=("spend", "sum"),
-            mkt_revenue=("revenue", "sum"),
-            conversions=("conversions", "sum"),
-            clicks=("clicks", "sum"),
-            impressions=("impressions", "sum"),
-        )
+        marketing.drop(columns=["__rows", "__days"])
+        .rename(columns={"revenue": "mkt_revenue"})
     )
     roll["roas"] = roll["mkt_revenue"] / roll["spend"].replace(0, pd.NA)
     roll["cac"] = roll["spend"] / roll["conversions"].replace(0, pd.NA)
  
-    if s.empty:
+    if sales.empty:
         return {
             "as_of": latest.date().isoformat(),
             "window_days": lookback_days,
@@ -193,54 +269,19 @@ def marketing_efficiency(ctx: DataContext, lookback_days: int = 30):
         }
  
     sales_roll = (
-        s.groupby("channel", as_index=False)
-        .agg(
-            sales_revenue=("revenue", "sum"),
-            units=("units_sold", "sum"),
-            product_cost=("unit_cost", lambda x: (x * s.loc[x.index, "units_sold"]).sum()),
-        )
+        sales.drop(columns=["__rows", "__days"])
+        .rename(columns={"revenue": "sales_revenue", "cost": "product_cost"})
     )
  
     channel_table = roll.merge(sales_roll, on="channel", how="left")
  
-    channel_table["net_profit"] = (
-        channel_table["sales_revenue"].fillna(0)
-        - channel_table["product_cost"].fillna(0)
-        - channel_table["spend"].fillna(0)
-    )
-    channel_table["net_profit_margin_pct"] = (
-        channel_table["net_profit"] / channel_table["sales_revenue"].replace(0, pd.NA) * 100
-    )
- 
-    # --- Spend trend: last half vs first half ---
-    half = max(2, lookback_days // 2)
-    first = _date_window(ctx.marketing, "date", latest - pd.Timedelta(days=half), half)
-    last = _date_window(ctx.marketing, "date", latest, half)
- 
-    def _sum_by_channel(df, col):
-        if df.empty:
-            return pd.DataFrame(columns=["channel", col])
-        return df.groupby("channel", as_index=False)[col].sum()
- 
-    spend_first = _sum_by_channel(first, "spend").rename(columns={"spend": "spend_first"})
-    spend_last = _sum_by_channel(last, "spend").rename(columns={"spend": "spend_last"})
-    rev_first = _sum_by_channel(first, "revenue").rename(columns={"revenue": "rev_first"})
-    rev_last = _sum_by_channel(last, "revenue").rename(columns={"revenue": "rev_last"})
- 
-    trend = (
-        spend_first
-        .merge(spend_last, on="channel", how="outer")
-        .merge(rev_first, on="channel", how="outer")
-        .merge(rev_last, on="channel", how="outer")
-        .fillna(0)
-    )
-    trend["spend_change_pct"] = (
-        (trend["spend_last"] - trend["spend_first"])
-        / trend["spend_first"].replace(0, pd.NA) * 100
-    )
-    trend["rev_change_pct"] = (
-        (trend["rev_last"] - trend["rev_first"])
-        / trend["rev_first"].replace(0, pd.NA) * 100
+    add_profit(
+        channel_table,
+        costs=["product_cost", "spend"],
+        revenue="sales_revenue",
+        profit="net_profit",
+        margin="net_profit_margin_pct",
+        missing_as_zero=True,
     )
  
     channel_table = channel_table.merge(
@@ -249,57 +290,7 @@ def marketing_efficiency(ctx: DataContext, lookback_days: int = 30):
     )
  
     # --- Flags + interpretations ---
-    flags = []
-    interpretation = []
- 
-    for _, r in channel_table.iterrows():
-        ch = r["channel"]
-        roas = r.get("roas")
-        npm = r.get("net_profit_margin_pct")
-        spend_chg = r.get("spend_change_pct")
- 
-        if pd.notna(roas) and roas < MARKETING_MIN_ROAS:
-            flags.append({
-                "type": "LOW_ROAS",
-                "channel": ch,
-                "severity": "medium",
-                "value": float(roas),
-                "threshold": MARKETING_MIN_ROAS,
-            })
-            interpretation.append(
-                f"{ch}: ROAS below minimum viable threshold "
-                f"({float(roas):.2f} < {MARKETING_MIN_ROAS})."
-            )
- 
-        if pd.notna(npm) and npm < MARKETING_MIN_NET_MARGIN_PCT:
-            flags.append({
-                "type": "NEGATIVE_OR_LOW_NET_MARGIN",
-                "channel": ch,
-                "severity": "high",
-                "value": float(npm),
-                "threshold": MARKETING_MIN_NET_MARGIN_PCT,
-            })
-            interpretation.append(
-                f"{ch}: Net profit margin below floor "
-                f"({float(npm):.2f}% < {MARKETING_MIN_NET_MARGIN_PCT}%). "
-                "Spend and product mix are not generating net profit."
-            )
- 
-        if pd.notna(spend_chg) and spend_chg >= MARKETING_SPEND_SPIKE_PCT:
-            rev_chg = r.get("rev_change_pct")
-            if pd.isna(rev_chg) or rev_chg < spend_chg:
-                flags.append({
-                    "type": "SPEND_SPIKE_WEAK_RETURN",
-                    "channel": ch,
-                    "severity": "medium",
-                    "spend_change_pct": float(spend_chg),
-                    "rev_change_pct": (None if pd.isna(rev_chg) else float(rev_chg)),
-                    "threshold": MARKETING_SPEND_SPIKE_PCT,
-                })
-                interpretation.append(
-                    f"{ch}: Spend jumped ~{float(spend_chg):.1f}% "
-                    "but revenue did not follow. Potential diminishing returns or targeting fatigue."
-                )
+    flags, interpretation = evaluate_rules(channel_table, MARKETING_RULES, by_row=True)
  
     if not flags:
         interpretation.append(
@@ -324,17 +315,59 @@ def marketing_efficiency(ctx: DataContext, lookback_days: int = 30):
 # INTERPRETATION LAYER — Product Portfolio Health
 # ------------------------------------------------------
  
+PORTFOLIO_RULES = [
+    Rule(
+        "PRODUCT_REVENUE_CONCENTRATION",
+        lambda t, p: t["revenue_share_pct"] >= PORTFOLIO_HIGH_REVENUE_SHARE_PCT,
+        lambda t, p: np.where(t["revenue_share_pct"] >= 50.0, "high", "medium"),
+        ("product", "revenue_share_pct", "severity", ("threshold", PORTFOLIO_HIGH_REVENUE_SHARE_PCT)),
+        "{product} contributes {revenue_share_pct:.1f}% of total revenue. "
+        "Portfolio may be overly dependent on this product.",
+    ),
+    Rule(
+        "FAKE_GROWTH_PRODUCT",
+        lambda t, p: t["category"] == "FAKE_GROWTH",
+        "high",
+        ("product", "profit_margin_pct", "revenue_share_pct", "severity",
+         ("threshold_margin", PORTFOLIO_MIN_HEALTHY_MARGIN_PCT)),
+        "{product} has high revenue share ({revenue_share_pct:.1f}%) "
+        "but negative margins. Growth here is destroying value.",
+    ),
+]
+ 
+ 
+def _portfolio_categories(share, margin) -> np.ndarray:
+    """STAR / CASH_COW / FAKE_GROWTH / ZOMBIE / EXPERIMENTAL from revenue share and margin (%)."""
+    high_rev = share >= PORTFOLIO_HIGH_REVENUE_SHARE_PCT
+    good_margin = margin >= PORTFOLIO_MIN_HEALTHY_MARGIN_PCT
+    return np.select(
+        [
+            high_rev & good_margin,
+            ~high_rev & good_margin,
+            high_rev & (margin < 0),
+            (share < PORTFOLIO_ZOMBIE_REVENUE_SHARE_PCT) & ~good_margin,
+        ],
+        ["STAR", "CASH_COW", "FAKE_GROWTH", "ZOMBIE"],
+        default="EXPERIMENTAL",
+    )
+
+
+@memoize
 def product_portfolio_health(ctx: DataContext):
+    return _product_portfolio_health(Plan(ctx))
+
+
+def _product_portfolio_health(plan: Plan):
     """
     Evaluates product-level economic health and portfolio risk.
     Thresholds from: agent/rag/knowledge/product_portfolio.md
     """
  
-    latest = _latest_date(ctx)
+    latest = plan["latest"]
     if latest is None:
         return None
  
-    df = profit_by_product(ctx).copy()
+    df = plan["profit_by_product"]
  
     total_revenue = df["revenue"].sum()
     if total_revenue <= 0:
@@ -342,61 +375,9 @@ def product_portfolio_health(ctx: DataContext):
  
     df["revenue_share_pct"] = df["revenue"] / total_revenue * 100
  
-    def classify(row):
-        high_rev = row["revenue_share_pct"] >= PORTFOLIO_HIGH_REVENUE_SHARE_PCT
-        good_margin = row["profit_margin_pct"] >= PORTFOLIO_MIN_HEALTHY_MARGIN_PCT
-        negative_margin = row["profit_margin_pct"] < 0
-        zombie = (
-            row["revenue_share_pct"] < PORTFOLIO_ZOMBIE_REVENUE_SHARE_PCT
-            and not good_margin
-        )
+    df["category"] = _portfolio_categories(df["revenue_share_pct"], df["profit_margin_pct"])
  
-        if high_rev and good_margin:
-            return "STAR"
-        if not high_rev and good_margin:
-            return "CASH_COW"
-        if high_rev and negative_margin:
-            return "FAKE_GROWTH"
-        if zombie:
-            return "ZOMBIE"
-        return "EXPERIMENTAL"
- 
-    df["category"] = df.apply(classify, axis=1)
- 
-    flags = []
-    interpretation = []
- 
-    # Revenue concentration
-    dominant = df[df["revenue_share_pct"] >= PORTFOLIO_HIGH_REVENUE_SHARE_PCT]
-    for _, r in dominant.iterrows():
-        severity = "high" if r["revenue_share_pct"] >= 50.0 else "medium"
-        flags.append({
-            "type": "PRODUCT_REVENUE_CONCENTRATION",
-            "product": r["product"],
-            "revenue_share_pct": float(r["revenue_share_pct"]),
-            "severity": severity,
-            "threshold": PORTFOLIO_HIGH_REVENUE_SHARE_PCT,
-        })
-        interpretation.append(
-            f"{r['product']} contributes {r['revenue_share_pct']:.1f}% of total revenue. "
-            "Portfolio may be overly dependent on this product."
-        )
- 
-    # Fake growth products
-    fake = df[df["category"] == "FAKE_GROWTH"]
-    for _, r in fake.iterrows():
-        flags.append({
-            "type": "FAKE_GROWTH_PRODUCT",
-            "product": r["product"],
-            "profit_margin_pct": float(r["profit_margin_pct"]),
-            "revenue_share_pct": float(r["revenue_share_pct"]),
-            "severity": "high",
-            "threshold_margin": PORTFOLIO_MIN_HEALTHY_MARGIN_PCT,
-        })
-        interpretation.append(
-            f"{r['product']} has high revenue share ({r['revenue_share_pct']:.1f}%) "
-            "but negative margins. Growth here is destroying value."
-        )
+    flags, interpretation = evaluate_rules(df, PORTFOLIO_RULES)
  
     # Zombie drag
     zombies = df[df["category"] == "ZOMBIE"]
@@ -434,7 +415,135 @@ def product_portfolio_health(ctx: DataContext):
 # INTERPRETATION LAYER — Inventory Health vs Revenue
 # ------------------------------------------------------
  
+# Per inventory row indicator columns summed per product (see _stockout_impact)
+IMPACT_COLUMNS = [
+    "stockout", "low_stock", "revenue", "units", "revenue_stockout", "revenue_normal", "lost_units", "priced_lost",
+]
+
+
+def _stockout_impact(inv: pd.DataFrame, sales: pd.DataFrame, latest, lookbacks) -> dict:
+    """
+    Per-product stockout statistics of the inventory window for every
+    lookback (none longer than the window), as grouped sums of
+    precomputed indicator columns over nested windows.
+
+    Sales (cube rows) are summed onto a dense (day, product) grid spanning
+    the inventory window, no larger than a complete inventory window, so
+    every inventory row picks up its day's revenue and units by position
+    instead of through a merge. Means are sums over day counts and the
+    realized price is each product's revenue over units.
+
+    Returns {lookback: product table}.
+    """
+    product = inv["product"].astype("category")
+    labels = product.cat.categories
+    n = len(labels)
+    codes = product.cat.codes.to_numpy().astype(np.int64)
+
+    inv_days = inv["date"].to_numpy(dtype="datetime64[D]")
+    first = inv_days.min()
+    n_days = int((inv_days.max() - first).astype(np.int64)) + 1
+    inv_cell = (inv_days - first).astype(np.int64) * n + codes
+
+    # Sales products mapped onto the inventory's codes (-1: not in inventory)
+    sale_product = sales["product"].astype("category")
+    mapping = np.append(labels.get_indexer(sale_product.cat.categories), -1)
+    sale_codes = mapping[sale_product.cat.codes.to_numpy()]
+    sale_days = (sales["date"].to_numpy(dtype="datetime64[D]") - first).astype(np.int64)
+    ok = (sale_codes >= 0) & (sale_days >= 0) & (sale_days < n_days)
+    sale_cell = sale_days[ok] * n + sale_codes[ok]
+
+    def on_grid(values):
+        grid = np.bincount(sale_cell, weights=values[ok], minlength=n_days * n)
+        return grid[inv_cell]
+
+    revenue = on_grid(sales["revenue"].to_numpy(dtype="float64"))
+    stockout = _is_yes(inv["stockout_flag"])
+    lost = inv["lost_demand"].fillna(0).to_numpy(dtype="float64")
+    rows = pd.DataFrame({
+        "date": inv["date"].to_numpy(),
+        "product": product.to_numpy(),
+        "stockout": stockout.astype(np.float64),
+        "low_stock": (inv["closing_stock"].fillna(0) <= INVENTORY_LOW_STOCK_UNITS).to_numpy(dtype=np.float64),
+        "revenue": revenue,
+        "units": on_grid(sales["units"].to_numpy(dtype="float64")),
+        "revenue_stockout": np.where(stockout, revenue, 0.0),
+        "revenue_normal": np.where(stockout, 0.0, revenue),
+        "lost_units": np.where(stockout, lost, 0.0),
+        "priced_lost": np.where(stockout & (lost > 0), lost, 0.0),
+    })
+    totals = nested_windows(rows, "product", IMPACT_COLUMNS, latest, lookbacks)
+    # A window of L <= 0 days has no rows: left out, so it reads as NO_INVENTORY_DATA
+    return {L: _impact_table(t) for L, t in totals.items() if L > 0}
+
+
+def _impact_table(t: pd.DataFrame) -> pd.DataFrame:
+    """The product table from one window's indicator totals."""
+    stockout_days = t["stockout"]
+    normal_days = t["__rows"] - stockout_days
+    with np.errstate(divide="ignore", invalid="ignore"):
+        realized_price = t["units"].rtruediv(t["revenue"]).fillna(0.0)
+        table = pd.DataFrame({
+            "product": t["product"],
+            "days_observed": t["__days"],
+            "stockout_days": stockout_days,
+            "low_stock_days": t["low_stock"],
+            "avg_daily_revenue_non_stockout": (t["revenue_normal"] / normal_days).where(normal_days > 0),
+            "avg_daily_revenue_stockout": (t["revenue_stockout"] / stockout_days).where(stockout_days > 0),
+            "lost_units_estimated": t["lost_units"],
+            "lost_revenue_estimated": (t["priced_lost"] * realized_price).where(t["priced_lost"] > 0, 0.0),
+        })
+
+    normal = table["avg_daily_revenue_non_stockout"]
+    table.insert(6, "revenue_drop_pct_on_stockout", (
+        (normal - table["avg_daily_revenue_stockout"]) / normal.where(normal > 0) * 100.0
+    ))
+    return table.astype({
+        "days_observed": int, "stockout_days": int, "low_stock_days": int, "lost_units_estimated": int,
+    })
+
+
+# Params: stockout_threshold (stockout days, scaled to the window), lookback_days
+INVENTORY_RULES = [
+    Rule(
+        "FREQUENT_STOCKOUTS",
+        lambda t, p: t["stockout_days"] >= p["stockout_threshold"],
+        "high",
+        ("product", "severity", "stockout_days", ("threshold_days", "stockout_threshold")),
+        "{product}: Stocked out on {stockout_days} days in the last {lookback_days} days "
+        "(threshold: {threshold_days} days).",
+    ),
+    Rule(
+        "STOCKOUT_REVENUE_IMPACT",
+        lambda t, p: t["revenue_drop_pct_on_stockout"] >= INVENTORY_REVENUE_DROP_THRESHOLD_PCT,
+        "high",
+        ("product", "severity", "revenue_drop_pct_on_stockout", ("threshold_pct", INVENTORY_REVENUE_DROP_THRESHOLD_PCT)),
+        "{product}: Avg daily revenue is ~{revenue_drop_pct_on_stockout:.1f}% lower on stockout days vs normal days. "
+        "Likely revenue loss from supply constraint.",
+    ),
+    Rule(
+        "LOW_STOCK_PRESSURE",
+        lambda t, p: (t["low_stock_days"] >= p["stockout_threshold"]) & (t["stockout_days"] < p["stockout_threshold"]),
+        "medium",
+        ("product", "severity", "low_stock_days", ("low_stock_threshold_units", INVENTORY_LOW_STOCK_UNITS)),
+        "{product}: {low_stock_days} days with closing stock at or below "
+        "{low_stock_threshold_units} units. Risk of future stockouts if demand spikes.",
+    ),
+]
+ 
+ 
+@memoize
 def inventory_health_vs_revenue(ctx: DataContext, lookback_days: int = 30):
+    return _inventory_health_vs_revenue(Plan(ctx, lookback_days))
+
+
+@memoize
+def inventory_health_vs_revenue_sweep(ctx: DataContext, lookbacks: tuple = (30, 60, 90)):
+    """inventory_health_vs_revenue for every lookback in one pass: {lookback: result}."""
+    return _inventory_sweep(Plan(ctx, max(lookbacks)), lookbacks)
+
+
+def _inventory_health_vs_revenue(plan: Plan):
     """
     Links stock availability (stockouts / low-stock pressure) to revenue outcomes.
     Thresholds from: agent/rag/knowledge/inventory_management.md
@@ -449,14 +558,27 @@ def inventory_health_vs_revenue(ctx: DataContext, lookback_days: int = 30):
     }
     """
  
-    latest = _latest_date(ctx)
+    return _inventory_sweep(plan, [plan.days])[plan.days]
+ 
+ 
+def _inventory_sweep(plan: Plan, lookbacks) -> dict:
+    """
+    _inventory_health_vs_revenue for every lookback (none longer than
+    plan.days) from one pass over the inventory window (nested windows).
+    """
+    latest = plan["latest"]
+    lookbacks = sorted({int(L) for L in lookbacks})
     if latest is None:
-        return None
+        return dict.fromkeys(lookbacks)
+ 
+    inv = plan["inventory_window"]
+    tables = _stockout_impact(inv, plan["sales_window"], latest, lookbacks) if len(inv) else {}
+    return {L: _inventory_window(latest, L, tables.get(L)) for L in lookbacks}
  
-    inv = _date_window(ctx.inventory, "date", latest, lookback_days)
-    sales = _date_window(ctx.sales, "date", latest, lookback_days)
  
-    if inv.empty:
+def _inventory_window(latest, lookback_days: int, product_table):
+    """One lookback of _inventory_sweep from its product table."""
+    if product_table is None or product_table.empty:
         return {
             "as_of": latest.date().isoformat(),
             "window_days": lookback_days,
@@ -465,67 +587,7 @@ def inventory_health_vs_revenue(ctx: DataContext, lookback_days: int = 30):
             "interpretation": ["No inventory data available in the selected window."],
         }
  
-    sales_day = (
-        sales.groupby(["date", "product"], as_index=False)
-        .agg(revenue=("revenue", "sum"), units_sold=("units_sold", "sum"))
-    )
- 
-    inv_day = inv[[
-        "date", "product", "lost_demand", "stockout_flag", "closing_stock", "units_dispatched"
-    ]].copy()
-    inv_day["lost_demand"] = inv_day.get("lost_demand", 0).fillna(0).astype(float)
-    inv_day["is_stockout"] = inv_day["stockout_flag"].astype(str).str.lower().isin(["yes", "true", "1"])
-    inv_day["is_low_stock"] = inv_day["closing_stock"].fillna(0) <= INVENTORY_LOW_STOCK_UNITS
- 
-    merged = inv_day.merge(sales_day, on=["date", "product"], how="left")
-    merged["revenue"] = merged["revenue"].fillna(0.0)
-    merged["units_sold"] = merged["units_sold"].fillna(0.0)
- 
-    merged["realized_price"] = (
-        merged.groupby("product")["revenue"].transform("sum") /
-        merged.groupby("product")["units_sold"].transform("sum")
-    )
-    merged["realized_price"] = merged["realized_price"].fillna(0.0)
- 
-    merged["lost_revenue_estimate"] = 0.0
-    mask = merged["is_stockout"] & (merged["lost_demand"] > 0)
-    merged.loc[mask, "lost_revenue_estimate"] = (
-        merged.loc[mask, "lost_demand"] * merged.loc[mask, "realized_price"]
-    )
- 
-    def _avg_revenue(df, mask):
-        sub = df[mask]
-        if sub.empty:
-            return pd.NA
-        return float(sub["revenue"].mean())
- 
-    rows = []
-    for product, g in merged.groupby("product"):
-        stockout_days = int(g["is_stockout"].sum())
-        low_stock_days = int(g["is_low_stock"].sum())
-        total_days = int(g["date"].nunique())
-        avg_rev_stockout = _avg_revenue(g, g["is_stockout"])
-        avg_rev_normal = _avg_revenue(g, ~g["is_stockout"])
-        lost_units = int(g.loc[g["is_stockout"], "lost_demand"].sum())
-        lost_revenue = float(g.loc[g["is_stockout"], "lost_revenue_estimate"].sum())
- 
-        impact_pct = pd.NA
-        if pd.notna(avg_rev_normal) and avg_rev_normal > 0 and pd.notna(avg_rev_stockout):
-            impact_pct = (avg_rev_normal - avg_rev_stockout) / avg_rev_normal * 100.0
- 
-        rows.append({
-            "product": product,
-            "days_observed": total_days,
-            "stockout_days": stockout_days,
-            "low_stock_days": low_stock_days,
-            "avg_daily_revenue_non_stockout": avg_rev_normal,
-            "avg_daily_revenue_stockout": avg_rev_stockout,
-            "revenue_drop_pct_on_stockout": impact_pct,
-            "lost_units_estimated": lost_units,
-            "lost_revenue_estimated": lost_revenue,
-        })
- 
-    product_table = pd.DataFrame(rows).sort_values(
+    product_table = product_table.sort_values(
         ["stockout_days", "revenue_drop_pct_on_stockout"], ascending=False
     )
  
@@ -535,52 +597,11 @@ def inventory_health_vs_revenue(ctx: DataContext, lookback_days: int = 30):
         round(INVENTORY_STOCKOUT_DAYS_THRESHOLD * (lookback_days / 30))
     )
  
-    flags = []
-    interpretation = []
- 
-    for _, r in product_table.iterrows():
-        p = r["product"]
-        so_days = int(r["stockout_days"])
-        drop = r["revenue_drop_pct_on_stockout"]
- 
-        if so_days >= scaled_stockout_threshold:
-            flags.append({
-                "type": "FREQUENT_STOCKOUTS",
-                "product": p,
-                "severity": "high",
-                "stockout_days": so_days,
-                "threshold_days": scaled_stockout_threshold,
-            })
-            interpretation.append(
-                f"{p}: Stocked out on {so_days} days in the last {lookback_days} days "
-                f"(threshold: {scaled_stockout_threshold} days)."
-            )
- 
-        if pd.notna(drop) and drop >= INVENTORY_REVENUE_DROP_THRESHOLD_PCT:
-            flags.append({
-                "type": "STOCKOUT_REVENUE_IMPACT",
-                "product": p,
-                "severity": "high",
-                "revenue_drop_pct_on_stockout": float(drop),
-                "threshold_pct": INVENTORY_REVENUE_DROP_THRESHOLD_PCT,
-            })
-            interpretation.append(
-                f"{p}: Avg daily revenue is ~{float(drop):.1f}% lower on stockout days vs normal days. "
-                "Likely revenue loss from supply constraint."
-            )
- 
-        if int(r["low_stock_days"]) >= scaled_stockout_threshold and so_days < scaled_stockout_threshold:
-            flags.append({
-                "type": "LOW_STOCK_PRESSURE",
-                "product": p,
-                "severity": "medium",
-                "low_stock_days": int(r["low_stock_days"]),
-                "low_stock_threshold_units": INVENTORY_LOW_STOCK_UNITS,
-            })
-            interpretation.append(
-                f"{p}: {int(r['low_stock_days'])} days with closing stock at or below "
-                f"{INVENTORY_LOW_STOCK_UNITS} units. Risk of future stockouts if demand spikes."
-            )
+    flags, interpretation = evaluate_rules(
+        product_table, INVENTORY_RULES,
+        params={"stockout_threshold": scaled_stockout_threshold, "lookback_days": lookback_days},
+        by_row=True,
+    )
  
     if not flags:
         interpretation.append(
@@ -605,17 +626,51 @@ def inventory_health_vs_revenue(ctx: DataContext, lookback_days: int = 30):
 # INTERPRETATION LAYER — Channel Dependency Risk
 # ------------------------------------------------------
  
+CHANNEL_RULES = [
+    Rule(
+        "CHANNEL_REVENUE_CONCENTRATION",
+        lambda t, p: t["revenue_share_pct"] >= CHANNEL_MAX_REVENUE_SHARE_PCT,
+        lambda t, p: np.where(t["revenue_share_pct"] >= 70.0, "high", "medium"),
+        ("channel", "severity", "revenue_share_pct", ("threshold", CHANNEL_MAX_REVENUE_SHARE_PCT)),
+        "{channel} contributes {revenue_share_pct:.1f}% of total revenue. "
+        "Business may be overly dependent on this channel.",
+    ),
+    Rule(
+        "PROFIT_CONCENTRATION",
+        lambda t, p: t["profit_share_pct"] >= CHANNEL_MAX_PROFIT_SHARE_PCT,
+        "high",
+        ("channel", "severity", "profit_share_pct", ("threshold", CHANNEL_MAX_PROFIT_SHARE_PCT)),
+        "{channel} contributes {profit_share_pct:.1f}% of total profit. "
+        "Profitability is fragile if this channel degrades.",
+    ),
+    # Positive revenue, negative net margin
+    Rule(
+        "ROAS_ILLUSION",
+        lambda t, p: (t["profit_margin_pct"] < 0) & (t["revenue"] > 0),
+        "high",
+        ("channel", "severity", "profit_margin_pct"),
+        "{channel} generates revenue but has negative net margin. "
+        "This channel appears efficient but is destroying value.",
+    ),
+]
+ 
+ 
+@memoize
 def channel_dependency_risk(ctx: DataContext):
+    return _channel_dependency_risk(Plan(ctx))
+
+
+def _channel_dependency_risk(plan: Plan):
     """
     Evaluates business risk from over-dependence on specific channels.
     Thresholds from: agent/rag/knowledge/channel_dependency.md
     """
  
-    latest = _latest_date(ctx)
+    latest = plan["latest"]
     if latest is None:
         return None
  
-    df = true_profit_by_channel(ctx).copy()
+    df = plan["profit_by_channel"]
     if df.empty:
         return None
  
@@ -625,53 +680,7 @@ def channel_dependency_risk(ctx: DataContext):
     df["revenue_share_pct"] = df["revenue"] / total_revenue * 100 if total_revenue > 0 else 0
     df["profit_share_pct"] = df["net_profit"] / total_profit * 100 if total_profit > 0 else 0
  
-    flags = []
-    interpretation = []
- 
-    # Revenue concentration
-    for _, r in df.iterrows():
-        if r["revenue_share_pct"] >= CHANNEL_MAX_REVENUE_SHARE_PCT:
-            severity = "high" if r["revenue_share_pct"] >= 70.0 else "medium"
-            flags.append({
-                "type": "CHANNEL_REVENUE_CONCENTRATION",
-                "channel": r["channel"],
-                "severity": severity,
-                "revenue_share_pct": float(r["revenue_share_pct"]),
-                "threshold": CHANNEL_MAX_REVENUE_SHARE_PCT,
-            })
-            interpretation.append(
-                f"{r['channel']} contributes {r['revenue_share_pct']:.1f}% of total revenue. "
-                "Business may be overly dependent on this channel."
-            )
- 
-    # Profit concentration
-    for _, r in df.iterrows():
-        if r["profit_share_pct"] >= CHANNEL_MAX_PROFIT_SHARE_PCT:
-            flags.append({
-                "type": "PROFIT_CONCENTRATION",
-                "channel": r["channel"],
-                "severity": "high",
-                "profit_share_pct": float(r["profit_share_pct"]),
-                "threshold": CHANNEL_MAX_PROFIT_SHARE_PCT,
-            })
-            interpretation.append(
-                f"{r['channel']} contributes {r['profit_share_pct']:.1f}% of total profit. "
-                "Profitability is fragile if this channel degrades."
-            )
- 
-    # ROAS illusion: positive revenue, negative net margin
-    illusion = df[(df["profit_margin_pct"] < 0) & (df["revenue"] > 0)]
-    for _, r in illusion.iterrows():
-        flags.append({
-            "type": "ROAS_ILLUSION",
-            "channel": r["channel"],
-            "severity": "high",
-            "profit_margin_pct": float(r["profit_margin_pct"]),
-        })
-        interpretation.append(
-            f"{r['channel']} generates revenue but has negative net margin. "
-            "This channel appears efficient but is destroying value."
-        )
+    flags, interpretation = evaluate_rules(df, CHANNEL_RULES)
  
     # Single healthy channel
     healthy = df[df["profit_margin_pct"] >= CHANNEL_MIN_HEALTHY_MARGIN_PCT]
@@ -704,4 +713,36 @@ def channel_dependency_risk(ctx: DataContext):
             "min_healthy_margin_pct": CHANNEL_MIN_HEALTHY_MARGIN_PCT,
         }
     }
- 
\ No newline at end of file
+ 
+
+
+# ------------------------------------------------------
+# FULL INTERPRETATION PASS
+# ------------------------------------------------------
+
+def _growth_quality(plan: Plan):
+    return interpret_growth_quality(plan["recent_performance"], plan["profit_by_product"])
+
+
+# name -> evaluator(plan); every evaluator reads its inputs from the shared plan
+INTERPRETERS = {
+    "marketing_efficiency": _marketing_efficiency,
+    "product_portfolio_health": _product_portfolio_health,
+    "inventory_health_vs_revenue": _inventory_health_vs_revenue,
+    "channel_dependency_risk": _channel_dependency_risk,
+    "growth_quality": _growth_quality,
+}
+
+
+@memoize
+def interpret_all(ctx: DataContext, lookback_days: int = 30):
+    """
+    Runs every interpreter against one shared Plan: each intermediate
+    (windows, profit tables, recent performance) is computed once and
+    read by every interpreter that needs it.
+
+    Returns {interpreter name: result}.
+    """
+    plan = Plan(ctx, lookback_days)
+    return {name: evaluate(plan) for name, evaluate in INTERPRETERS.items()}
+
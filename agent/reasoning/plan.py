@@ -0,0 +1,67 @@
+from agent.core.context import DataContext
+from agent.core.memo import _copy
+from agent.analytics.executive import _latest_date, revenue_recent_performance
+from agent.analytics.profit import channel_profit, product_profit, sales_by_segment
+from agent.analytics.rollup import rollup
+
+# ------------------------------------------------------
+# SHARED INTERPRETATION PLAN
+# ------------------------------------------------------
+# The interpreters in reasoning/interpret.py read overlapping
+# intermediates: the latest date, windows of marketing, sales and
+# inventory, profit by product and profit by channel. Each one is a node
+# of a small dependency graph (INTERMEDIATES). A Plan resolves a node on
+# first access, after its dependencies, and hands that one result to
+# every interpreter that asks for it; results are also kept in the
+# context memo for the data version, so separate interpreter calls in a
+# turn share them too.
+#
+# Profit by product and by channel are both derived from one
+# (product, channel) rollup of the cube, and windowed sales are read
+# from the cube too: the marketing and inventory interpreters only need
+# revenue, units and product cost per (date, product, channel), never
+# the raw order rows.
+
+
+def _window(table: str):
+    def build(ctx: DataContext, days: int, latest):
+        return ctx.window(table, latest, days)
+    return build
+
+
+# node -> (dependencies, depends on the lookback, builder(ctx, days, *dependency results))
+INTERMEDIATES = {
+    "latest": ((), False, lambda ctx, days: _latest_date(ctx)),
+    "marketing_window": (("latest",), True, _window("marketing")),
+    "sales_window": (("latest",), True, _window("cube")),
+    "inventory_window": (("latest",), True, _window("inventory")),
+    "sales_by_segment": ((), False, lambda ctx, days: sales_by_segment(ctx)),
+    "spend_by_channel": ((), False, lambda ctx, days: rollup(ctx, ["channel"], ["spend"])),
+    "profit_by_product": (("sales_by_segment",), False, lambda ctx, days, seg: product_profit(seg)),
+    "profit_by_channel": (
+        ("sales_by_segment", "spend_by_channel"), False,
+        lambda ctx, days, seg, spend: channel_profit(seg, spend),
+    ),
+    "recent_performance": ((), False, lambda ctx, days: revenue_recent_performance(ctx, n=7)),
+}
+
+
+class Plan:
+    """
+    The intermediates of one interpretation pass over `ctx` with a
+    `days` lookback. plan["sales_window"] builds the node (and its
+    dependencies) once; later reads get a copy of the same result.
+    """
+
+    def __init__(self, ctx: DataContext, days: int = 30):
+        self.ctx = ctx
+        self.days = int(days)
+        self.results = {}
+
+    def __getitem__(self, name: str):
+        if name not in self.results:
+            deps, windowed, build = INTERMEDIATES[name]
+            inputs = [self[d] for d in deps]
+            key = ("plan", name, self.ctx.version, self.days if windowed else None)
+            self.results[name] = self.ctx.memoized(key, lambda: build(self.ctx, self.days, *inputs))
+        return _copy(self.results[name])
@@ -0,0 +1,109 @@
+from dataclasses import dataclass
+from typing import Callable, Union
+
+import numpy as np
+import pandas as pd
+
+# ------------------------------------------------------
+# DECLARATIVE FLAG RULES
+# ------------------------------------------------------
+# Interpretation flags are rows of a table: each Rule states the flag
+# type, a predicate over the entity table (channels, products, ...),
+# the severity and the evidence the flag carries. evaluate_rules()
+# computes every predicate as one boolean mask over the whole table and
+# builds flags only for the rows that fire, so the cost does not grow
+# with per-row Python work on tables with thousands of entities.
+#
+# Evidence entries, in flag key order:
+#   "name"           the column (or parameter) of that name; "severity"
+#                    is the rule's severity for the row
+#   ("key", "name")  a column or parameter stored under another key
+#   ("key", value)   a literal (thresholds)
+# Predicates compare with NaN as False, so missing values never fire.
+
+
+@dataclass(frozen=True)
+class Rule:
+    type: str
+    when: Callable                      # (table, params) -> boolean mask
+    severity: Union[str, Callable]      # label, or (table, params) -> labels per row
+    evidence: tuple
+    text: str                           # interpretation line, formatted with params and the flag
+
+
+def _scalar(value):
+    """Plain Python values in flags (None for missing)."""
+    if value is None or value is pd.NA or (isinstance(value, (float, np.floating)) and np.isnan(value)):
+        return None
+    if isinstance(value, np.integer):
+        return int(value)
+    if isinstance(value, np.floating):
+        return float(value)
+    if isinstance(value, np.bool_):
+        return bool(value)
+    return value
+
+
+def _mask(values) -> np.ndarray:
+    if isinstance(values, pd.Series):
+        values = values.to_numpy(dtype=object, na_value=False)
+    return np.asarray(values, dtype=bool)
+
+
+def evaluate_rules(table: pd.DataFrame, rules: list, params: dict = None, by_row: bool = False):
+    """
+    Flags and interpretation lines for every row of `table` matching
+    each rule. Flags are ordered rule by rule (rows in table order), or
+    row by row (rules in list order) with `by_row`.
+
+    Returns (flags, interpretation).
+    """
+    params = params or {}
+    fired = []
+    for i, rule in enumerate(rules):
+        rows = np.flatnonzero(_mask(rule.when(table, params)))
+        if not len(rows):
+            continue
+        if callable(rule.severity):
+            severity = np.asarray(rule.severity(table, params), dtype=object)[rows].tolist()
+        else:
+            severity = [rule.severity] * len(rows)
+
+        values = {}
+        for entry in rule.evidence:
+            key, source = (entry, entry) if isinstance(entry, str) else entry
+            if source == "severity":
+                values[key] = severity
+            elif isinstance(source, str) and source in table.columns:
+                values[key] = [_scalar(v) for v in table[source].to_numpy(dtype=object)[rows]]
+            elif isinstance(source, str):
+                values[key] = [params[source]] * len(rows)
+            else:
+                values[key] = [source] * len(rows)
+
+        for n, row in enumerate(rows):
+            fired.append((row, i, {"type": rule.type, **{k: v[n] for k, v in values.items()}}))
+
+    if by_row:
+        fired.sort(key=lambda f: (f[0], f[1]))
+    flags = [flag for _, _, flag in fired]
+    interpretation = [rules[i].text.format(**{**params, **flag}) for _, i, flag in fired]
+    return flags, interpretation
+
+
+def rule_hits(table: pd.DataFrame, rules: list, params: dict = None) -> pd.DataFrame:
+    """
+    The row, type and severity of every rule firing on `table`, rule by
+    rule, without evidence or text: for tables too large to build flags
+    for (one row per entity per day, see reasoning/backtest.py).
+    """
+    params = params or {}
+    hits = []
+    for rule in rules:
+        rows = np.flatnonzero(_mask(rule.when(table, params)))
+        if callable(rule.severity):
+            severity = np.asarray(rule.severity(table, params), dtype=object)[rows]
+        else:
+            severity = rule.severity
+        hits.append(pd.DataFrame({"row": rows, "type": rule.type, "severity": severity}))
+    return pd.concat(hits, ignore_index=True)
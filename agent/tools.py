@@ -1,8 +1,9 @@
 # tools.py
+import functools
 from typing import Dict, Any
 import pandas as pd
 
-from agent.core.context import load_context
+from agent.core.registry import get_context
 from agent.analytics.sales import (
     sales_by_product,
     sales_by_region,
@@ -13,9 +14,12 @@ from agent.analytics.sales import (
     top_regions,
 )
 
+from agent.analytics.rollup import rollup, MEASURES
+
 from agent.analytics.inventory import (
     stockouts_by_product,
     avg_closing_stock,
+    stockout_streaks,
 )
 
 from agent.analytics.marketing import (
@@ -32,43 +36,89 @@ from agent.analytics.profit import (
 from agent.analytics.executive import (
     daily_delta,
     revenue_recent_performance,
+    revenue_windows,
+    BASELINE_WINDOWS,
 )
 
+from agent.analytics.variance import revenue_variance, SEGMENT_DIMS
+
 from agent.reasoning.interpret import (
     interpret_growth_quality,
     marketing_efficiency,
+    marketing_efficiency_sweep,
     product_portfolio_health,
     inventory_health_vs_revenue,
+    inventory_health_vs_revenue_sweep,
     channel_dependency_risk,
+    interpret_all,
 )
 
+from agent.reasoning.backtest import flag_timeline
+
 from agent.decisions.recommend import generate_recommendations
 
-# Load ONCE
+# Warm context shared across agent turns (reloaded only when CSVs change)
 CTX = None
 CURRENT_COMPANY = None
 
 def init_company(company_id: str):
     global CTX, CURRENT_COMPANY
-    CTX = load_context(company_id)
+    CTX = get_context(company_id)
     CURRENT_COMPANY = company_id
 
+def uses(*tables, windows=()):
+    """
+    Declares the DataContext tables a tool reads. Only those (and the
+    CSVs they are built from) are loaded before the tool runs, so e.g.
+    inventory tools never parse the sales history. `windows` are tables
+    the tool only reads through ctx.window (see DataContext.require).
+    """
+    def decorator(func):
+        @functools.wraps(func)
+        def tool(*args, **kwargs):
+            CTX.require(*tables, windows=windows)
+            return func(*args, **kwargs)
+        tool.tables = tables + tuple(windows)
+        return tool
+    return decorator
+
 # ----------------------
 # EXECUTIVE TOOLS
 # ----------------------
 
+@uses("daily")
 def tool_daily_delta() -> Dict[str, Any]:
     return daily_delta(CTX)
 
+@uses("daily")
 def tool_revenue_recent_performance(n: int = 7) -> Dict[str, Any]:
     return revenue_recent_performance(CTX, n=n)
 
+@uses("daily")
+def tool_revenue_windows(windows=None) -> Dict[str, Any]:
+    readings = revenue_windows(CTX, windows=tuple(windows or BASELINE_WINDOWS))
+    return None if readings is None else {str(n): r for n, r in readings.items()}
+
+@uses("daily", windows=("cube",))
+def tool_revenue_variance(days: int = 30) -> Dict[str, Any]:
+    """Last `days` vs the `days` before: price, volume and mix effects by product, region and channel."""
+    result = revenue_variance(CTX, days=days)
+    if result is None:
+        return None
+    return {
+        **result,
+        **{f"by_{dim}": result[f"by_{dim}"].to_dict("records") for dim in SEGMENT_DIMS},
+    }
+
+@uses("cube")
 def tool_top_products(n: int = 3):
     return top_products(CTX, n=n).to_dict("records")
 
+@uses("cube")
 def tool_top_regions(n: int = 3):
     return top_regions(CTX, n=n).to_dict("records")
 
+@uses("cube", "marketing")
 def tool_true_profit_by_channel():
     return true_profit_by_channel(CTX).to_dict("records")
 
@@ -77,24 +127,40 @@ def tool_true_profit_by_channel():
 # ANALYTICS TOOLS
 # ----------------------
 
+def tool_rollup(dims=None, measures=None, window_days: int = None, top_n: int = None):
+    """
+    One parameterized breakdown: `measures` by `dims`, optionally over the
+    last `window_days` and cut to the `top_n` largest rows.
+    """
+    measures = list(measures or ["revenue"])
+    CTX.require(*{MEASURES.get(m, ("cube",))[0] for m in measures})
+    return rollup(CTX, dims or [], measures, window=window_days, top_n=top_n).to_dict("records")
+
+@uses("cube")
 def tool_sales_by_product():
     return sales_by_product(CTX).to_dict("records")
 
+@uses("cube")
 def tool_sales_by_region():
     return sales_by_region(CTX).to_dict("records")
 
+@uses("cube")
 def tool_sales_by_channel():
     return sales_by_channel(CTX).to_dict("records")
 
+@uses("cube_month")
 def tool_revenue_by_month():
     return revenue_by_month(CTX).to_dict("records")
 
+@uses("cube_month")
 def tool_revenue_by_month_by_product():
     return revenue_by_month_by_product(CTX).to_dict("records")
 
+@uses("cube")
 def tool_profit_by_product():
     return profit_by_product(CTX).to_dict("records")
 
+@uses("unit")
 def tool_cost_components_by_product():
     return cost_components_by_product(CTX).to_dict("records")
 
@@ -102,19 +168,27 @@ def tool_cost_components_by_product():
 # INVENTORY TOOLS
 # ------------------------------
 
+@uses("inventory")
 def tool_inventory_stockouts():
     return stockouts_by_product(CTX).to_dict("records")
 
+@uses("inventory")
 def tool_inventory_avg_stock():
     return avg_closing_stock(CTX).to_dict("records")
 
+@uses("inventory")
+def tool_inventory_stockout_streaks():
+    return stockout_streaks(CTX).to_dict("records")
+
 # ------------------------------
 # MARKETING TOOLS
 # ------------------------------
 
+@uses("marketing")
 def tool_marketing_roas():
     return roas_by_channel(CTX).to_dict(orient = "records")
 
+@uses("marketing_month")
 def tool_marketing_spend_trend():
     return spend_over_time(CTX).to_dict(orient = "records")
 
@@ -122,27 +196,46 @@ def tool_marketing_spend_trend():
 # INTERPRETATION TOOLS 
 # ----------------------
 
+@uses("daily", "cube")
 def tool_interpret_growth_quality():
     recent = revenue_recent_performance(CTX, n=7)
     prof = profit_by_product(CTX)
     return interpret_growth_quality(recent, prof)
 
-def tool_marketing_efficiency(lookback_days: int = 30):
+@uses("daily", windows=("marketing", "cube"))
+def tool_marketing_efficiency(lookback_days: int = 30, lookbacks=None):
+    """One lookback, or every one of `lookbacks` in one pass ({"30": ..., "90": ...})."""
+    if lookbacks:
+        results = marketing_efficiency_sweep(CTX, lookbacks=tuple(sorted({int(n) for n in lookbacks})))
+        return {str(n): r for n, r in results.items()}
     return marketing_efficiency(CTX,lookback_days=lookback_days)
 
+@uses("daily", "cube")
 def tool_product_portfolio_health():
     return product_portfolio_health(CTX)
 
-def tool_inventory_health_vs_revenue(lookback_days: int = 30):
+@uses("daily", windows=("inventory", "cube"))
+def tool_inventory_health_vs_revenue(lookback_days: int = 30, lookbacks=None):
+    """One lookback, or every one of `lookbacks` in one pass ({"30": ..., "90": ...})."""
+    if lookbacks:
+        results = inventory_health_vs_revenue_sweep(CTX, lookbacks=tuple(sorted({int(n) for n in lookbacks})))
+        return {str(n): r for n, r in results.items()}
     return inventory_health_vs_revenue(CTX, lookback_days=lookback_days)
 
+@uses("daily", "cube", "marketing")
 def tool_channel_dependency_risk():
     return channel_dependency_risk(CTX)
 
+@uses("daily", "cube", "marketing", windows=("inventory",))
+def tool_flag_timeline(days: int = 365, lookback_days: int = 30):
+    """When each interpretation flag fired over the last `days` days, as runs of consecutive days."""
+    return flag_timeline(CTX, days=days, lookback_days=lookback_days).to_dict("records")
+
 # ----------------------
 # RECOMMENDATION TOOL
 # ----------------------
 
+@uses("daily", "cube", "marketing", windows=("inventory",))
 def tool_generate_recommendations():
     """
     Assembles a structured, prioritised recommendation context
@@ -155,19 +248,15 @@ def tool_generate_recommendations():
  
     flags = []
  
-    me = marketing_efficiency(CTX)
-    pp = product_portfolio_health(CTX)
-    inv = inventory_health_vs_revenue(CTX)
-    ch = channel_dependency_risk(CTX)
+    results = interpret_all(CTX)
  
-    for block in [me, pp, inv, ch]:
+    for name in ["marketing_efficiency", "product_portfolio_health",
+                 "inventory_health_vs_revenue", "channel_dependency_risk"]:
+        block = results[name]
         if block:
             flags.extend(block.get("flags", []))
  
-    growth_signal = interpret_growth_quality(
-        revenue_recent_performance(CTX, n=7),
-        profit_by_product(CTX)
-    )
+    growth_signal = results["growth_quality"]
  
     payload = generate_recommendations(
         flags=flags,
@@ -2,6 +2,7 @@ import streamlit as st
 from ui.create_company import render_create_company
 from ui.dashboard import render_dashboard
 from ui.auto_panel import render_auto_panel
+from agent.core.portfolio import load_portfolio
 from pathlib import Path
 import shutil
 
@@ -63,6 +64,12 @@ if st.session_state.company_id is None:
 
     companies = get_existing_companies()
 
+    # Warm every company's cube concurrently, once per session, so the first AUTO brief is instant;
+    # everything else stays lazy (and under the registry's memory budget)
+    if not st.session_state.get("portfolio_warmed"):
+        load_portfolio(DATA_ROOT, companies, tables=("cube",))
+        st.session_state.portfolio_warmed = True
+
     if mode == "Explore demo company (recommended)":
         if not companies:
             st.warning("No demo companies found.")
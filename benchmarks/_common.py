@@ -0,0 +1,209 @@
+"""
+Fixtures shared by the benchmark scripts: seeded synthetic data and timers.
+
+Scripts put the repository root on sys.path and import this module as
+`benchmarks._common`, so they run from any working directory.
+"""
+import tempfile
+import time
+import tracemalloc
+from contextlib import contextmanager
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from agent.core.context import DataContext, load_context
+
+REGIONS = ["North", "South", "East", "West"]
+CHANNELS = ["Amazon", "Google", "Instagram", "Meta", "TikTok", "Website"]
+
+
+# ------------------------------------------------------------------
+# Timers
+# ------------------------------------------------------------------
+
+def timed(fn, *args):
+    """(seconds, result) of one call."""
+    start = time.perf_counter()
+    out = fn(*args)
+    return time.perf_counter() - start, out
+
+
+def measured(fn, *args):
+    """(seconds, peak traced MB, result) of one call under tracemalloc."""
+    tracemalloc.start()
+    start = time.perf_counter()
+    out = fn(*args)
+    seconds = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return seconds, peak / 1024 / 1024, out
+
+
+# ------------------------------------------------------------------
+# Sales
+# ------------------------------------------------------------------
+
+def write_sales(path, rows: int, products: int = 500, rows_per_day: int = 500):
+    """sales.csv with the required columns, sorted by date."""
+    rng = np.random.default_rng(0)
+    names = np.array([f"P{i:04d}" for i in range(products)])
+    dates = pd.date_range("2020-01-01", periods=max(1, rows // rows_per_day)).strftime("%Y-%m-%d")
+    pd.DataFrame({
+        "date": dates[np.sort(rng.integers(0, len(dates), rows))],
+        "product": names[rng.integers(0, products, rows)],
+        "region": rng.choice(REGIONS, rows),
+        "channel": rng.choice(CHANNELS, rows),
+        "units_sold": rng.integers(1, 50, rows),
+        "revenue": rng.integers(100, 50_000, rows) + 0.5,
+        "CAC": rng.random(rows) * 500,
+    }).to_csv(path, index=False)
+
+
+def make_enriched_sales(rows: int, products: int) -> pd.DataFrame:
+    """In-memory sales lines with a per-product unit_cost, as after enrichment."""
+    rng = np.random.default_rng(0)
+    codes = rng.integers(0, products, rows)
+    unit_cost = rng.random(products) * 400 + 50
+    return pd.DataFrame({
+        "product": pd.Categorical.from_codes(codes, [f"P{i:05d}" for i in range(products)]),
+        "units_sold": rng.integers(1, 20, rows).astype("int32"),
+        "revenue": rng.random(rows) * 5_000,
+        "unit_cost": unit_cost[codes],
+    })
+
+
+# ------------------------------------------------------------------
+# Inventory
+# ------------------------------------------------------------------
+
+def make_inventory(products: int, days: int, flip_rate: float = 0.05) -> pd.DataFrame:
+    """
+    Daily inventory rows per SKU. Stockouts are sticky (each day flips
+    the state with probability `flip_rate`), so they come in multi-day runs.
+    """
+    rng = np.random.default_rng(0)
+    flips = rng.random((days, products)) < flip_rate
+    stockout = np.logical_xor.accumulate(flips, axis=0).ravel()
+    n = days * products
+    return pd.DataFrame({
+        "date": np.repeat(pd.date_range("2022-01-01", periods=days), products),
+        "product": pd.Categorical.from_codes(
+            np.tile(np.arange(products), days), [f"SKU{i:05d}" for i in range(products)]
+        ),
+        "opening_stock": rng.integers(0, 80, n),
+        "units_produced": rng.integers(0, 30, n),
+        "units_dispatched": rng.integers(0, 40, n),
+        "closing_stock": np.where(stockout, 0, rng.integers(1, 80, n)),
+        "lost_demand": np.where(stockout, rng.integers(0, 20, n), 0),
+        "stockout_flag": pd.Categorical(np.where(stockout, "Yes", "No")),
+    })
+
+
+def make_inventory_context(products: int, days: int) -> DataContext:
+    """
+    make_inventory plus a sales cube with one row per (date, product,
+    channel) a product sold on, fewer on stockout days, and its daily totals.
+    """
+    inventory = make_inventory(products, days, flip_rate=0.08)
+    rng = np.random.default_rng(1)
+    price = rng.integers(10, 500, products).astype(float)
+    stockout = (inventory["stockout_flag"] == "Yes").to_numpy()
+    sold = rng.random((len(inventory), len(CHANNELS))) < np.where(stockout, 0.2, 0.7)[:, None]
+    row, channel = np.nonzero(sold)
+    units = rng.integers(1, 8, len(row))
+    cube = pd.DataFrame({
+        "date": inventory["date"].to_numpy()[row],
+        "product": inventory["product"].to_numpy()[row],
+        "region": "North",
+        "channel": pd.Categorical.from_codes(channel, CHANNELS),
+        "revenue": units * price[row % products],
+        "units": units,
+        "cost": units * price[row % products] * 0.6,
+    }).astype({"product": "category", "region": "category"})
+    daily = cube.groupby("date", as_index=False)["revenue"].sum()
+    return DataContext(tables={"inventory": inventory, "cube": cube, "daily": daily})
+
+
+def make_product_table(products: int) -> pd.DataFrame:
+    """Per-product inventory statistics, the table INVENTORY_RULES runs over."""
+    rng = np.random.default_rng(0)
+    drop = rng.normal(5, 15, products)
+    return pd.DataFrame({
+        "product": [f"SKU{i:05d}" for i in range(products)],
+        "stockout_days": rng.poisson(1.5, products),
+        "low_stock_days": rng.poisson(3, products),
+        "revenue_drop_pct_on_stockout": np.where(rng.random(products) < 0.2, np.nan, drop),
+    })
+
+
+# ------------------------------------------------------------------
+# Companies
+# ------------------------------------------------------------------
+
+def write_company(path: Path, products: int, days: int) -> int:
+    """Writes every CSV of a company to `path`; returns the number of sales rows."""
+    rng = np.random.default_rng(0)
+    names = [f"P{i:04d}" for i in range(products)]
+    dates = pd.date_range("2022-01-01", periods=days)
+    price = rng.integers(10, 500, products).astype(float)
+    pd.DataFrame({
+        "product": names,
+        "selling_price": price,
+        "cogs": (price * rng.uniform(0.3, 0.9, products)).round(),
+        "gross_margin": price * 0.4,
+        "packaging_cost": (price * 0.05).round(),
+        "logistics_cost": (price * 0.08).round(),
+    }).to_csv(path / "unit_economics.csv", index=False)
+
+    rows = days * products * 4
+    d = np.sort(rng.integers(0, days, rows))
+    p = rng.integers(0, products, rows)
+    units = rng.integers(1, 10, rows)
+    pd.DataFrame({
+        "date": dates[d].strftime("%Y-%m-%d"),
+        "product": np.array(names)[p],
+        "region": rng.choice(REGIONS, rows),
+        "channel": rng.choice(CHANNELS, rows),
+        "units_sold": units,
+        "revenue": units * price[p],
+        "CAC": rng.random(rows) * 20,
+    }).to_csv(path / "sales.csv", index=False)
+
+    n = days * len(CHANNELS)
+    pd.DataFrame({
+        "date": np.repeat(dates, len(CHANNELS)).strftime("%Y-%m-%d"),
+        "channel": np.tile(CHANNELS, days),
+        "spend": rng.random(n).round(2) * 20_000,
+        "impressions": rng.integers(1_000, 900_000, n),
+        "clicks": rng.integers(100, 40_000, n),
+        "conversions": rng.integers(10, 10_000, n),
+        "revenue": rng.random(n).round(2) * 60_000,
+    }).to_csv(path / "marketing.csv", index=False)
+
+    n = days * products
+    stock = rng.integers(0, 60, n)
+    pd.DataFrame({
+        "date": np.repeat(dates, products).strftime("%Y-%m-%d"),
+        "product": np.tile(names, days),
+        "opening_stock": stock + 10,
+        "units_produced": rng.integers(0, 30, n),
+        "units_dispatched": rng.integers(0, 40, n),
+        "closing_stock": stock,
+        "lost_demand": np.where(stock == 0, rng.integers(1, 20, n), 0),
+        "stockout_flag": np.where(stock == 0, "Yes", "No"),
+    }).to_csv(path / "inventory.csv", index=False)
+    return rows
+
+
+@contextmanager
+def synthetic_company(products: int, days: int, tables=("daily", "cube", "marketing", "inventory")):
+    """Writes a company to a temp dir and yields (ctx, sales rows) with `tables` loaded."""
+    with tempfile.TemporaryDirectory() as tmp:
+        company = Path(tmp) / "Synthetic"
+        company.mkdir()
+        rows = write_company(company, products, days)
+        ctx = load_context("Synthetic", base_dir=tmp, use_cache=False)
+        ctx.require(*tables)
+        yield ctx, rows
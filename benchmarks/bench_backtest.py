@@ -0,0 +1,70 @@
+"""
+Interpreters run once per day vs. the flag timeline backtest.
+
+    python benchmarks/bench_backtest.py [products] [days] [sampled days]
+
+Writes a synthetic company (default 500 products × 1,095 days, as in
+bench_interpret.py), loads every table once, then:
+  - loop:     for a sample of days (default 12) in the last year, cuts
+              every table at that day and runs interpret_all on it; the
+              per-day cost is extrapolated to the whole year
+  - backtest: reasoning/backtest.flag_timeline over the last 365 days
+Flags on the sampled days must match the timeline.
+"""
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from agent.core.context import DataContext  # noqa: E402
+from agent.reasoning.backtest import flag_timeline  # noqa: E402
+from agent.reasoning.interpret import interpret_all  # noqa: E402
+from benchmarks._common import synthetic_company, timed  # noqa: E402
+
+TABLES = ("daily", "cube", "marketing", "inventory")
+
+
+def flags_as_of(ctx: DataContext, day: pd.Timestamp) -> set:
+    """(interpreter, type, entity, severity) of interpret_all on every table cut at `day`."""
+    cut = DataContext(tables={name: ctx.table(name)[ctx.table(name)["date"] <= day] for name in TABLES})
+    flags = set()
+    for name, block in interpret_all(cut).items():
+        if name == "growth_quality":
+            if block["signal"] != "NEUTRAL":
+                flags.add((name, block["signal"], None, block["confidence"].lower()))
+        elif block:
+            flags.update(
+                (name, f["type"], f.get("channel", f.get("product")), f["severity"]) for f in block["flags"]
+            )
+    return flags
+
+
+def main():
+    products = int(sys.argv[1]) if len(sys.argv) > 1 else 500
+    days = int(sys.argv[2]) if len(sys.argv) > 2 else 1_095
+    sampled = int(sys.argv[3]) if len(sys.argv) > 3 else 12
+
+    with synthetic_company(products, days, TABLES) as (ctx, rows):
+        print(f"{products:,} products × {days:,} days, {rows:,} sales rows, backtest over 365 days")
+
+        t_backtest, timeline = timed(lambda: flag_timeline(ctx, days=365))
+
+        year = ctx.daily["date"].iloc[-365:]
+        sample = year.iloc[np.linspace(0, len(year) - 1, sampled).astype(int)]
+        t_sample, expected = timed(lambda: {day: flags_as_of(ctx, day) for day in sample})
+        t_loop = t_sample / sampled * len(year)
+
+        for day, flags in expected.items():
+            fired = timeline[(timeline["start"] <= day) & (timeline["end"] >= day)]
+            assert flags == {(r.interpreter, r.type, r.entity, r.severity) for r in fired.itertuples()}, day
+
+        print(f"{len(timeline):,} flag runs")
+        print(f"loop     {t_loop:>8.1f} s  (extrapolated from {sampled} days)")
+        print(f"backtest {t_backtest:>8.1f} s  ({t_loop / t_backtest:.0f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,56 @@
+"""
+Typed CSV ingestion vs. the old untyped read.
+
+    python benchmarks/bench_ingest.py [rows]
+
+Writes a synthetic sales.csv (default 5,000,000 rows) to a temp dir and
+times / sizes:
+  - baseline: pd.read_csv + pd.to_datetime (dtype inference, object dims)
+  - typed:    agent.core.ingest.read_typed_csv (explicit dtypes, dates
+              parsed during the read, pyarrow engine when installed)
+"""
+import sys
+import tempfile
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from agent.core.context import REQUIRED  # noqa: E402
+from agent.core.ingest import HAS_PYARROW, read_typed_csv  # noqa: E402
+from benchmarks._common import timed, write_sales  # noqa: E402
+
+
+def baseline(raw_path: Path) -> pd.DataFrame:
+    df = pd.read_csv(raw_path)
+    df["date"] = pd.to_datetime(df["date"])
+    return df
+
+
+def typed(raw_path: Path) -> pd.DataFrame:
+    return read_typed_csv(raw_path.read_bytes(), required=REQUIRED["sales"], name="sales")
+
+
+def run(label: str, fn, path: Path):
+    elapsed, df = timed(fn, path)
+    mb = df.memory_usage(deep=True).sum() / 1024 ** 2
+    print(f"{label:<10} {elapsed:8.2f} s   {mb:9.1f} MB   {len(df):,} rows")
+    return df
+
+
+def main():
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 5_000_000
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "sales.csv"
+        write_sales(path, rows, products=50, rows_per_day=40)
+        print(f"sales.csv: {path.stat().st_size / 1024 ** 2:.1f} MB on disk, pyarrow={HAS_PYARROW}")
+        a = run("baseline", baseline, path)
+        b = run("typed", typed, path)
+        assert np.isclose(a["revenue"].sum(), b["revenue"].sum())
+        assert (a["date"].values == b["date"].values).all()
+
+
+if __name__ == "__main__":
+    main()
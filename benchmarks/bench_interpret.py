@@ -0,0 +1,42 @@
+"""
+Single interpreters vs. one shared-plan recommendation pass.
+
+    python benchmarks/bench_interpret.py [products] [days]
+
+Writes a synthetic company (default 500 products × 1,095 days, ~2M
+sales rows) to a temp dir, loads every table once, then times from an
+empty memo:
+  - each interpreter on its own (what it costs alone)
+  - reasoning/interpret.interpret_all (all five against one Plan)
+"""
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from agent.reasoning.interpret import INTERPRETERS, interpret_all  # noqa: E402
+from agent.reasoning.plan import Plan  # noqa: E402
+from benchmarks._common import synthetic_company, timed  # noqa: E402
+
+
+def main():
+    products = int(sys.argv[1]) if len(sys.argv) > 1 else 500
+    days = int(sys.argv[2]) if len(sys.argv) > 2 else 1_095
+
+    with synthetic_company(products, days) as (ctx, rows):
+        print(f"{products:,} products × {days:,} days, {rows:,} sales rows")
+
+        singles = {}
+        for name, evaluate in INTERPRETERS.items():
+            ctx.memo.clear()
+            singles[name], _ = timed(lambda: evaluate(Plan(ctx)))
+            print(f"{name:<28} {singles[name]:>8.3f} s")
+
+        ctx.memo.clear()
+        t_all, _ = timed(interpret_all, ctx)
+        print(f"{'sum of interpreters':<28} {sum(singles.values()):>8.3f} s")
+        print(f"{'shared-plan pass':<28} {t_all:>8.3f} s")
+
+
+if __name__ == "__main__":
+    main()
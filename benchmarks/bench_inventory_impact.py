@@ -0,0 +1,87 @@
+"""
+Per-product loop vs. one grouped aggregation for inventory impact.
+
+    python benchmarks/bench_inventory_impact.py [products] [days]
+
+Builds a synthetic inventory + sales cube (default 5,000 SKUs × 365
+days) and computes the inventory_health_vs_revenue product table twice:
+  - loop:   merge, two groupby().transform("sum") for the realized price
+            and a Python loop over merged.groupby("product") computing
+            seven statistics with separate boolean filters
+  - vector: reasoning/interpret.inventory_health_vs_revenue (indicator
+            columns aligned by category codes, one grouped sum)
+"""
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from agent.core.context import DataContext  # noqa: E402
+from agent.reasoning.interpret import INVENTORY_LOW_STOCK_UNITS, inventory_health_vs_revenue  # noqa: E402
+from benchmarks._common import make_inventory_context, timed  # noqa: E402
+
+def with_loop(ctx: DataContext, lookback_days: int) -> pd.DataFrame:
+    latest = ctx.daily["date"].iloc[-1]
+    inv = ctx.window("inventory", latest, lookback_days)
+    sales = ctx.window("cube", latest, lookback_days)
+
+    sales_day = (
+        sales.groupby(["date", "product"], as_index=False, observed=True)
+        .agg(revenue=("revenue", "sum"), units_sold=("units", "sum"))
+    )
+    inv_day = inv[["date", "product", "lost_demand", "stockout_flag", "closing_stock"]].copy()
+    inv_day["lost_demand"] = inv_day["lost_demand"].fillna(0).astype(float)
+    inv_day["is_stockout"] = inv_day["stockout_flag"].astype(str).str.lower().isin(["yes", "true", "1"])
+    inv_day["is_low_stock"] = inv_day["closing_stock"].fillna(0) <= INVENTORY_LOW_STOCK_UNITS
+
+    merged = inv_day.merge(sales_day, on=["date", "product"], how="left")
+    merged["revenue"] = merged["revenue"].fillna(0.0)
+    merged["units_sold"] = merged["units_sold"].fillna(0.0)
+    merged["realized_price"] = (
+        merged.groupby("product", observed=True)["revenue"].transform("sum") /
+        merged.groupby("product", observed=True)["units_sold"].transform("sum")
+    ).fillna(0.0)
+    merged["lost_revenue_estimate"] = 0.0
+    mask = merged["is_stockout"] & (merged["lost_demand"] > 0)
+    merged.loc[mask, "lost_revenue_estimate"] = merged.loc[mask, "lost_demand"] * merged.loc[mask, "realized_price"]
+
+    rows = []
+    for product, g in merged.groupby("product", observed=True):
+        so, normal = g[g["is_stockout"]], g[~g["is_stockout"]]
+        rows.append({
+            "product": product,
+            "days_observed": int(g["date"].nunique()),
+            "stockout_days": int(g["is_stockout"].sum()),
+            "low_stock_days": int(g["is_low_stock"].sum()),
+            "avg_daily_revenue_non_stockout": normal["revenue"].mean() if len(normal) else np.nan,
+            "avg_daily_revenue_stockout": so["revenue"].mean() if len(so) else np.nan,
+            "lost_units_estimated": int(so["lost_demand"].sum()),
+            "lost_revenue_estimated": float(so["lost_revenue_estimate"].sum()),
+        })
+    return pd.DataFrame(rows)
+
+
+def main():
+    products = int(sys.argv[1]) if len(sys.argv) > 1 else 5_000
+    days = int(sys.argv[2]) if len(sys.argv) > 2 else 365
+
+    ctx = make_inventory_context(products, days)
+    print(f"{products:,} SKUs × {days:,} days: {len(ctx.inventory):,} inventory rows, {len(ctx.cube):,} cube rows")
+
+    t_loop, a = timed(with_loop, ctx, days)
+    t_vec, b = timed(inventory_health_vs_revenue, ctx, days)
+    b = b["product_table"].sort_values("product", ignore_index=True)
+    for col in ("stockout_days", "low_stock_days", "lost_units_estimated"):
+        assert (a[col].to_numpy() == b[col].to_numpy()).all(), col
+    for col in ("avg_daily_revenue_non_stockout", "avg_daily_revenue_stockout", "lost_revenue_estimated"):
+        assert np.allclose(a[col].to_numpy(dtype=float), b[col].to_numpy(dtype=float), equal_nan=True), col
+
+    print(f"loop   {t_loop:>8.3f} s")
+    print(f"vector {t_vec:>8.3f} s  ({t_loop / t_vec:.0f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+"""
+Peak memory per tool: defensive copies vs. copy-on-write views.
+
+    python benchmarks/bench_memory.py [company_id] [base_dir]
+
+Loads the company once, then runs every tool under tracemalloc twice:
+  - copies: every table read returns a deep copy and memoized results
+            are deep-copied (the old `ctx.<table>.copy()` pattern)
+  - views:  the current read-only, copy-on-write views
+The memo is cleared before each run so both modes do the full work.
+Peak RSS of the process is printed at the end for reference.
+"""
+import resource
+import sys
+import tracemalloc
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from agent import tools  # noqa: E402
+from agent.core import memo  # noqa: E402
+from agent.core.context import ALL_TABLES, DataContext, load_context  # noqa: E402
+
+ORIGINAL_TABLE = DataContext.table
+ORIGINAL_COPY = memo._copy
+
+
+def _copying_table(self, name):
+    return ORIGINAL_TABLE(self, name).copy()
+
+
+def _deep_copy(value):
+    if hasattr(value, "copy") and hasattr(value, "index"):
+        return value.copy()
+    if isinstance(value, dict):
+        return {k: _deep_copy(v) for k, v in value.items()}
+    if isinstance(value, list):
+        return [_deep_copy(v) for v in value]
+    return value
+
+
+def copying(enabled: bool):
+    """Switch DataContext table reads and memo hand-outs to deep copies."""
+    DataContext.table = _copying_table if enabled else ORIGINAL_TABLE
+    memo._copy = _deep_copy if enabled else ORIGINAL_COPY
+
+
+def peak_kb(fn) -> float:
+    tracemalloc.start()
+    tracemalloc.reset_peak()
+    try:
+        fn()
+    except Exception:
+        pass  # tools with pre-existing errors still count what they allocated
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return peak / 1024
+
+
+def main():
+    company = sys.argv[1] if len(sys.argv) > 1 else "GlowLab"
+    base_dir = sys.argv[2] if len(sys.argv) > 2 else "data/companies"
+
+    tools.CTX = load_context(company, base_dir=base_dir, tables=ALL_TABLES)
+    names = sorted(n for n in dir(tools) if n.startswith("tool_") and n != "tool_rollup")
+
+    print(f"{'tool':<38} {'copies KB':>10} {'views KB':>10} {'saved':>7}")
+    totals = [0.0, 0.0]
+    for name in names:
+        row = []
+        for enabled in (True, False):
+            copying(enabled)
+            tools.CTX.memo.clear()
+            row.append(peak_kb(getattr(tools, name)))
+        copying(False)
+        totals[0] += row[0]
+        totals[1] += row[1]
+        saved = (1 - row[1] / row[0]) * 100 if row[0] else 0.0
+        print(f"{name:<38} {row[0]:>10.0f} {row[1]:>10.0f} {saved:>6.0f}%")
+    print(f"{'total':<38} {totals[0]:>10.0f} {totals[1]:>10.0f} {(1 - totals[1] / totals[0]) * 100:>6.0f}%")
+    print(f"process peak RSS: {resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024:.0f} MB")
+
+
+if __name__ == "__main__":
+    main()
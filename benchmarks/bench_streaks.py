@@ -0,0 +1,62 @@
+"""
+Per-product streak loop vs. the vectorized run-length encoding.
+
+    python benchmarks/bench_streaks.py [products] [days]
+
+Builds a synthetic inventory table (default 5,000 SKUs × 1,095 days) and
+computes stockout streaks per product twice:
+  - loop:   groupby("product") and a Python scan of each product's days
+  - vector: analytics/inventory.stockout_streaks (one lexsort + array ops)
+"""
+import sys
+from pathlib import Path
+
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from agent.analytics.inventory import stockout_streaks  # noqa: E402
+from agent.core.context import DataContext  # noqa: E402
+from benchmarks._common import make_inventory, timed  # noqa: E402
+
+
+def with_loop(inv: pd.DataFrame) -> pd.DataFrame:
+    rows = []
+    for product, g in inv.groupby("product", observed=True):
+        runs, cur = [], 0
+        for flag in (g["stockout_flag"] == "Yes").to_numpy():
+            if flag:
+                cur += 1
+            elif cur:
+                runs.append(cur)
+                cur = 0
+        if cur:
+            runs.append(cur)
+        rows.append({
+            "product": product,
+            "stockout_streaks": len(runs),
+            "longest_stockout_streak": max(runs, default=0),
+            "current_stockout_streak": cur,
+        })
+    return pd.DataFrame(rows)
+
+
+def main():
+    products = int(sys.argv[1]) if len(sys.argv) > 1 else 5_000
+    days = int(sys.argv[2]) if len(sys.argv) > 2 else 1_095
+
+    inv = make_inventory(products, days)
+    ctx = DataContext(tables={"inventory": inv})
+    print(f"{products:,} products × {days:,} days = {len(inv):,} rows")
+
+    t_loop, a = timed(with_loop, inv)
+    t_vec, b = timed(stockout_streaks, ctx)
+    for col in ("stockout_streaks", "longest_stockout_streak", "current_stockout_streak"):
+        assert (a[col].to_numpy() == b[col].to_numpy()).all(), col
+
+    print(f"loop   {t_loop:>8.3f} s")
+    print(f"vector {t_vec:>8.3f} s  ({t_loop / t_vec:.0f}x)")
+
+
+if __name__ == "__main__":
+    main()
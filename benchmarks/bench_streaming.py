@@ -0,0 +1,62 @@
+"""
+In-memory vs. streamed (out-of-core) aggregation.
+
+    python benchmarks/bench_streaming.py [rows] [memory_mb]
+
+Writes a synthetic sales.csv (default 2,000,000 rows) to a temp dir and
+computes revenue / units / distinct products by channel twice, under
+tracemalloc:
+  - memory: read_typed_csv of the whole file, then one groupby().agg()
+  - stream: core/streaming.iter_csv chunks capped at `memory_mb`
+            (default 16) folded by stream_aggregate
+"""
+import sys
+import tempfile
+from pathlib import Path
+
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from agent.core.ingest import read_typed_csv  # noqa: E402
+from agent.core.streaming import iter_csv, stream_aggregate  # noqa: E402
+from benchmarks._common import measured, write_sales  # noqa: E402
+
+COLUMNS = ["channel", "product", "units_sold", "revenue"]
+AGGS = {
+    "revenue": ("revenue", "sum"),
+    "units": ("units_sold", "sum"),
+    "products": ("product", "nunique"),
+}
+
+
+def in_memory(path: Path) -> pd.DataFrame:
+    df = read_typed_csv(path.read_bytes(), name="sales")[COLUMNS]
+    out = df.groupby("channel", as_index=False, observed=True).agg(**AGGS)
+    return out.astype({"channel": "object"})
+
+
+def streamed(path: Path, memory_mb: float) -> pd.DataFrame:
+    return stream_aggregate(iter_csv(path, COLUMNS, memory_mb), ["channel"], AGGS)
+
+
+def main():
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 2_000_000
+    memory_mb = float(sys.argv[2]) if len(sys.argv) > 2 else 16
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "sales.csv"
+        write_sales(path, rows)
+        print(f"{rows:,} rows, {path.stat().st_size / 1024 / 1024:.0f} MB on disk")
+
+        t_mem, p_mem, a = measured(in_memory, path)
+        t_str, p_str, b = measured(streamed, path, memory_mb)
+        pd.testing.assert_frame_equal(a, b, check_dtype=False)
+
+    print(f"{'mode':<8} {'seconds':>8} {'peak MB':>8}")
+    print(f"{'memory':<8} {t_mem:>8.2f} {p_mem:>8.0f}")
+    print(f"{'stream':<8} {t_str:>8.2f} {p_str:>8.0f}")
+
+
+if __name__ == "__main__":
+    main()
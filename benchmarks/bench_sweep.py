@@ -0,0 +1,52 @@
+"""
+One call per lookback vs. one nested-window sweep.
+
+    python benchmarks/bench_sweep.py [products] [days]
+
+Writes a synthetic company (default 500 products × 1,095 days, as in
+bench_interpret.py), loads every table once, then times from an empty
+memo, for lookbacks 30, 60, 90, 180 and 365:
+  - marketing_efficiency and inventory_health_vs_revenue once per lookback
+  - marketing_efficiency_sweep and inventory_health_vs_revenue_sweep
+    (every lookback from the longest window, see reasoning/interpret.py)
+"""
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from agent.reasoning.interpret import (  # noqa: E402
+    inventory_health_vs_revenue,
+    inventory_health_vs_revenue_sweep,
+    marketing_efficiency,
+    marketing_efficiency_sweep,
+)
+from benchmarks._common import synthetic_company, timed  # noqa: E402
+
+LOOKBACKS = (30, 60, 90, 180, 365)
+
+
+def main():
+    products = int(sys.argv[1]) if len(sys.argv) > 1 else 500
+    days = int(sys.argv[2]) if len(sys.argv) > 2 else 1_095
+
+    with synthetic_company(products, days) as (ctx, rows):
+        print(f"{products:,} products × {days:,} days, {rows:,} sales rows, lookbacks {LOOKBACKS}")
+
+        for single, sweep in (
+            (marketing_efficiency, marketing_efficiency_sweep),
+            (inventory_health_vs_revenue, inventory_health_vs_revenue_sweep),
+        ):
+            ctx.memo.clear()
+            t_calls, _ = timed(lambda: {L: single(ctx, L) for L in LOOKBACKS})
+            ctx.memo.clear()
+            t_sweep, results = timed(sweep, ctx, LOOKBACKS)
+            assert sorted(results) == list(LOOKBACKS)
+
+            print(f"{single.__name__}")
+            print(f"  per lookback {t_calls:>8.3f} s")
+            print(f"  sweep        {t_sweep:>8.3f} s  ({t_calls / t_sweep:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,58 @@
+# test_lookbacks.py
+# Empty lookbacks (0 or negative days) must read as "no data in the window",
+# as the interpreters did before the nested-window sweeps.
+#
+#   python -m pytest -q test_lookbacks.py
+import pytest
+
+from agent.core.context import load_context
+from agent.reasoning.interpret import (
+    inventory_health_vs_revenue,
+    inventory_health_vs_revenue_sweep,
+    marketing_efficiency,
+    marketing_efficiency_sweep,
+)
+
+COMPANY = "GlowLab"
+
+
+def no_data(lookback_days, table, flag, message, as_of):
+    """The result the interpreters have always returned for an empty window."""
+    return {
+        "as_of": as_of,
+        "window_days": lookback_days,
+        table: (0, 0),
+        "flags": [{"type": flag, "severity": "high"}],
+        "interpretation": [message],
+    }
+
+
+def shaped(result):
+    return {k: v.shape if hasattr(v, "shape") else v for k, v in result.items()}
+
+
+@pytest.fixture(scope="module")
+def ctx():
+    return load_context(COMPANY, use_cache=False)
+
+
+@pytest.mark.parametrize("lookback_days", [0, -7])
+def test_marketing_empty_lookback(ctx, lookback_days):
+    as_of = ctx.daily["date"].iloc[-1].date().isoformat()
+    expected = no_data(lookback_days, "channel_table", "NO_MARKETING_DATA",
+                       "No marketing data available in the selected window.", as_of)
+    assert shaped(marketing_efficiency(ctx, lookback_days=lookback_days)) == expected
+    sweep = marketing_efficiency_sweep(ctx, lookbacks=(lookback_days, 30))
+    assert shaped(sweep[lookback_days]) == expected
+    assert sweep[30]["flags"] == marketing_efficiency(ctx, lookback_days=30)["flags"]
+
+
+@pytest.mark.parametrize("lookback_days", [0, -7])
+def test_inventory_empty_lookback(ctx, lookback_days):
+    as_of = ctx.daily["date"].iloc[-1].date().isoformat()
+    expected = no_data(lookback_days, "product_table", "NO_INVENTORY_DATA",
+                       "No inventory data available in the selected window.", as_of)
+    assert shaped(inventory_health_vs_revenue(ctx, lookback_days=lookback_days)) == expected
+    sweep = inventory_health_vs_revenue_sweep(ctx, lookbacks=(lookback_days, 30))
+    assert shaped(sweep[lookback_days]) == expected
+    assert sweep[30]["flags"] == inventory_health_vs_revenue(ctx, lookback_days=30)["flags"]
@@ -5,6 +5,7 @@ from copy import deepcopy
 from world.world_factory import simulate_next_day_ui
 from ui.config_io import load_config, save_config
 from ui.scenarios import recession_week, viral_spike, marketing_death_spiral
+from agent.analytics.compare import compare_frame, lookback_pair
 
 
 def panel_help(text):
@@ -38,12 +39,17 @@ def render_dashboard(company_id):
     daily_units = sales.groupby("date")["units_sold"].sum()
     daily_cac = sales.groupby("date")["CAC"].mean()
 
-    def trend_delta(series):
-        last_7 = series.tail(7).mean()
-        prev_7 = series.tail(14).head(7).mean()
-        if pd.isna(prev_7) or prev_7 == 0:
-            return None
-        return (last_7 - prev_7) / prev_7 * 100
+    # Last 7 vs previous 7 days for every KPI in one pass
+    daily = pd.DataFrame({"revenue": daily_rev, "units": daily_units, "cac": daily_cac}).reset_index()
+    deltas = compare_frame(
+        daily,
+        {m: (m, "mean") for m in ("revenue", "units", "cac")},
+        {"7d": lookback_pair(daily["date"].max(), 7)},
+    ).iloc[0]
+
+    def trend_delta(measure):
+        pct = deltas[f"{measure}_change_pct"]
+        return None if pd.isna(pct) else float(pct)
     
 
 
@@ -59,9 +65,9 @@ def render_dashboard(company_id):
         .shape[0]
     )
 
-    rev_delta = trend_delta(daily_rev)
-    unit_delta = trend_delta(daily_units)
-    cac_delta = trend_delta(daily_cac)
+    rev_delta = trend_delta("revenue")
+    unit_delta = trend_delta("units")
+    cac_delta = trend_delta("cac")
 
 
     k1, k2, k3, k4 = st.columns(4)
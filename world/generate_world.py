@@ -346,9 +346,12 @@ def write_outputs(sales_df, marketing_df, inventory_df, company_id):
     print(f"  - {inventory_path} ({len(inventory_df):,} rows)")
 
 
-def read_csv_if_exists(path: Path) -> pd.DataFrame:
+def read_csv_if_exists(path: Path, usecols=None, dtype=None) -> pd.DataFrame:
+    """Reads only `usecols` (all by default), parsing "date" during the read."""
     if path.exists() and path.stat().st_size > 0:
-        return pd.read_csv(path)
+        cols = usecols if usecols is not None else pd.read_csv(path, nrows=0).columns
+        dates = ["date"] if "date" in cols else None
+        return pd.read_csv(path, usecols=usecols, dtype=dtype, parse_dates=dates)
     return pd.DataFrame()
 
 
@@ -359,15 +362,17 @@ def simulate_next_day(config: WorldConfig, company_id, seed=None):
     marketing_path = data_dir / "marketing.csv"
     inventory_path = data_dir / "inventory.csv"
 
-    sales_df = read_csv_if_exists(sales_path)
-    inventory_df = read_csv_if_exists(inventory_path)
+    # Only the last date and the closing stock per product are needed
+    sales_df = read_csv_if_exists(sales_path, usecols=["date"])
+    inventory_df = read_csv_if_exists(
+        inventory_path,
+        usecols=["date", "product", "closing_stock"],
+        dtype={"product": "category", "closing_stock": "int64"},
+    )
 
     if sales_df.empty or inventory_df.empty:
         raise RuntimeError("❌ Cannot simulate next day without historical data.")
 
-    sales_df["date"] = pd.to_datetime(sales_df["date"])
-    inventory_df["date"] = pd.to_datetime(inventory_df["date"])
-
     last_date = sales_df["date"].max()
     next_date = last_date + timedelta(days=1)
 